@@ -1,25 +1,97 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
 import requests
-from bs4 import BeautifulSoup
-from rake_nltk import Rake
-from textblob import TextBlob
-from collections import Counter
-import nltk
-from nltk.corpus import stopwords
-from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+import urllib3
+from bs4 import BeautifulSoup, Tag, NavigableString, CData
+from collections import Counter, OrderedDict
+from urllib.parse import urlparse, urljoin, urldefrag, parse_qs
+from urllib.robotparser import RobotFileParser
 import re
 import math
-import webbrowser
-from PIL import Image, ImageTk
 import io
+import sys
+import time
+import asyncio
+import threading
+import queue
+import os
+import signal
+import json
+import hashlib
+import tempfile
+import sqlite3
+import copy
+import itertools
+import heapq
+import bisect
+import zlib
+import codecs
+import string
+import contextlib
+import socket
+import mmap
+import struct
+from array import array
+from collections import deque
+from multiprocessing import shared_memory, resource_tracker
+import xml.etree.ElementTree as ET
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from html.parser import HTMLParser
+from html.entities import html5 as HTML5_ENTITIES
 
-# Initialize NLTK resources
-nltk.download('stopwords')
-nltk.download('punkt')
+# NLTK data the keyword extractors need, with the locations that satisfy it
+NLTK_RESOURCES = {
+    'stopwords': ('corpora/stopwords',),
+    'punkt': ('tokenizers/punkt_tab', 'tokenizers/punkt'),
+}
+
+def ensure_nltk_data(download=False):
+    """Check the NLTK data is installed locally
+    
+    Nothing is downloaded unless download=True, so headless workers start
+    without touching the network. Raises LookupError listing what is missing.
+    """
+    import nltk
+    missing = []
+    for name, paths in NLTK_RESOURCES.items():
+        for path in paths:
+            try:
+                nltk.data.find(path)
+                break
+            except LookupError:
+                pass
+        else:
+            missing.append(name)
+    
+    if missing and download:
+        for name in missing:
+            nltk.download(name, quiet=True)
+        return ensure_nltk_data(download=False)
+    if missing:
+        raise LookupError(f"NLTK data not installed: {', '.join(missing)}. "
+                          f"Install it with: python -m nltk.downloader {' '.join(missing)}")
+
+_stop_words = None
+
+def load_stop_words():
+    """English stopwords from the local NLTK data, loaded once per process"""
+    global _stop_words
+    if _stop_words is None:
+        from nltk.corpus import stopwords
+        _stop_words = frozenset(stopwords.words('english'))
+    return _stop_words
+
+def _import_gui():
+    # tkinter and PIL are only needed by the desktop app
+    global tk, ttk, messagebox, scrolledtext, webbrowser, Image, ImageTk
+    import tkinter as tk
+    from tkinter import ttk, messagebox, scrolledtext
+    import webbrowser
+    from PIL import Image, ImageTk
 
 class SEOAnalyzerApp:
     def __init__(self, root):
+        _import_gui()
         self.root = root
         self.root.title("Professional SEO Analyzer")
         self.root.geometry("1200x800")
@@ -68,6 +140,11 @@ class SEOAnalyzerApp:
                                        command=self.analyze_website)
         self.analyze_button.pack(side=tk.LEFT)
         
+        self.cancel_button = ttk.Button(self.input_frame, text="Cancel", 
+                                      command=self.cancel_analysis, 
+                                      state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=(10, 0))
+        
         # Results Notebook
         self.notebook = ttk.Notebook(self.main_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True)
@@ -207,6 +284,57 @@ class SEOAnalyzerApp:
                                                 wrap=tk.WORD)
         self.dev_text.pack(fill=tk.BOTH, expand=True)
         
+        # Queue Tab
+        self.queue_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.queue_tab, text="Queue")
+        
+        self.queue_input_frame = ttk.LabelFrame(self.queue_tab, 
+                                              text="URLs or sitemap URLs, one per line")
+        self.queue_input_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.queue_input = scrolledtext.ScrolledText(self.queue_input_frame, 
+                                                   height=5, 
+                                                   wrap=tk.NONE)
+        self.queue_input.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.queue_buttons = ttk.Frame(self.queue_tab)
+        self.queue_buttons.pack(fill=tk.X, pady=(0, 10))
+        
+        self.queue_add_button = ttk.Button(self.queue_buttons, text="Add to Queue", 
+                                         command=self.add_to_queue)
+        self.queue_add_button.pack(side=tk.LEFT)
+        
+        self.queue_stop_button = ttk.Button(self.queue_buttons, text="Stop", 
+                                          command=self.stop_queue, 
+                                          state=tk.DISABLED)
+        self.queue_stop_button.pack(side=tk.LEFT, padx=10)
+        
+        self.queue_clear_button = ttk.Button(self.queue_buttons, text="Clear", 
+                                           command=self.clear_queue)
+        self.queue_clear_button.pack(side=tk.LEFT)
+        
+        self.queue_status = ttk.Label(self.queue_buttons, text="Queue empty")
+        self.queue_status.pack(side=tk.RIGHT)
+        
+        self.queue_table = VirtualTable(self.queue_tab, [
+            ('url', "URL", 520, tk.W, str),
+            ('seo_score', "SEO", 70, tk.E, lambda v: f"{v}/100"),
+            ('performance_score', "Performance", 100, tk.E, lambda v: f"{v}/100"),
+            ('mobile_score', "Mobile", 70, tk.E, lambda v: f"{v}/100"),
+            ('load_time', "Load Time", 90, tk.E, lambda v: f"{v:.2f} s"),
+            ('status', "Status", 220, tk.W, str),
+        ], on_activate=self.show_queue_result)
+        self.queue_table.frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Bulk runs share a pool of warm analyzers, one per worker thread
+        self.queue_workers = 4
+        self.queue_executor = None
+        self.queue_stop = None
+        self.queue_messages = queue.Queue()
+        self.queue_rows = {}
+        self.queue_pending = set()
+        self.idle_analyzers = queue.Queue()
+        
         # Status Bar
         self.status_bar = ttk.Label(self.root, text="Ready", relief=tk.SUNKEN)
         self.status_bar.pack(fill=tk.X, side=tk.BOTTOM)
@@ -214,6 +342,15 @@ class SEOAnalyzerApp:
         # Bind Enter key to analyze button
         self.root.bind('<Return>', lambda event: self.analyze_website())
         
+        # Background analysis: the worker thread posts (run id, kind, payload)
+        # messages that the Tk thread picks up with root.after
+        self.analyzer = None
+        self.analyzer_lock = threading.Lock()
+        self.results_queue = queue.Queue()
+        self.run_id = 0
+        self.cancel_event = None
+        self.polling = False
+        
     def create_logo(self):
         # Create a simple logo image
         from PIL import Image, ImageDraw, ImageFont
@@ -231,23 +368,128 @@ class SEOAnalyzerApp:
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        self.status_bar.config(text=f"Analyzing {url}...")
-        self.root.update_idletasks()
+        if self.cancel_event is not None:
+            return  # an analysis is already running
+        
+        self.run_id += 1
+        self.cancel_event = threading.Event()
+        self.analyze_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.clear_results()
+        self.status_bar.config(text=f"Fetching {url}...")
         
+        worker = threading.Thread(target=self._analysis_worker, 
+                                  args=(self.run_id, url, self.cancel_event), 
+                                  daemon=True)
+        worker.start()
+        if not self.polling:
+            self.polling = True
+            self.root.after(50, self._poll_results)
+    
+    def cancel_analysis(self):
+        if self.cancel_event is None:
+            return
+        # The worker notices at its next stage; anything it still sends is ignored
+        self.cancel_event.set()
+        self._finish_run("Analysis cancelled")
+    
+    def _analysis_worker(self, run_id, url, cancel_event):
+        post = lambda kind, payload=None: self.results_queue.put((run_id, kind, payload))
         try:
-            analyzer = SEOAnalyzer()
-            results = analyzer.analyze_page(url)
-            self.display_results(results)
-            self.status_bar.config(text=f"Analysis complete for {url}")
+            # A cancelled run may still be inside its fetch; wait for it
+            with self.analyzer_lock:
+                self._run_analysis(url, cancel_event, post)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to analyze website: {str(e)}")
-            self.status_bar.config(text="Ready")
+            post('error', f"Failed to analyze website: {str(e)}")
+    
+    def _run_analysis(self, url, cancel_event, post):
+        if cancel_event.is_set():
+            return
+        if self.analyzer is None:
+            self.analyzer = SEOAnalyzer()
+        website_data = self.analyzer.fetch_website_content(url)
+        if cancel_event.is_set():
+            return
+        if not website_data:
+            post('error', "Could not fetch website content")
+            return
+        
+        post('status', f"Analyzing {url}...")
+        for stage, seo_data in self.analyzer.iter_analysis(website_data):
+            if cancel_event.is_set():
+                return
+            post(stage, dict(seo_data))
+        post('done', url)
+    
+    def _poll_results(self):
+        while True:
+            try:
+                run_id, kind, payload = self.results_queue.get_nowait()
+            except queue.Empty:
+                break
+            if run_id != self.run_id or self.cancel_event is None:
+                continue  # left over from a cancelled run
+            
+            if kind == 'status':
+                self.status_bar.config(text=payload)
+            elif kind == 'details':
+                self.display_details(payload)
+            elif kind == 'technical':
+                self.display_technical(payload)
+            elif kind == 'keywords':
+                self.display_keywords(payload)
+                self.status_bar.config(text="Scoring...")
+            elif kind == 'complete':
+                self.display_results(payload)
+            elif kind == 'done':
+                self._finish_run(f"Analysis complete for {payload}")
+            elif kind == 'error':
+                self._finish_run("Ready")
+                messagebox.showerror("Error", payload)
+        
+        if self.cancel_event is not None:
+            self.root.after(50, self._poll_results)
+        else:
+            self.polling = False
+    
+    def _finish_run(self, status):
+        self.cancel_event = None
+        self.analyze_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.status_bar.config(text=status)
+    
+    def _set_text(self, widget, lines):
+        widget.config(state=tk.NORMAL)
+        widget.delete(1.0, tk.END)
+        for line in lines:
+            widget.insert(tk.END, line)
+        widget.config(state=tk.DISABLED)
+    
+    def clear_results(self):
+        for value_label, status_label in ((self.seo_score_value, self.seo_score_status),
+                                          (self.performance_score_value, self.performance_score_status),
+                                          (self.mobile_score_value, self.mobile_score_status)):
+            value_label.config(text="--", style='Score.TLabel')
+            status_label.config(text="Analyzing...", style='TLabel')
+        for widget in (self.keywords_text, self.suggestions_text, self.headings_value,
+                       self.tech_data_text, self.dev_text):
+            self._set_text(widget, [])
+        self.title_value.config(text="")
+        self.desc_value.config(text="")
     
     def display_results(self, data):
         if "error" in data:
             messagebox.showerror("Error", data['error'])
             return
         
+        self.display_scores(data)
+        self.display_keywords(data)
+        self.display_suggestions(data)
+        self.display_details(data)
+        self.display_technical(data)
+        self.display_developer(data)
+    
+    def display_scores(self, data):
         # Update scores
         self.update_score_display(self.seo_score_value, self.seo_score_status, 
                                 data['seo_score'], "SEO")
@@ -256,21 +498,16 @@ class SEOAnalyzerApp:
                                 data['performance_score'], "Performance")
         self.update_score_display(self.mobile_score_value, self.mobile_score_status, 
                                 data['mobile_score'], "Mobile")
-        
-        # Update keywords
-        self.keywords_text.config(state=tk.NORMAL)
-        self.keywords_text.delete(1.0, tk.END)
-        for i, kw in enumerate(data['keywords'], 1):
-            self.keywords_text.insert(tk.END, f"{i}. {kw}\n")
-        self.keywords_text.config(state=tk.DISABLED)
-        
-        # Update suggestions
-        self.suggestions_text.config(state=tk.NORMAL)
-        self.suggestions_text.delete(1.0, tk.END)
-        for i, suggestion in enumerate(data['suggestions'], 1):
-            self.suggestions_text.insert(tk.END, f"{i}. {suggestion}\n")
-        self.suggestions_text.config(state=tk.DISABLED)
-        
+    
+    def display_keywords(self, data):
+        self._set_text(self.keywords_text, 
+                       [f"{i}. {kw}\n" for i, kw in enumerate(data['keywords'], 1)])
+    
+    def display_suggestions(self, data):
+        self._set_text(self.suggestions_text, 
+                       [f"{i}. {suggestion}\n" for i, suggestion in enumerate(data['suggestions'], 1)])
+    
+    def display_details(self, data):
         # Update meta tags
         self.title_value.config(text=data['meta']['title'])
         self.desc_value.config(text=data['meta']['description'])
@@ -285,7 +522,8 @@ class SEOAnalyzerApp:
                     self.headings_value.insert(tk.END, f"- {heading}\n")
                 self.headings_value.insert(tk.END, "\n")
         self.headings_value.config(state=tk.DISABLED)
-        
+    
+    def display_technical(self, data):
         # Update technical data
         self.tech_data_text.config(state=tk.NORMAL)
         self.tech_data_text.delete(1.0, tk.END)
@@ -293,16 +531,20 @@ class SEOAnalyzerApp:
         self.tech_data_text.insert(tk.END, f"Images: {data['images']['count']} total\n")
         self.tech_data_text.insert(tk.END, f" - With alt text: {data['images']['with_alt']}\n")
         self.tech_data_text.insert(tk.END, f" - Without alt text: {data['images']['without_alt']}\n\n")
-        self.tech_data_text.insert(tk.END, f"Links: {data['links']['internal']} internal, {data['links']['external']} external\n\n")
+        self.tech_data_text.insert(tk.END, f"Links: {data['links']['internal']} internal, {data['links']['external']} external, {data['links'].get('other', 0)} other\n\n")
         self.tech_data_text.insert(tk.END, f"Viewport: {'Present' if data['meta']['viewport'] else 'Missing'}\n")
+        resources = data.get('resources')
+        if resources:
+            self.tech_data_text.insert(tk.END, f"\nPage Weight: {resources['bytes'] / 1024:.0f} KB in {resources['requests']} requests\n")
+            for kind, totals in resources['by_kind'].items():
+                self.tech_data_text.insert(tk.END, f" - {kind.title()}s: {totals['count']} ({totals['bytes'] / 1024:.0f} KB)\n")
+            self.tech_data_text.insert(tk.END, f"Render-blocking resources: {resources['render_blocking']}\n")
+            self.tech_data_text.insert(tk.END, f"Uncompressed text resources: {resources['uncompressed']}\n")
         self.tech_data_text.config(state=tk.DISABLED)
-        
-        # Update developer recommendations
-        self.dev_text.config(state=tk.NORMAL)
-        self.dev_text.delete(1.0, tk.END)
-        for i, rec in enumerate(data['developer_recommendations'], 1):
-            self.dev_text.insert(tk.END, f"{i}. {rec}\n")
-        self.dev_text.config(state=tk.DISABLED)
+    
+    def display_developer(self, data):
+        self._set_text(self.dev_text, 
+                       [f"{i}. {rec}\n" for i, rec in enumerate(data['developer_recommendations'], 1)])
     
     def update_score_display(self, value_label, status_label, score, score_type):
         value_label.config(text=f"{score}/100")
@@ -316,312 +558,4885 @@ class SEOAnalyzerApp:
         else:
             value_label.config(style='Error.TLabel')
             status_label.config(text="Needs Improvement", style='Error.TLabel')
-
-class SEOAnalyzer:
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        self.stop_words = set(stopwords.words('english'))
-    
-    def fetch_website_content(self, url):
-        try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            # Check for mobile responsiveness
-            mobile_friendly = self.check_mobile_responsiveness(response.text)
-            
-            return {
-                'html': response.text,
-                'load_time': response.elapsed.total_seconds(),
-                'status': response.status_code,
-                'mobile_friendly': mobile_friendly
-            }
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching URL {url}: {e}")
-            return None
     
-    def check_mobile_responsiveness(self, html):
-        """Simple check for mobile responsiveness"""
-        soup = BeautifulSoup(html, 'html.parser')
-        viewport = soup.find('meta', attrs={'name': 'viewport'})
-        if not viewport:
-            return False
+    def add_to_queue(self):
+        entries = [line.strip() for line in self.queue_input.get(1.0, tk.END).splitlines()]
+        entries = [entry for entry in entries if entry and not entry.startswith('#')]
+        if not entries:
+            messagebox.showerror("Error", "Please enter at least one URL")
+            return
+        self.queue_input.delete(1.0, tk.END)
         
-        # Check for responsive design indicators
-        responsive_indicators = [
-            'width=device-width',
-            'initial-scale=1',
-            'maximum-scale=1',
-            'user-scalable=no'
-        ]
+        if self.queue_executor is None:
+            self.queue_stop = threading.Event()
+            self.queue_executor = ThreadPoolExecutor(max_workers=self.queue_workers)
+            self.queue_stop_button.config(state=tk.NORMAL)
+            self.root.after(100, self._poll_queue)
         
-        content = viewport.get('content', '').lower()
-        return any(indicator in content for indicator in responsive_indicators)
+        for entry in entries:
+            if not entry.startswith(('http://', 'https://')):
+                entry = 'https://' + entry
+            if urlparse(entry).path.lower().endswith(('.xml', '.xml.gz')):
+                self.queue_executor.submit(self._expand_sitemap, entry, self.queue_stop)
+            else:
+                self._enqueue_urls([entry])
+        self._update_queue_status()
     
-    def analyze_page(self, url):
-        print(f"\n🔍 Analyzing: {url}")
-        
-        # Fetch website data
-        website_data = self.fetch_website_content(url)
-        if not website_data:
-            return {"error": "Could not fetch website content"}
-        
-        html = website_data['html']
-        load_time = website_data['load_time']
-        mobile_friendly = website_data['mobile_friendly']
-        
-        # Extract SEO elements
-        seo_data = {
-            'meta': self.extract_meta_data(html),
-            'headings': self.extract_headings(html),
-            'keywords': self.extract_keywords(html),
-            'links': self.extract_links(html),
-            'images': self.extract_images(html),
-            'load_time': load_time,
-            'mobile_friendly': mobile_friendly
-        }
-        
-        # Calculate scores
-        seo_data['seo_score'] = self.calculate_seo_score(seo_data)
-        seo_data['performance_score'] = self.calculate_performance_score(seo_data)
-        seo_data['mobile_score'] = self.calculate_mobile_score(seo_data)
-        
-        # Generate suggestions
-        seo_data['suggestions'] = self.generate_suggestions(seo_data)
-        seo_data['developer_recommendations'] = self.generate_dev_recommendations(seo_data)
-        
-        return seo_data
+    def _enqueue_urls(self, urls):
+        new_rows = []
+        for url in urls:
+            if url in self.queue_rows:
+                continue
+            row = {'url': url, 'seo_score': None, 'performance_score': None,
+                   'mobile_score': None, 'load_time': None, 'status': "Queued"}
+            self.queue_rows[url] = row
+            new_rows.append(row)
+            self.queue_pending.add(url)
+            self.queue_executor.submit(self._queue_worker, url, self.queue_stop)
+        self.queue_table.add_rows(new_rows)
     
-    def extract_meta_data(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        return {
-            'title': soup.find('title').text if soup.find('title') else "",
-            'description': soup.find('meta', attrs={'name': 'description'}).get('content', '') if soup.find('meta', attrs={'name': 'description'}) else "",
-            'keywords': soup.find('meta', attrs={'name': 'keywords'}).get('content', '').split(',') if soup.find('meta', attrs={'name': 'keywords'}) else [],
-            'viewport': bool(soup.find('meta', attrs={'name': 'viewport'}))
-        }
+    def _expand_sitemap(self, sitemap_url, stop):
+        try:
+            urls = list(fetch_sitemap_urls(sitemap_url))
+            self.queue_messages.put(('urls', sitemap_url, urls))
+        except Exception as e:
+            self.queue_messages.put(('sitemap_error', sitemap_url, str(e)))
     
-    def extract_headings(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        headings = {f'h{i}': [] for i in range(1, 7)}
-        for i in range(1, 7):
-            headings[f'h{i}'] = [h.text.strip() for h in soup.find_all(f'h{i}')]
-        return headings
+    def _queue_worker(self, url, stop):
+        if stop.is_set():
+            return
+        try:
+            analyzer = self.idle_analyzers.get_nowait()
+        except queue.Empty:
+            analyzer = SEOAnalyzer()
+        try:
+            self.queue_messages.put(('status', url, "Analyzing..."))
+            result = analyzer.analyze_page(url)
+        except Exception as e:
+            result = {"error": f"Failed to analyze website: {str(e)}"}
+        finally:
+            self.idle_analyzers.put(analyzer)
+        self.queue_messages.put(('result', url, result))
     
-    def extract_keywords(self, html):
-        text = self.extract_text_from_html(html)
-        
-        # RAKE keywords
-        r = Rake(stopwords=self.stop_words)
-        r.extract_keywords_from_text(text)
-        rake_keywords = r.get_ranked_phrases()[:20]
-        
-        # TextBlob keywords
-        blob = TextBlob(text)
-        tb_keywords = [np for np in blob.noun_phrases if len(np.split()) < 4]
+    def _poll_queue(self):
+        changed = False
+        while True:
+            try:
+                kind, key, payload = self.queue_messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'urls':
+                if self.queue_executor is not None:
+                    self._enqueue_urls(payload)
+                continue
+            if kind == 'sitemap_error':
+                self.status_bar.config(text=f"Could not read sitemap {key}: {payload}")
+                continue
+            
+            row = self.queue_rows.get(key)
+            if row is None:
+                continue  # cleared meanwhile
+            if kind == 'status':
+                row['status'] = payload
+            elif kind == 'result':
+                if key not in self.queue_pending:
+                    continue  # finished after the queue was stopped
+                self.queue_pending.discard(key)
+                if 'error' in payload:
+                    row['status'] = payload['error']
+                else:
+                    row['seo_score'] = payload['seo_score']
+                    row['performance_score'] = payload['performance_score']
+                    row['mobile_score'] = payload['mobile_score']
+                    row['load_time'] = payload['load_time']
+                    row['status'] = "Done"
+                    # Kept compact; double-clicking the row shows it in full
+                    row['result'] = PageResult.from_dict(payload, key)
+            changed = True
         
-        # Combine and rank
-        all_keywords = rake_keywords + tb_keywords
-        return [kw for kw, _ in Counter(all_keywords).most_common(15)]
+        if changed:
+            self.queue_table.refresh()
+            self._update_queue_status()
+        if self.queue_executor is not None and not self.queue_pending and self.queue_messages.empty():
+            self._shutdown_queue()
+        if self.queue_executor is not None:
+            self.root.after(100, self._poll_queue)
     
-    def extract_text_from_html(self, html):
-        if not html:
-            return ""
-            
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Remove unwanted elements
-            for script in soup(["script", "style", "nav", "footer", "iframe", "noscript"]):
-                script.decompose()
-            
-            # Get text
-            text = soup.get_text()
-            
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = '\n'.join(chunk for chunk in chunks if chunk)
-            
-            return text
-        except Exception as e:
-            print(f"Error parsing HTML: {e}")
-            return ""
+    def _update_queue_status(self):
+        total = len(self.queue_rows)
+        self.queue_status.config(text=f"{total - len(self.queue_pending)}/{total} analyzed")
     
-    def extract_links(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        links = soup.find_all('a', href=True)
-        return {
-            'count': len(links),
-            'internal': sum(1 for link in links if not link['href'].startswith('http')),
-            'external': sum(1 for link in links if link['href'].startswith('http'))
-        }
+    def _shutdown_queue(self):
+        self.queue_executor.shutdown(wait=False, cancel_futures=True)
+        self.queue_executor = None
+        self.queue_stop_button.config(state=tk.DISABLED)
     
-    def extract_images(self, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        images = soup.find_all('img')
-        return {
-            'count': len(images),
-            'with_alt': sum(1 for img in images if img.get('alt', '').strip()),
-            'without_alt': sum(1 for img in images if not img.get('alt', '').strip())
-        }
+    def stop_queue(self):
+        if self.queue_executor is None:
+            return
+        self.queue_stop.set()
+        for row in self.queue_rows.values():
+            if row['status'] == "Queued":
+                row['status'] = "Stopped"
+        self.queue_pending.clear()
+        self._shutdown_queue()
+        self.queue_table.refresh()
+        self._update_queue_status()
     
-    def calculate_seo_score(self, data):
-        score = 0
-        
-        # Title (10 points)
-        title = data['meta']['title']
-        if title:
-            score += 5
-            if 50 <= len(title) <= 60:
-                score += 5
-        
-        # Description (10 points)
-        description = data['meta']['description']
-        if description:
-            score += 5
-            if 120 <= len(description) <= 160:
-                score += 5
-        
-        # Keywords (5 points)
-        if data['meta']['keywords']:
-            score += 5
-        
-        # Headings (15 points)
-        if data['headings']['h1']:
-            score += 5
-            if len(data['headings']['h1']) == 1:
-                score += 5
-        if any(data['headings'][f'h{i}'] for i in range(2, 7)):
-            score += 5
-        
-        # Images (10 points)
-        if data['images']['count'] > 0:
-            score += 5
-            if data['images']['with_alt'] / data['images']['count'] > 0.8:
-                score += 5
-        
-        # Links (10 points)
-        if data['links']['internal'] > 5:
-            score += 5
-        if data['links']['external'] > 2:
-            score += 5
-        
-        # Viewport (5 points)
-        if data['meta']['viewport']:
-            score += 5
-        
-        # Content (15 points)
-        if len(data['keywords']) >= 5:
-            score += 15
-        
-        # Load time (15 points)
-        if data['load_time'] < 2:
-            score += 15
-        elif data['load_time'] < 4:
-            score += 10
-        
-        return min(100, math.ceil(score))
+    def show_queue_result(self, row):
+        if row.get('result') is None:
+            return
+        self.display_results(row['result'].to_dict())
+        self.notebook.select(self.overview_tab)
+        self.status_bar.config(text=f"Showing queued result for {row['url']}")
     
-    def calculate_performance_score(self, data):
-        # Simplified performance score based on load time
-        if data['load_time'] < 1:
-            return 95
-        elif data['load_time'] < 2:
-            return 85
-        elif data['load_time'] < 3:
-            return 70
-        elif data['load_time'] < 4:
-            return 50
-        else:
-            return 30
+    def clear_queue(self):
+        self.stop_queue()
+        self.queue_rows = {}
+        self.queue_table.set_rows([])
+        self.queue_status.config(text="Queue empty")
+
+class VirtualTable:
+    """Sortable table that only draws the rows currently in view
     
-    def calculate_mobile_score(self, data):
-        # Score based on mobile responsiveness
-        score = 0
-        
-        # Viewport (30 points)
-        if data['meta']['viewport']:
-            score += 30
-        
-        # Mobile friendly (70 points)
-        if data['mobile_friendly']:
-            score += 70
-        
-        return score
+    Rows are plain dicts; columns are (key, heading, width, anchor, format)
+    tuples. Drawing cost depends on the window height, not the row count, so
+    tens of thousands of rows stay responsive. Click a heading to sort by it,
+    click again to reverse. Missing values (None) always sort last.
+    Double-clicking a row calls on_activate(row).
+    """
     
-    def generate_suggestions(self, data):
-        suggestions = []
-        
-        # Title suggestions
-        if not data['meta']['title']:
-            suggestions.append("Add a title tag with primary keywords (50-60 characters)")
-        elif len(data['meta']['title']) > 60:
-            suggestions.append("Shorten your title tag (currently too long)")
-        
-        # Description suggestions
-        if not data['meta']['description']:
-            suggestions.append("Add a meta description (120-160 characters)")
-        elif len(data['meta']['description']) > 160:
-            suggestions.append("Shorten your meta description (currently too long)")
-        
-        # Heading suggestions
-        if not data['headings']['h1']:
-            suggestions.append("Add exactly one H1 heading with your main keyword")
-        elif len(data['headings']['h1']) > 1:
-            suggestions.append("Reduce to one H1 heading per page")
-        
-        # Image suggestions
-        if data['images']['without_alt'] > 0:
-            suggestions.append(f"Add alt text to {data['images']['without_alt']} images")
+    ROW_HEIGHT = 22
+    
+    def __init__(self, parent, columns, on_activate=None):
+        self.columns = columns
+        self.on_activate = on_activate
+        self.rows = []
+        self.sort_key = None
+        self.sort_reverse = False
+        self.top = 0
+        self._redraw_pending = False
+        self._needs_sort = False
         
-        # Keyword suggestions
-        if len(data['keywords']) < 5:
-            suggestions.append("Add more content with relevant keywords")
+        self.frame = ttk.Frame(parent)
+        self.header = tk.Canvas(self.frame, height=self.ROW_HEIGHT, 
+                                background='#dfe3e8', highlightthickness=0)
+        self.body = tk.Canvas(self.frame, background='white', highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, 
+                                       command=self._on_scrollbar)
+        self.header.grid(row=0, column=0, sticky='ew')
+        self.body.grid(row=1, column=0, sticky='nsew')
+        self.scrollbar.grid(row=1, column=1, sticky='ns')
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(1, weight=1)
         
-        # Performance suggestions
-        if data['load_time'] > 2:
-            suggestions.append("Optimize page speed by compressing images and minimizing resources")
+        self.header.bind('<Button-1>', self._on_header_click)
+        self.body.bind('<Double-Button-1>', self._on_double_click)
+        self.body.bind('<Configure>', lambda event: self._schedule_redraw())
+        self.body.bind('<MouseWheel>', lambda event: self.scroll(-1 if event.delta > 0 else 1, 3))
+        self.body.bind('<Button-4>', lambda event: self.scroll(-1, 3))
+        self.body.bind('<Button-5>', lambda event: self.scroll(1, 3))
+        self._draw_header()
+    
+    def set_rows(self, rows):
+        self.rows = list(rows)
+        self.top = 0
+        self.refresh()
+    
+    def add_rows(self, rows):
+        self.rows.extend(rows)
+        self.refresh()
+    
+    def refresh(self):
+        """Redraw after row values changed; many calls in one event-loop turn draw once"""
+        self._needs_sort = True
+        self._schedule_redraw()
+    
+    def _schedule_redraw(self):
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.body.after_idle(self._redraw)
+    
+    def _visible_count(self):
+        return max(1, self.body.winfo_height() // self.ROW_HEIGHT)
+    
+    def scroll(self, direction, amount=1):
+        self.top += direction * amount
+        self._schedule_redraw()
+    
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self.top = int(float(args[0]) * len(self.rows))
+        elif action == 'scroll':
+            step = self._visible_count() if args[1] == 'pages' else 1
+            self.top += int(args[0]) * step
+        self._schedule_redraw()
+    
+    def _on_header_click(self, event):
+        x = 0
+        for key, _, width, _, _ in self.columns:
+            if x <= event.x < x + width:
+                if self.sort_key == key:
+                    self.sort_reverse = not self.sort_reverse
+                else:
+                    self.sort_key, self.sort_reverse = key, False
+                self._draw_header()
+                self.refresh()
+                return
+            x += width
+    
+    def _on_double_click(self, event):
+        index = self.top + event.y // self.ROW_HEIGHT
+        if self.on_activate is not None and 0 <= index < len(self.rows):
+            self.on_activate(self.rows[index])
+    
+    def _sort(self):
+        self._needs_sort = False
+        if self.sort_key is None:
+            return
+        key = self.sort_key
+        present = [row for row in self.rows if row.get(key) is not None]
+        missing = [row for row in self.rows if row.get(key) is None]
+        present.sort(key=lambda row: row[key], reverse=self.sort_reverse)
+        self.rows = present + missing
+    
+    def _draw_header(self):
+        self.header.delete('all')
+        x = 0
+        for key, heading, width, anchor, _ in self.columns:
+            if key == self.sort_key:
+                heading += " \u25bc" if self.sort_reverse else " \u25b2"
+            text_x = x + 6 if anchor == tk.W else x + width - 6
+            self.header.create_text(text_x, self.ROW_HEIGHT // 2, text=heading, 
+                                    anchor=anchor, font=('Segoe UI', 10, 'bold'))
+            x += width
+    
+    def _redraw(self):
+        self._redraw_pending = False
+        if self._needs_sort:
+            self._sort()
+        visible = self._visible_count()
+        self.top = max(0, min(self.top, len(self.rows) - visible))
         
-        # Mobile suggestions
-        if not data['mobile_friendly']:
-            suggestions.append("Improve mobile responsiveness with proper viewport settings")
+        self.body.delete('all')
+        for offset, row in enumerate(self.rows[self.top:self.top + visible]):
+            y = offset * self.ROW_HEIGHT
+            if (self.top + offset) % 2:
+                self.body.create_rectangle(0, y, self.body.winfo_width(), y + self.ROW_HEIGHT, 
+                                           fill='#f5f7fa', width=0)
+            x = 0
+            for key, _, width, anchor, formatter in self.columns:
+                value = row.get(key)
+                text = "--" if value is None else formatter(value)
+                max_chars = width // 7
+                if len(text) > max_chars:
+                    text = text[:max_chars - 1] + "\u2026"
+                text_x = x + 6 if anchor == tk.W else x + width - 6
+                self.body.create_text(text_x, y + self.ROW_HEIGHT // 2, text=text, anchor=anchor)
+                x += width
         
-        return suggestions
+        if self.rows:
+            self.scrollbar.set(self.top / len(self.rows), 
+                               min(1.0, (self.top + visible) / len(self.rows)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+# Tags whose text is not counted as page content
+NON_CONTENT_TAGS = frozenset(["script", "style", "nav", "footer", "iframe", "noscript"])
+HEADING_TAGS = frozenset(f'h{i}' for i in range(1, 7))
+# String types BeautifulSoup.get_text() includes (skips comments, doctypes, etc.)
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+def script_blocks_render(attrs, in_head):
+    # A classic script in <head> without async/defer holds up the first paint
+    return (in_head and 'async' not in attrs and 'defer' not in attrs
+            and (attrs.get('type') or '').strip().lower() != 'module')
+
+def stylesheet_blocks_render(attrs):
+    # Every stylesheet blocks rendering unless its media can't match the screen
+    media = (attrs.get('media') or 'all').strip().lower()
+    return media not in ('print', 'speech') and 'disabled' not in attrs
+
+class ParsedPage:
+    """Everything the extractors read from a page, collected in one tree walk"""
     
-    def generate_dev_recommendations(self, data):
-        recs = []
+    def __init__(self, html):
+        self.title = None
+        self.metas = {}
+        self.headings = {f'h{i}': [] for i in range(1, 7)}
+        self.links = []
+        self.images = []
+        self.resources = []
         
-        # Technical SEO
-        recs.append("Ensure proper use of semantic HTML5 elements")
+        soup = BeautifulSoup(html or "", 'html.parser')
+        text_parts = []
         
-        # Performance
-        if data['load_time'] > 2:
-            recs.append("Implement lazy loading for images")
-            recs.append("Minify CSS and JavaScript files")
-            recs.append("Enable browser caching")
-            recs.append("Consider using a CDN for static assets")
+        # Iterative depth-first walk in document order; content under
+        # NON_CONTENT_TAGS is skipped for the visible text only
+        stack = [(iter(soup.contents), True, False)]
+        while stack:
+            children, visible, in_head = stack[-1]
+            node = next(children, None)
+            if node is None:
+                stack.pop()
+                continue
+            
+            if isinstance(node, Tag):
+                name = node.name
+                if name == 'meta':
+                    meta_name = node.get('name')
+                    if meta_name is not None and meta_name not in self.metas:
+                        self.metas[meta_name] = node.get('content', '')
+                elif name == 'a':
+                    if node.has_attr('href'):
+                        self.links.append(node['href'])
+                elif name == 'img':
+                    self.images.append(node.get('alt', ''))
+                    if node.get('src'):
+                        self.resources.append(('image', node['src'], False))
+                elif name == 'script':
+                    if node.get('src'):
+                        self.resources.append(('script', node['src'],
+                                               script_blocks_render(node.attrs, in_head)))
+                elif name == 'link':
+                    if node.get('href') and 'stylesheet' in node.get('rel', ()):
+                        self.resources.append(('stylesheet', node['href'],
+                                               stylesheet_blocks_render(node.attrs)))
+                elif name in HEADING_TAGS:
+                    self.headings[name].append(node.text.strip())
+                elif name == 'title' and self.title is None:
+                    self.title = node.text
+                
+                if node.contents:
+                    stack.append((iter(node.contents), visible and name not in NON_CONTENT_TAGS,
+                                  in_head or name == 'head'))
+            elif visible and type(node) in TEXT_STRING_TYPES:
+                text_parts.append(node)
         
-        # Mobile
-        if not data['meta']['viewport']:
-            recs.append("Add responsive viewport meta tag: <meta name='viewport' content='width=device-width, initial-scale=1'>")
+        self.text = clean_text(''.join(text_parts))
+
+# html.parser tree-building rules that StreamingPage mirrors
+VOID_TAGS = frozenset([
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed',
+    'frame', 'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link',
+    'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr'
+])
+PRESERVE_WHITESPACE_TAGS = frozenset(['pre', 'textarea'])
+# Text inside these tags is not a plain NavigableString, so get_text() skips it
+STRING_CONTAINER_TAGS = frozenset(['rt', 'rp', 'style', 'script', 'template'])
+ASCII_SPACES = frozenset('\x20\x0a\x09\x0c\x0d')
+
+class StreamingPage(HTMLParser):
+    """Incremental alternative to ParsedPage that never builds a tree
+    
+    Feed it chunks as they arrive and call close(); afterwards it exposes the
+    same attributes as ParsedPage. Only the extracted fields are kept, and
+    the visible text is capped at max_text_chars, so memory stays bounded
+    however large the page is.
+    """
+    
+    def __init__(self, max_text_chars=2000000):
+        # References are resolved here, as BeautifulSoup's html.parser builder does
+        super().__init__(convert_charrefs=False)
+        self.max_text_chars = max_text_chars
+        self.title = None
+        self.metas = {}
+        self.headings = {f'h{i}': [] for i in range(1, 7)}
+        self.links = []
+        self.images = []
+        self.resources = []
+        self.text = ""
+        self.truncated = False
         
-        if not data['mobile_friendly']:
-            recs.append("Test mobile responsiveness using Google's Mobile-Friendly Test")
+        self._open_tags = []
+        self._hidden_depth = 0
+        self._container_depth = 0
+        self._preserve_depth = 0
+        self._pending_data = []
+        self._text_parts = []
+        self._text_size = 0
+        # Open <title>/<hN> elements: (tag, depth, heading list, slot, parts)
+        self._capturing = []
+    
+    def _flush_data(self, is_cdata=False):
+        # Mirrors BeautifulSoup.endData: one string per run of character data
+        if not self._pending_data:
+            return
+        data = ''.join(self._pending_data)
+        self._pending_data = []
+        if not self._preserve_depth and all(c in ASCII_SPACES for c in data):
+            data = '\n' if '\n' in data else ' '
+        if self._container_depth and not is_cdata:
+            return
+        for capture in self._capturing:
+            capture[4].append(data)
+        if not self._hidden_depth and self._text_size < self.max_text_chars:
+            data = data[:self.max_text_chars - self._text_size]
+            self._text_parts.append(data)
+            self._text_size += len(data)
+            if self._text_size >= self.max_text_chars:
+                self.truncated = True
+    
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs)
+        if tag in VOID_TAGS:
+            self._end(tag)
+    
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs)
+        self._end(tag)
+    
+    def handle_endtag(self, tag):
+        self._flush_data()
+        self._end(tag)
+    
+    def _start(self, tag, attrs):
+        self._flush_data()
+        attrs = {name: value if value is not None else '' for name, value in attrs}
+        if tag == 'meta':
+            meta_name = attrs.get('name')
+            if meta_name is not None and meta_name not in self.metas:
+                self.metas[meta_name] = attrs.get('content', '')
+        elif tag == 'a':
+            if 'href' in attrs:
+                self.links.append(attrs['href'])
+        elif tag == 'img':
+            self.images.append(attrs.get('alt', ''))
+            if attrs.get('src'):
+                self.resources.append(('image', attrs['src'], False))
+        elif tag == 'script':
+            if attrs.get('src'):
+                self.resources.append(('script', attrs['src'],
+                                       script_blocks_render(attrs, 'head' in self._open_tags)))
+        elif tag == 'link':
+            if attrs.get('href') and 'stylesheet' in attrs.get('rel', '').split():
+                self.resources.append(('stylesheet', attrs['href'], stylesheet_blocks_render(attrs)))
         
-        # Accessibility
-        if data['images']['without_alt'] > 0:
-            recs.append("Add alt attributes to all images for accessibility")
+        if tag in HEADING_TAGS:
+            # Reserve the slot now so headings stay in document order
+            level = self.headings[tag]
+            level.append(None)
+            self._capturing.append((tag, len(self._open_tags), level, len(level) - 1, []))
+        elif tag == 'title' and self.title is None:
+            self._capturing.append((tag, len(self._open_tags), None, None, []))
         
-        # Security
-        recs.append("Ensure site uses HTTPS for all pages")
-        recs.append("Implement security headers (CSP, X-Frame-Options, etc.)")
+        self._open_tags.append(tag)
+        if tag in NON_CONTENT_TAGS:
+            self._hidden_depth += 1
+        if tag in STRING_CONTAINER_TAGS:
+            self._container_depth += 1
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self._preserve_depth += 1
+    
+    def _end(self, tag):
+        # Like BeautifulSoup._popToTag: close the most recent open tag of this
+        # name and everything opened after it; stray end tags are ignored
+        for index in range(len(self._open_tags) - 1, -1, -1):
+            if self._open_tags[index] == tag:
+                self._pop_to(index)
+                return
+    
+    def _pop_to(self, index):
+        for tag in self._open_tags[index:]:
+            if tag in NON_CONTENT_TAGS:
+                self._hidden_depth -= 1
+            if tag in STRING_CONTAINER_TAGS:
+                self._container_depth -= 1
+            if tag in PRESERVE_WHITESPACE_TAGS:
+                self._preserve_depth -= 1
+        del self._open_tags[index:]
         
-        return recs
-
-if __name__ == "__main__":
-    root = tk.Tk()
+        while self._capturing and self._capturing[-1][1] >= index:
+            tag, _, level, slot, parts = self._capturing.pop()
+            text = ''.join(parts)
+            if level is None:
+                self.title = text
+            else:
+                level[slot] = text.strip()
+    
+    def handle_data(self, data):
+        self._pending_data.append(data)
+    
+    def handle_entityref(self, name):
+        self._pending_data.append(HTML5_ENTITIES.get(name + ';', '&' + name))
+    
+    def handle_charref(self, name):
+        try:
+            codepoint = int(name[1:], 16) if name[:1] in 'xX' else int(name)
+            self._pending_data.append(chr(codepoint))
+        except (ValueError, OverflowError):
+            self._pending_data.append('\ufffd')
+    
+    def handle_comment(self, data):
+        self._flush_data()
+    
+    def handle_decl(self, decl):
+        self._flush_data()
+    
+    def handle_pi(self, data):
+        self._flush_data()
+    
+    def unknown_decl(self, data):
+        self._flush_data()
+        if data.upper().startswith('CDATA['):
+            self._pending_data.append(data[len('CDATA['):])
+            self._flush_data(is_cdata=True)
+    
+    def close(self):
+        super().close()
+        self._flush_data()
+        self._pop_to(0)
+        self.text = clean_text(''.join(self._text_parts))
+        self._text_parts = []
+
+PAGE_TYPES = (ParsedPage, StreamingPage)
+
+def clean_text(text):
+    """Collapse extracted page text into one phrase per line"""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return '\n'.join(chunk for chunk in chunks if chunk)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Bodies past this many decoded bytes are cut off; the rest is not analyzed
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+# The sitemap protocol's own limit on an uncompressed sitemap file
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+# Google reads this much of a robots.txt and ignores the rest
+ROBOTS_MAX_BYTES = 500 * 1024
+# Sitemap indexes are followed this many levels below the first sitemap
+SITEMAP_MAX_DEPTH = 3
+
+# WHATWG encoding labels whose Python codec differs; utf-16 without a BOM is LE
+_CHARSET_ALIASES = {'iso-8859-1': 'cp1252', 'latin1': 'cp1252', 'latin-1': 'cp1252',
+                    'us-ascii': 'cp1252', 'ascii': 'cp1252', 'utf-16': 'utf-16-le'}
+# A <meta> read as ASCII can't really declare UTF-16, so the prescan takes it as UTF-8
+_META_CHARSET_ALIASES = {'utf-16': 'utf-8', 'utf-16le': 'utf-8', 'utf-16be': 'utf-8'}
+_META_CHARSET = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([a-zA-Z0-9._:-]+)', re.IGNORECASE)
+
+def _charset(label, in_document=False):
+    # A usable Python codec name for a charset label, or None
+    if not label:
+        return None
+    label = label.strip().strip('"\'').lower()
+    if in_document:
+        label = _META_CHARSET_ALIASES.get(label, label)
+    label = _CHARSET_ALIASES.get(label, label)
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+def sniff_charset(content_type, head):
+    """Charset of an HTML body: BOM, then the Content-Type header, then a
+    <meta charset> in its first bytes (`head`); UTF-8 when none says"""
+    for bom, name in ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'),
+                      (codecs.BOM_UTF16_BE, 'utf-16')):
+        if head.startswith(bom):
+            return name
+    match = re.search(r'charset\s*=\s*([^;\s]+)', content_type or '', re.IGNORECASE)
+    charset = _charset(match.group(1)) if match else None
+    if charset is None:
+        match = _META_CHARSET.search(head)
+        charset = _charset(match.group(1).decode('ascii'), in_document=True) if match else None
+    return charset or 'utf-8'
+
+class _DeflateStream:
+    # "deflate" should be zlib-wrapped, but some servers send raw deflate
+    def __init__(self):
+        self._decompressor = zlib.decompressobj()
+        self._started = False
+    
+    def decompress(self, data, max_length):
+        if not self._started:
+            self._started = True
+            try:
+                return self._decompressor.decompress(data, max_length)
+            except zlib.error:
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decompressor.decompress(data, max_length)
+
+class _BrotliStream:
+    def __init__(self):
+        import brotli
+        self._decompressor = brotli.Decompressor()
+    
+    def decompress(self, data, max_length):
+        try:
+            return self._decompressor.process(data, output_buffer_limit=max_length)
+        except TypeError:
+            return self._decompressor.process(data)  # brotli before 1.1 has no limit
+
+def accepted_encodings():
+    """The Accept-Encoding BodyReader can decode: br only with brotli installed"""
+    import importlib.util
+    return 'gzip, deflate, br' if importlib.util.find_spec('brotli') else 'gzip, deflate'
+
+class BodyReader:
+    """Iterates the decoded text of a streamed requests response, within a size cap
+    
+    The raw bytes are read in `chunk_size` pieces and decompressed here
+    (gzip, deflate or br), so the cap applies to the decompressed size and
+    a compression bomb stops at `max_bytes` too. The charset comes from
+    sniff_charset() on the first bytes; each chunk is then decoded once,
+    incrementally. Afterwards transfer_bytes (on the wire), body_bytes
+    (decompressed), encoding and truncated describe what was read.
+    """
+    
+    SNIFF_BYTES = 4096
+    
+    def __init__(self, response, max_bytes=DEFAULT_MAX_BYTES, chunk_size=65536):
+        self.response = response
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.content_encoding = (response.headers.get('Content-Encoding') or 'identity').strip().lower()
+        self.transfer_bytes = 0
+        self.body_bytes = 0
+        self.encoding = None
+        self.truncated = False
+    
+    def _decompressor(self):
+        if self.content_encoding in ('identity', ''):
+            return None
+        if self.content_encoding in ('gzip', 'x-gzip'):
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self.content_encoding == 'deflate':
+            return _DeflateStream()
+        if self.content_encoding == 'br':
+            try:
+                return _BrotliStream()
+            except ImportError:
+                pass
+        raise requests.exceptions.ContentDecodingError(
+            f"Unsupported Content-Encoding {self.content_encoding!r}")
+    
+    def iter_bytes(self):
+        """The decompressed bytes in chunks, stopping once max_bytes have come out"""
+        decompressor = self._decompressor()
+        raw_chunks = self.response.raw.stream(self.chunk_size, decode_content=False)
+        while True:
+            # urllib3's errors, as requests' iter_content would raise them
+            try:
+                raw = next(raw_chunks, None)
+            except urllib3.exceptions.ReadTimeoutError as e:
+                raise requests.exceptions.ConnectionError(e)
+            except urllib3.exceptions.HTTPError as e:
+                raise requests.exceptions.ChunkedEncodingError(e)
+            if raw is None:
+                return
+            self.transfer_bytes += len(raw)
+            room = self.max_bytes - self.body_bytes
+            if decompressor is None:
+                data = raw
+            else:
+                try:
+                    data = decompressor.decompress(raw, room + 1)
+                except (zlib.error, OSError) as e:
+                    raise requests.exceptions.ContentDecodingError(f"Could not decompress body: {e}")
+            if len(data) > room:
+                self.truncated = True
+                data = data[:room]
+            self.body_bytes += len(data)
+            if data:
+                yield data
+            if self.truncated:
+                return
+    
+    def __iter__(self):
+        chunks = self.iter_bytes()
+        # Hold back the first bytes until the charset is known
+        head = b''
+        for data in chunks:
+            head += data
+            if len(head) >= self.SNIFF_BYTES:
+                break
+        self.encoding = sniff_charset(self.response.headers.get('Content-Type'), head)
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        if head:
+            yield decoder.decode(head)
+        for data in chunks:
+            yield decoder.decode(data)
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    
+    def read(self):
+        return ''.join(self)
+
+class StageMetrics:
+    """Latency histograms, bytes and error counts per analysis stage
+    
+    Any object with this observe() method can be given to SEOAnalyzer as
+    its `metrics`; this one keeps Prometheus-style cumulative buckets and is
+    safe to share between threads. An observation is a bisect and a few
+    additions under a lock, cheap enough to leave on. Workers in other
+    processes send drain() snapshots that merge() folds in.
+    """
+    
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self.started = time.time()
+        # stage -> [count per bucket (+Inf last), observations, seconds, bytes, errors]
+        self._stages = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, stage, seconds, nbytes=0, error=False):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = [[0] * (len(self.buckets) + 1), 0, 0.0, 0, 0]
+            entry[0][index] += 1
+            entry[1] += 1
+            entry[2] += seconds
+            entry[3] += nbytes
+            entry[4] += error
+    
+    def time(self, stage):
+        """Context manager observing the time spent in its block; set
+        .bytes on it to record bytes processed. An exception counts as an error."""
+        return StageTimer(self, stage)
+    
+    def drain(self):
+        """Snapshot of everything observed so far, resetting the counts"""
+        with self._lock:
+            stages, self._stages = self._stages, {}
+        return stages
+    
+    def merge(self, stages):
+        """Fold in a drain() snapshot taken with the same buckets"""
+        with self._lock:
+            for stage, (counts, observations, seconds, nbytes, errors) in stages.items():
+                entry = self._stages.get(stage)
+                if entry is None:
+                    entry = self._stages[stage] = [[0] * (len(self.buckets) + 1), 0, 0.0, 0, 0]
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += observations
+                entry[2] += seconds
+                entry[3] += nbytes
+                entry[4] += errors
+    
+    def _quantile(self, counts, observations, q):
+        # Upper bound of the bucket holding the q-th observation
+        rank = q * observations
+        seen = 0
+        for bound, count in zip(self.buckets, counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+    
+    def summary(self):
+        """{stage: count, errors, bytes, seconds, mean and p50/p95/p99 bucket bounds}"""
+        with self._lock:
+            stages = {stage: (list(entry[0]),) + tuple(entry[1:]) for stage, entry in self._stages.items()}
+        result = {}
+        for stage, (counts, observations, seconds, nbytes, errors) in sorted(stages.items()):
+            result[stage] = {
+                'count': observations,
+                'errors': errors,
+                'bytes': nbytes,
+                'seconds': seconds,
+                'mean_seconds': seconds / observations if observations else 0.0,
+                'p50_seconds': self._quantile(counts, observations, 0.5),
+                'p95_seconds': self._quantile(counts, observations, 0.95),
+                'p99_seconds': self._quantile(counts, observations, 0.99)
+            }
+        return result
+    
+    def prometheus_text(self, prefix='seo_analyzer'):
+        """All stages in the Prometheus text exposition format"""
+        with self._lock:
+            stages = {stage: (list(entry[0]),) + tuple(entry[1:]) for stage, entry in self._stages.items()}
+        lines = [f"# HELP {prefix}_stage_seconds Time spent in each analysis stage",
+                 f"# TYPE {prefix}_stage_seconds histogram"]
+        for stage, (counts, observations, seconds, _, _) in sorted(stages.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {seconds!r}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {observations}')
+        lines += [f"# HELP {prefix}_stage_bytes_total Bytes processed by each analysis stage",
+                  f"# TYPE {prefix}_stage_bytes_total counter"]
+        lines += [f'{prefix}_stage_bytes_total{{stage="{stage}"}} {entry[3]}'
+                  for stage, entry in sorted(stages.items())]
+        lines += [f"# HELP {prefix}_stage_errors_total Failures in each analysis stage",
+                  f"# TYPE {prefix}_stage_errors_total counter"]
+        lines += [f'{prefix}_stage_errors_total{{stage="{stage}"}} {entry[4]}'
+                  for stage, entry in sorted(stages.items())]
+        return '\n'.join(lines) + '\n'
+
+class StageTimer:
+    """One timed block for StageMetrics.time() and SEOAnalyzer's hooks"""
+    
+    __slots__ = ('metrics', 'stage', 'bytes', 'start')
+    
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+        self.bytes = 0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start, self.bytes, exc_type is not None)
+        return False
+
+class _NullTimer:
+    # Stands in for StageTimer when an analyzer has no metrics
+    bytes = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+# Connection setup times of the current thread's requests, for the fetch
+# stage metrics: ('connect' or 'tls', seconds) as new connections are made
+_connection_timings = threading.local()
+
+class _TimedConnectionMixin:
+    # _new_conn is DNS lookup plus TCP connect; connect() adds TLS on HTTPS
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            self._connect_seconds = time.perf_counter() - start
+    
+    def connect(self):
+        self._connect_seconds = 0.0
+        start = time.perf_counter()
+        super().connect()
+        events = getattr(_connection_timings, 'events', None)
+        if events is not None:
+            events.append(('connect', self._connect_seconds))
+            if isinstance(self, urllib3.connection.HTTPSConnection):
+                events.append(('tls', time.perf_counter() - start - self._connect_seconds))
+
+class _TimedHTTPConnection(_TimedConnectionMixin, urllib3.connection.HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, urllib3.connection.HTTPSConnection):
+    pass
+
+class _TimedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose new connections report their connect and TLS times"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool,
+                                                   'https': _TimedHTTPSConnectionPool}
+
+class SessionPool:
+    """Keep-alive requests sessions, one per thread, shared by every analyzer
+    
+    requests.Session is not safe to share between threads, so each thread
+    gets its own session with a connection pool sized for `pool_maxsize`
+    connections per host.
+    """
+    
+    def __init__(self, pool_connections=32, pool_maxsize=32):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._local = threading.local()
+    
+    def get(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = TimedHTTPAdapter(pool_connections=self.pool_connections,
+                                       pool_maxsize=self.pool_maxsize)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+# Shared by all analyzers unless one is given its own
+DEFAULT_SESSIONS = SessionPool()
+
+class ResponseCache:
+    """On-disk response cache keyed by URL with size-based LRU eviction
+    
+    Each entry is a body file plus a JSON file holding the URL, the ETag and
+    Last-Modified validators, whether the body was cut off at the size cap
+    and, once analyzed, the last seo_data for the page. Total body size is kept under max_bytes by evicting the least
+    recently used entries.
+    """
+    
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> body size, oldest first
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+        
+        found = []
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                key = name[:-5]
+                body_path = self._path(key, '.body')
+                if os.path.exists(body_path):
+                    found.append((os.path.getmtime(self._path(key, '.json')), key,
+                                  os.path.getsize(body_path)))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total += size
+    
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+    
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+    
+    def _read_meta(self, key):
+        try:
+            with open(self._path(key, '.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _write_meta(self, key, meta):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path(key, '.json'))
+    
+    def lookup(self, url):
+        """Metadata for a cached URL (validators, last result) or None"""
+        key = self._key(url)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        meta = self._read_meta(key)
+        if meta is not None:
+            os.utime(self._path(key, '.json'))
+        return meta
+    
+    def read_body(self, url):
+        with open(self._path(self._key(url), '.body'), 'rb') as f:
+            return f.read().decode('utf-8')
+    
+    def writer(self, url, etag=None, last_modified=None):
+        """A CacheWriter that stores the body as it is written, on commit()"""
+        return CacheWriter(self, url, etag, last_modified)
+    
+    def store(self, url, body, etag=None, last_modified=None):
+        writer = self.writer(url, etag, last_modified)
+        writer.write(body)
+        writer.commit()
+    
+    def store_result(self, url, seo_data, content_hash=None):
+        """Attach the latest analysis to a cached URL"""
+        key = self._key(url)
+        meta = self._read_meta(key)
+        if meta is None:
+            return
+        meta['result'] = seo_data
+        meta['content_hash'] = content_hash
+        self._write_meta(key, meta)
+    
+    def _commit(self, url, tmp_body, size, etag, last_modified, truncated=False):
+        key = self._key(url)
+        os.replace(tmp_body, self._path(key, '.body'))
+        self._write_meta(key, {'url': url, 'etag': etag, 'last_modified': last_modified,
+                               'size': size, 'truncated': truncated, 'result': None})
+        with self._lock:
+            self._total += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total -= old_size
+                for suffix in ('.body', '.json'):
+                    try:
+                        os.remove(self._path(old_key, suffix))
+                    except OSError:
+                        pass
+    
+    def __len__(self):
+        return len(self._entries)
+
+class CacheWriter:
+    """Streams a response body into a temporary file until it is committed;
+    set `truncated` if the body was cut off at the size cap"""
+    
+    def __init__(self, cache, url, etag, last_modified):
+        self.cache = cache
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.truncated = False
+        fd, self.tmp_path = tempfile.mkstemp(dir=cache.directory, suffix='.tmp')
+        # Binary, so bodies round-trip exactly and size is in bytes, as the
+        # startup scan measures it
+        self.file = os.fdopen(fd, 'wb')
+        self.size = 0
+    
+    def write(self, chunk):
+        self.size += self.file.write(chunk.encode('utf-8'))
+    
+    def commit(self):
+        self.file.close()
+        self.cache._commit(self.url, self.tmp_path, self.size, self.etag, self.last_modified,
+                           self.truncated)
+    
+    def discard(self):
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+class ContentHasher:
+    """sha256 of a page's HTML with surrounding whitespace removed
+    
+    Leading and trailing whitespace only ever becomes whitespace-only text,
+    which the extractors discard, so pages that differ only there share a
+    hash. Chunks can be fed as they stream in.
+    """
+    
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self._started = False
+        self._held = ''
+    
+    def update(self, chunk):
+        if not self._started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+            self._started = True
+        body = chunk.rstrip()
+        if body:
+            self._hash.update((self._held + body).encode('utf-8'))
+            self._held = chunk[len(body):]
+        else:
+            # Whitespace only counts once something follows it
+            self._held += chunk
+    
+    def write(self, chunk):
+        self.update(chunk)
+    
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+def content_hash(html):
+    hasher = ContentHasher()
+    hasher.update(html)
+    return hasher.hexdigest()
+
+# seo_data fields that depend on the fetch rather than the HTML; memoized
+# results are stored without them and rescored on every hit
+LOAD_DEPENDENT_FIELDS = ('load_time', 'seo_score', 'performance_score', 'mobile_score',
+                         'suggestions', 'developer_recommendations')
+
+class AnalysisMemo:
+    """Per-page analysis results keyed by content hash
+    
+    An in-memory LRU of up to max_entries results, optionally backed by a
+    SQLite file that survives restarts and holds everything ever stored.
+    """
+    
+    def __init__(self, max_entries=10000, path=None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS memo (hash TEXT PRIMARY KEY, data TEXT NOT NULL)")
+            self._db.commit()
+    
+    def _load(self, key):
+        row = self._db.execute("SELECT data FROM memo WHERE hash = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def _remember(self, key, data):
+        self._entries[key] = data
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._entries:
+                return True
+            if self._db is None:
+                return False
+            return self._db.execute("SELECT 1 FROM memo WHERE hash = ?", (key,)).fetchone() is not None
+    
+    def get(self, key):
+        """A private copy of the stored result, or None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+            elif self._db is not None:
+                data = self._load(key)
+                if data is not None:
+                    self._remember(key, data)
+                    self.disk_hits += 1
+            if data is None:
+                self.misses += 1
+                return None
+        return copy.deepcopy(data)
+    
+    def put(self, key, seo_data):
+        data = {field: copy.deepcopy(value) for field, value in seo_data.items()
+                if field not in LOAD_DEPENDENT_FIELDS}
+        with self._lock:
+            self._remember(key, data)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO memo (hash, data) VALUES (?, ?)",
+                                 (key, json.dumps(data)))
+                self._db.commit()
+    
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'hits': hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'entries': len(self._entries)
+            }
+
+class AuditState:
+    """SQLite store of the last audit of every URL, for incremental re-audits
+    
+    Per URL it keeps the ETag/Last-Modified validators, the content hash and
+    the last seo_data. It stands in for both the analyzer's ResponseCache
+    (conditional re-fetches; a 304 reuses the stored result) and its
+    AnalysisMemo (a page served again with identical content skips parsing
+    and keyword extraction). No response bodies are kept, only each page's
+    <a href> values, so a crawl still follows the links of a page that
+    answers 304.
+    
+    Each open starts a new run; the result a URL had before this run stays
+    available through previous() so re-audits can report what changed.
+    """
+    
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._validators = {}   # url -> (etag, last_modified, links) until the result is stored
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT,
+                data TEXT, previous TEXT, run INTEGER NOT NULL, links TEXT);
+            CREATE INDEX IF NOT EXISTS pages_content_hash ON pages (content_hash);
+            CREATE TABLE IF NOT EXISTS runs (run INTEGER PRIMARY KEY, started REAL NOT NULL);
+        """)
+        with self._db:
+            # State files from before links were kept
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(pages)")]
+            if 'links' not in columns:
+                self._db.execute("ALTER TABLE pages ADD COLUMN links TEXT")
+            self.run = self._db.execute("INSERT INTO runs (started) VALUES (?)",
+                                        (time.time(),)).lastrowid
+    
+    def close(self):
+        self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+    
+    # ResponseCache interface
+    
+    def lookup(self, url):
+        """Validators, last result and links for a URL, or None if there is
+        nothing to revalidate"""
+        with self._lock:
+            row = self._db.execute("SELECT etag, last_modified, data, links FROM pages WHERE url = ?",
+                                   (url,)).fetchone()
+        # Rows saved before links were kept are fetched in full once
+        if row is None or row[2] is None or row[3] is None or not (row[0] or row[1]):
+            return None
+        return {'url': url, 'etag': row[0], 'last_modified': row[1], 'result': json.loads(row[2]),
+                'links': json.loads(row[3])}
+    
+    def read_body(self, url):
+        return None
+    
+    def writer(self, url, etag=None, last_modified=None):
+        return _ValidatorWriter(self, url, etag, last_modified)
+    
+    def store_result(self, url, seo_data, content_hash=None):
+        """Save a fresh analysis; the result from before this run moves to `previous`"""
+        with self._lock:
+            etag, last_modified, links = self._validators.pop(url, (None, None, None))
+            with self._db:
+                self._db.execute("""
+                    INSERT INTO pages (url, etag, last_modified, content_hash, data, run, links)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (url) DO UPDATE SET
+                        previous = CASE WHEN pages.run < excluded.run THEN pages.data
+                                        ELSE pages.previous END,
+                        etag = excluded.etag, last_modified = excluded.last_modified,
+                        content_hash = excluded.content_hash, data = excluded.data,
+                        run = excluded.run, links = excluded.links""",
+                    (url, etag, last_modified, content_hash, json.dumps(seo_data), self.run,
+                     json.dumps(links) if links is not None else None))
+    
+    # AnalysisMemo interface
+    
+    def __contains__(self, key):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM pages WHERE content_hash = ? AND data IS NOT NULL",
+                                    (key,)).fetchone() is not None
+    
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT data FROM pages WHERE content_hash = ? AND data IS NOT NULL",
+                                   (key,)).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        for field in LOAD_DEPENDENT_FIELDS:
+            data.pop(field, None)
+        return data
+    
+    def put(self, key, seo_data):
+        pass  # store_result already saved it with its content hash
+    
+    def previous(self, url):
+        """The URL's result from before this run, or None for a new URL"""
+        with self._lock:
+            row = self._db.execute("SELECT data, previous, run FROM pages WHERE url = ?",
+                                   (url,)).fetchone()
+        if row is None:
+            return None
+        data = row[1] if row[2] == self.run else row[0]
+        if data is None:
+            return None
+        data = json.loads(data)
+        data.pop('keyword_candidates', None)
+        return data
+
+class _ValidatorWriter:
+    # AuditState keeps no bodies, just the links found in them; these and
+    # the validators wait for the page's result so a failed analysis can't
+    # leave new validators next to an old result
+    
+    def __init__(self, state, url, etag, last_modified):
+        self.state = state
+        self.url = url
+        self.validators = (etag, last_modified)
+        self._links = _LinkParser()
+    
+    def write(self, chunk):
+        self._links.feed(chunk)
+    
+    def commit(self):
+        self._links.close()
+        with self.state._lock:
+            self.state._validators[self.url] = self.validators + (self._links.links,)
+    
+    def discard(self):
+        pass
+
+def result_changes(previous, current):
+    """Score and suggestion differences between two results of one page
+    
+    {} when nothing changed. Scores map to [old, new]; suggestion and
+    recommendation lists map to {'added': [...], 'removed': [...]}.
+    """
+    if previous is None:
+        return {'new': True}
+    if 'error' in current:
+        return {'error': current['error']}
+    changes = {}
+    for field in ('seo_score', 'performance_score', 'mobile_score'):
+        if previous.get(field) != current.get(field):
+            changes[field] = [previous.get(field), current.get(field)]
+    for field in ('suggestions', 'developer_recommendations'):
+        old, new = previous.get(field) or [], current.get(field) or []
+        added = [item for item in new if item not in old]
+        removed = [item for item in old if item not in new]
+        if added or removed:
+            changes[field] = {'added': added, 'removed': removed}
+    return changes
+
+class PageResult:
+    """Compact record of one page's analysis
+    
+    Holds the same information as the result dict of analyze_content in a
+    fraction of the memory, for reports that keep many pages around: no
+    per-page dicts, tuples instead of lists, headings as one tuple of texts
+    plus a count per level, and suggestion, recommendation and keyword
+    strings interned so every page shares one copy. to_dict() gives back
+    the dict shape the rest of the app (e.g. display_results) expects.
+    """
+    
+    __slots__ = ('url', 'title', 'description', 'meta_keywords', 'viewport',
+                 'heading_texts', 'heading_counts', 'keywords', 'link_count',
+                 'internal_links', 'external_links', 'other_links', 'image_count', 'images_with_alt',
+                 'load_time', 'mobile_friendly', 'seo_score', 'performance_score',
+                 'mobile_score', 'suggestions', 'developer_recommendations', 'resources',
+                 'truncated', 'fingerprint', 'duplicate_of')
+    
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+    
+    @classmethod
+    def from_dict(cls, data, url=None):
+        """Build a record from an analyze_content result (not an error result)"""
+        if 'error' in data:
+            raise ValueError(f"Cannot store a failed analysis: {data['error']}")
+        intern = sys.intern
+        meta = data['meta']
+        headings = data['headings']
+        levels = [headings.get(f'h{i}', ()) for i in range(1, 7)]
+        record = cls.__new__(cls)
+        record.url = url
+        record.title = meta['title']
+        record.description = meta['description']
+        record.meta_keywords = tuple(intern(keyword) for keyword in meta['keywords'])
+        record.viewport = meta['viewport']
+        record.heading_texts = tuple(text for texts in levels for text in texts)
+        record.heading_counts = bytes(len(texts) for texts in levels) \
+            if all(len(texts) < 256 for texts in levels) else tuple(len(texts) for texts in levels)
+        record.keywords = tuple(intern(str(keyword)) for keyword in data['keywords'])
+        record.link_count = data['links']['count']
+        record.internal_links = data['links']['internal']
+        record.external_links = data['links']['external']
+        # Results stored before links were split three ways have no 'other'
+        record.other_links = data['links'].get('other')
+        record.image_count = data['images']['count']
+        record.images_with_alt = data['images']['with_alt']
+        record.load_time = data['load_time']
+        record.mobile_friendly = data['mobile_friendly']
+        record.seo_score = data.get('seo_score')
+        record.performance_score = data.get('performance_score')
+        record.mobile_score = data.get('mobile_score')
+        record.suggestions = tuple(intern(text) for text in data.get('suggestions', ()))
+        record.developer_recommendations = tuple(
+            intern(text) for text in data.get('developer_recommendations', ()))
+        # Measured page weight as (requests, bytes, render blocking,
+        # uncompressed, failed, ((kind, count, bytes), ...))
+        resources = data.get('resources')
+        record.resources = None if resources is None else (
+            resources['requests'], resources['bytes'], resources['render_blocking'],
+            resources['uncompressed'], resources['failed'],
+            tuple((intern(kind), totals['count'], totals['bytes'])
+                  for kind, totals in resources['by_kind'].items()))
+        record.truncated = data.get('truncated', False)
+        # SimHash as an int; a cluster's duplicates share one original URL string
+        record.fingerprint = int(data['fingerprint'], 16) if 'fingerprint' in data else None
+        record.duplicate_of = intern(data['duplicate_of']) if data.get('duplicate_of') else None
+        return record
+    
+    def headings(self):
+        """{'h1': [...], ..., 'h6': [...]}"""
+        result = {}
+        start = 0
+        for level, count in enumerate(self.heading_counts, 1):
+            result[f'h{level}'] = list(self.heading_texts[start:start + count])
+            start += count
+        return result
+    
+    def to_dict(self):
+        """The analyze_content result dict, fields in their usual order"""
+        data = {
+            'meta': {
+                'title': self.title,
+                'description': self.description,
+                'keywords': list(self.meta_keywords),
+                'viewport': self.viewport
+            },
+            'headings': self.headings(),
+            'keywords': list(self.keywords),
+            'links': {
+                'count': self.link_count,
+                'internal': self.internal_links,
+                'external': self.external_links
+            },
+            'images': {
+                'count': self.image_count,
+                'with_alt': self.images_with_alt,
+                'without_alt': self.image_count - self.images_with_alt
+            },
+            'load_time': self.load_time,
+            'mobile_friendly': self.mobile_friendly
+        }
+        if self.other_links is not None:
+            data['links']['other'] = self.other_links
+        if self.resources is not None:
+            requests_, total, blocking, uncompressed, failed, by_kind = self.resources
+            data['resources'] = {
+                'requests': requests_,
+                'bytes': total,
+                'by_kind': {kind: {'count': count, 'bytes': size} for kind, count, size in by_kind},
+                'render_blocking': blocking,
+                'uncompressed': uncompressed,
+                'failed': failed
+            }
+        if self.truncated:
+            data['truncated'] = True
+        if self.fingerprint is not None:
+            data['fingerprint'] = f"{self.fingerprint:016x}"
+        if self.duplicate_of is not None:
+            data['duplicate_of'] = self.duplicate_of
+        if self.seo_score is not None:
+            data['seo_score'] = self.seo_score
+            data['performance_score'] = self.performance_score
+            data['mobile_score'] = self.mobile_score
+            data['suggestions'] = list(self.suggestions)
+            data['developer_recommendations'] = list(self.developer_recommendations)
+        return data
+    
+    def __eq__(self, other):
+        if not isinstance(other, PageResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def __repr__(self):
+        return f"PageResult(url={self.url!r}, seo_score={self.seo_score!r})"
+    
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+class SiteKeywordIndex:
+    """Site-wide inverted index of keyword phrases for corpus-aware ranking
+    
+    Every analyzed page adds its candidate phrases, and each page's keywords
+    are then ranked with BM25 against the whole site. Phrases that appear on
+    every page (navigation, footers, boilerplate) get a low IDF and drop out
+    of the top keywords.
+    
+    Storage is flat typed arrays: per-phrase document frequencies plus a
+    forward index of (phrase id, count) per page. The phrase -> pages
+    postings are built from that on demand. snapshot() writes all of it to
+    one file that load() memory-maps instead of reading.
+    
+    Re-adding a URL retires its previous version.
+    """
+    
+    MAGIC = b'SEOKWIX1'
+    
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.terms = {}             # phrase -> phrase id
+        self.term_list = []         # phrase id -> phrase
+        self.df = array('I')        # phrase id -> live pages containing it
+        self.urls = []              # page id -> URL
+        self.url_ids = {}           # URL -> latest page id
+        self.doc_lengths = array('I')
+        self.live = bytearray()     # page id -> 0 once retired
+        self.doc_offsets = array('Q', [0])
+        self.doc_terms = array('I')
+        self.doc_tfs = array('H')
+        self.live_docs = 0
+        self.live_length = 0
+        self._postings = None       # (offsets, page ids, counts) once built
+        self._mmap = None
+    
+    def __len__(self):
+        return self.live_docs
+    
+    def _thaw(self):
+        # A loaded snapshot is read-only; copy it into arrays before changing it
+        if self._mmap is None:
+            return
+        self.df = array('I', self.df)
+        self.doc_lengths = array('I', self.doc_lengths)
+        self.doc_offsets = array('Q', self.doc_offsets)
+        self.doc_terms = array('I', self.doc_terms)
+        self.doc_tfs = array('H', self.doc_tfs)
+        self._postings = None
+        self._mmap.close()
+        self._mmap = None
+    
+    def add_page(self, url, phrase_counts):
+        """Index one page's {phrase: count} candidates"""
+        self._thaw()
+        self.remove_page(url)
+        doc = len(self.urls)
+        self.urls.append(url)
+        self.url_ids[url] = doc
+        
+        length = 0
+        for phrase, count in phrase_counts.items():
+            if count <= 0:
+                continue
+            term = self.terms.get(phrase)
+            if term is None:
+                term = len(self.term_list)
+                self.terms[phrase] = term
+                self.term_list.append(phrase)
+                self.df.append(0)
+            self.df[term] += 1
+            self.doc_terms.append(term)
+            self.doc_tfs.append(min(count, 0xFFFF))
+            length += count
+        self.doc_offsets.append(len(self.doc_terms))
+        self.doc_lengths.append(length)
+        self.live.append(1)
+        self.live_docs += 1
+        self.live_length += length
+        self._postings = None
+    
+    def remove_page(self, url):
+        doc = self.url_ids.pop(url, None)
+        if doc is None or not self.live[doc]:
+            return
+        self._thaw()
+        self.live[doc] = 0
+        for i in range(self.doc_offsets[doc], self.doc_offsets[doc + 1]):
+            self.df[self.doc_terms[i]] -= 1
+        self.live_docs -= 1
+        self.live_length -= self.doc_lengths[doc]
+        self._postings = None
+    
+    def document_frequency(self, phrase):
+        term = self.terms.get(phrase)
+        return self.df[term] if term is not None else 0
+    
+    def rank(self, phrase_counts, limit=15):
+        """The page's top phrases by BM25 against the indexed site"""
+        docs = max(self.live_docs, 1)
+        avg_length = (self.live_length / docs) or 1
+        length = sum(phrase_counts.values())
+        norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+        
+        scored = []
+        for position, (phrase, count) in enumerate(phrase_counts.most_common()):
+            df = self.document_frequency(phrase)
+            idf = math.log(1 + (docs - df + 0.5) / (df + 0.5))
+            scored.append((-idf * count * (self.k1 + 1) / (count + norm), position, phrase))
+        scored.sort()
+        return [phrase for _, _, phrase in scored[:limit]]
+    
+    def _build_postings(self):
+        if self._postings is not None:
+            return self._postings
+        # Counting sort of the forward index by phrase id; page ids stay ascending
+        offsets = array('Q', bytes(8 * (len(self.term_list) + 1)))
+        for term in self.doc_terms:
+            offsets[term + 1] += 1
+        for term in range(len(self.term_list)):
+            offsets[term + 1] += offsets[term]
+        fill = array('Q', offsets)
+        pages = array('I', bytes(4 * len(self.doc_terms)))
+        counts = array('H', bytes(2 * len(self.doc_terms)))
+        for doc in range(len(self.urls)):
+            for i in range(self.doc_offsets[doc], self.doc_offsets[doc + 1]):
+                term = self.doc_terms[i]
+                slot = fill[term]
+                pages[slot] = doc
+                counts[slot] = self.doc_tfs[i]
+                fill[term] = slot + 1
+        self._postings = (offsets, pages, counts)
+        return self._postings
+    
+    def pages_for(self, phrase):
+        """(URL, count) for every live page containing the phrase"""
+        term = self.terms.get(phrase)
+        if term is None:
+            return []
+        offsets, pages, counts = self._build_postings()
+        return [(self.urls[pages[i]], counts[i])
+                for i in range(offsets[term], offsets[term + 1]) if self.live[pages[i]]]
+    
+    def snapshot(self, path):
+        """Write the index to `path` in the layout load() memory-maps"""
+        offsets, pages, counts = self._build_postings()
+        term_blob, term_offsets = self._pack_strings(self.term_list)
+        url_blob, url_offsets = self._pack_strings(self.urls)
+        sections = [term_offsets, term_blob, url_offsets, url_blob, self.doc_lengths,
+                    self.live, self.df, offsets, pages, counts, self.doc_offsets,
+                    self.doc_terms, self.doc_tfs]
+        
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(struct.pack('<B7xQQQ', sys.byteorder == 'little', len(self.term_list),
+                                len(self.urls), len(self.doc_terms)))
+            for section in sections:
+                data = memoryview(section).cast('B')
+                f.write(struct.pack('<Q', len(data)))
+                f.write(data)
+                f.write(bytes(-len(data) % 8))
+        os.replace(tmp, path)
+    
+    @staticmethod
+    def _pack_strings(strings):
+        offsets = array('Q', [0])
+        blob = bytearray()
+        for string in strings:
+            blob += string.encode('utf-8')
+            offsets.append(len(blob))
+        return blob, offsets
+    
+    @classmethod
+    def load(cls, path, k1=1.2, b=0.75):
+        """Memory-map a snapshot; arrays are only copied if the index changes"""
+        index = cls(k1=k1, b=b)
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        if view[:8] != cls.MAGIC:
+            raise ValueError(f"{path} is not a keyword index snapshot")
+        little_endian, _, _, _ = struct.unpack_from('<B7xQQQ', view, 8)
+        if bool(little_endian) != (sys.byteorder == 'little'):
+            raise ValueError(f"{path} was written on a machine with a different byte order")
+        
+        sections = []
+        position = 8 + 32
+        while position < len(view):
+            size, = struct.unpack_from('<Q', view, position)
+            position += 8
+            sections.append(view[position:position + size])
+            position += size + (-size % 8)
+        (term_offsets, term_blob, url_offsets, url_blob, doc_lengths, live, df,
+         offsets, pages, counts, doc_offsets, doc_terms, doc_tfs) = sections
+        
+        term_offsets = term_offsets.cast('Q')
+        index.term_list = [bytes(term_blob[term_offsets[i]:term_offsets[i + 1]]).decode('utf-8')
+                           for i in range(len(term_offsets) - 1)]
+        index.terms = {phrase: term for term, phrase in enumerate(index.term_list)}
+        url_offsets = url_offsets.cast('Q')
+        index.urls = [bytes(url_blob[url_offsets[i]:url_offsets[i + 1]]).decode('utf-8')
+                      for i in range(len(url_offsets) - 1)]
+        index.live = bytearray(live)
+        index.url_ids = {url: doc for doc, url in enumerate(index.urls) if index.live[doc]}
+        index.doc_lengths = doc_lengths.cast('I')
+        index.df = df.cast('I')
+        index._postings = (offsets.cast('Q'), pages.cast('I'), counts.cast('H'))
+        index.doc_offsets = doc_offsets.cast('Q')
+        index.doc_terms = doc_terms.cast('I')
+        index.doc_tfs = doc_tfs.cast('H')
+        index.live_docs = sum(index.live)
+        index.live_length = sum(index.doc_lengths[doc] for doc in range(len(index.urls))
+                                if index.live[doc])
+        index._mmap = mapped
+        return index
+
+# Byte value -> that bit of it, one table per bit, for bytes.translate
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+_SHINGLE_WORDS = re.compile(r'\w+')
+
+def simhash(text, shingle_words=2):
+    """64-bit SimHash of a text, over its `shingle_words`-word shingles
+    weighted by count
+    
+    Texts that share most of their shingles get fingerprints a few bits
+    apart. Each distinct shingle is hashed with BLAKE2b; the weighted
+    per-bit vote is counted with bytes.translate() over columns of the
+    digests, one pass per distinct count, so the cost per shingle is
+    about the hash alone.
+    """
+    words = _SHINGLE_WORDS.findall(text.lower())
+    if not words:
+        return 0
+    span = min(shingle_words, len(words))
+    shingles = Counter(' '.join(words[i:i + span]) for i in range(len(words) - span + 1))
+    by_count = {}
+    for shingle, count in shingles.items():
+        by_count.setdefault(count, []).append(shingle)
+    votes = [0] * 64
+    for count, group in by_count.items():
+        digests = b''.join(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+                           for shingle in group)
+        for position in range(8):
+            column = digests[position::8]
+            for bit, table in enumerate(_BIT_TABLES):
+                votes[8 * position + bit] += count * column.translate(table).count(1)
+    half = (len(words) - span + 1) / 2
+    fingerprint = 0
+    for bit, weight in enumerate(votes):
+        if weight > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+class DuplicateIndex:
+    """Near-duplicate detection over SimHash fingerprints
+    
+    Pages within `max_distance` differing bits of an earlier page are its
+    near-duplicates. Fingerprints are split into max_distance + 1 bands; two
+    fingerprints that close must agree exactly on at least one band, so a
+    lookup only compares the pages in its own buckets (LSH) instead of the
+    whole crawl. Only the first page of each cluster is put in the buckets,
+    so thousands of faceted copies of one page don't make its buckets long.
+    
+    Re-adding a URL with a changed fingerprint retires its previous version.
+    """
+    
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        # Bit masks of the bands; the last one takes any leftover bits
+        bands = max_distance + 1
+        width = 64 // bands
+        self.band_masks = [((1 << width) - 1) << (band * width) for band in range(bands - 1)]
+        self.band_masks.append(((1 << 64) - 1) & ~((1 << (width * (bands - 1))) - 1))
+        self.fingerprints = array('Q')  # page id -> fingerprint
+        self.original = array('q')      # page id -> page id it duplicates, or -1
+        self.urls = []                  # page id -> URL
+        self.url_ids = {}               # URL -> latest page id
+        self.live = bytearray()
+        self.buckets = [{} for _ in self.band_masks]
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.url_ids)
+    
+    def nearest(self, fingerprint):
+        """(page id, distance) of the closest indexed cluster, or None"""
+        best = None
+        fingerprints = self.fingerprints
+        for buckets, mask in zip(self.buckets, self.band_masks):
+            for page in buckets.get(fingerprint & mask, ()):
+                distance = bin(fingerprints[page] ^ fingerprint).count('1')
+                if distance <= self.max_distance and (best is None or (distance, page) < best):
+                    best = (distance, page)
+        return best and best[::-1]
+    
+    def add(self, url, fingerprint):
+        """Index a page; returns the URL it duplicates, or None
+        
+        With url None the page is only looked up, not added.
+        """
+        with self._lock:
+            page = self.url_ids.get(url)
+            if page is not None and self.fingerprints[page] == fingerprint:
+                original = self.original[page]
+                return self.urls[original] if original >= 0 else None
+            if page is not None:
+                self._remove(page)
+            match = self.nearest(fingerprint)
+            if url is None:
+                return self.urls[match[0]] if match else None
+            page = len(self.urls)
+            self.urls.append(url)
+            self.url_ids[url] = page
+            self.fingerprints.append(fingerprint)
+            self.live.append(1)
+            if match is None:
+                self.original.append(-1)
+                for buckets, mask in zip(self.buckets, self.band_masks):
+                    buckets.setdefault(fingerprint & mask, []).append(page)
+                return None
+            self.original.append(match[0])
+            return self.urls[match[0]]
+    
+    def remove(self, url):
+        with self._lock:
+            page = self.url_ids.get(url)
+            if page is not None:
+                self._remove(page)
+    
+    def _remove(self, page):
+        # Its duplicates keep pointing at it; only new lookups stop finding it
+        self.live[page] = 0
+        del self.url_ids[self.urls[page]]
+        if self.original[page] < 0:
+            fingerprint = self.fingerprints[page]
+            for buckets, mask in zip(self.buckets, self.band_masks):
+                buckets[fingerprint & mask].remove(page)
+    
+    def clusters(self, min_size=2):
+        """{original URL: [its near-duplicate URLs]} for clusters of min_size pages or more"""
+        members = {}
+        with self._lock:
+            for page in self.url_ids.values():
+                # Pages whose original was retired are left out until re-added
+                if self.original[page] >= 0 and self.live[self.original[page]]:
+                    members.setdefault(self.urls[self.original[page]], []).append(self.urls[page])
+        return {url: duplicates for url, duplicates in members.items() if len(duplicates) + 1 >= min_size}
+
+# Built-in suggestion and developer-recommendation rules. Each rule fires when
+# all of its conditions hold; a condition is "feature op number", "feature",
+# "not feature" or "always" over the fields of RULE_FEATURES. Messages may
+# use {feature} placeholders. Rules are reported in the order listed here.
+DEFAULT_RULES = [
+    {'id': 'title-missing', 'kind': 'suggestion', 'severity': 'error',
+     'when': ['title_length == 0'],
+     'message': "Add a title tag with primary keywords (50-60 characters)"},
+    {'id': 'title-too-long', 'kind': 'suggestion', 'severity': 'warning',
+     'when': ['title_length > 60'],
+     'message': "Shorten your title tag (currently too long)"},
+    {'id': 'description-missing', 'kind': 'suggestion', 'severity': 'error',
+     'when': ['description_length == 0'],
+     'message': "Add a meta description (120-160 characters)"},
+    {'id': 'description-too-long', 'kind': 'suggestion', 'severity': 'warning',
+     'when': ['description_length > 160'],
+     'message': "Shorten your meta description (currently too long)"},
+    {'id': 'h1-missing', 'kind': 'suggestion', 'severity': 'error',
+     'when': ['h1_count == 0'],
+     'message': "Add exactly one H1 heading with your main keyword"},
+    {'id': 'h1-multiple', 'kind': 'suggestion', 'severity': 'warning',
+     'when': ['h1_count > 1'],
+     'message': "Reduce to one H1 heading per page"},
+    {'id': 'images-missing-alt', 'kind': 'suggestion', 'severity': 'warning',
+     'when': ['images_without_alt > 0'],
+     'message': "Add alt text to {images_without_alt} images"},
+    {'id': 'thin-content', 'kind': 'suggestion', 'severity': 'warning',
+     'when': ['keyword_count < 5', 'not duplicate'],
+     'message': "Add more content with relevant keywords"},
+    {'id': 'duplicate-content', 'kind': 'suggestion', 'severity': 'warning',
+     'when': ['duplicate'],
+     'message': "Near-duplicate of {duplicate_of}: make the content distinct or add a canonical link to that page"},
+    {'id': 'slow-page', 'kind': 'suggestion', 'severity': 'warning',
+     'when': ['load_time > 2'],
+     'message': "Optimize page speed by compressing images and minimizing resources"},
+    {'id': 'not-mobile-friendly', 'kind': 'suggestion', 'severity': 'error',
+     'when': ['not mobile_friendly'],
+     'message': "Improve mobile responsiveness with proper viewport settings"},
+    
+    {'id': 'semantic-html', 'kind': 'developer', 'severity': 'info',
+     'when': ['always'],
+     'message': "Ensure proper use of semantic HTML5 elements"},
+    {'id': 'lazy-load-images', 'kind': 'developer', 'severity': 'warning',
+     'when': ['load_time > 2'],
+     'message': "Implement lazy loading for images"},
+    {'id': 'minify-assets', 'kind': 'developer', 'severity': 'warning',
+     'when': ['load_time > 2'],
+     'message': "Minify CSS and JavaScript files"},
+    {'id': 'browser-caching', 'kind': 'developer', 'severity': 'warning',
+     'when': ['load_time > 2'],
+     'message': "Enable browser caching"},
+    {'id': 'use-cdn', 'kind': 'developer', 'severity': 'warning',
+     'when': ['load_time > 2'],
+     'message': "Consider using a CDN for static assets"},
+    {'id': 'page-truncated', 'kind': 'developer', 'severity': 'error',
+     'when': ['truncated'],
+     'message': "Reduce the HTML document size; only its first part could be analyzed"},
+    {'id': 'render-blocking', 'kind': 'developer', 'severity': 'warning',
+     'when': ['render_blocking > 0'],
+     'message': "Defer or async {render_blocking} render-blocking scripts and stylesheets"},
+    {'id': 'text-compression', 'kind': 'developer', 'severity': 'warning',
+     'when': ['uncompressed_resources > 0'],
+     'message': "Serve {uncompressed_resources} text resources (HTML, scripts, stylesheets) with gzip or Brotli compression"},
+    {'id': 'page-weight', 'kind': 'developer', 'severity': 'warning',
+     'when': ['page_bytes > 2500000'],
+     'message': "Reduce total page weight ({page_bytes:,} bytes)"},
+    {'id': 'image-weight', 'kind': 'developer', 'severity': 'warning',
+     'when': ['image_bytes > 1000000'],
+     'message': "Compress images or serve modern formats ({image_bytes:,} bytes of images)"},
+    {'id': 'request-count', 'kind': 'developer', 'severity': 'info',
+     'when': ['resource_requests > 50'],
+     'message': "Bundle assets to cut the number of requests ({resource_requests})"},
+    {'id': 'viewport-missing', 'kind': 'developer', 'severity': 'error',
+     'when': ['not viewport'],
+     'message': "Add responsive viewport meta tag: <meta name='viewport' content='width=device-width, initial-scale=1'>"},
+    {'id': 'mobile-friendly-test', 'kind': 'developer', 'severity': 'warning',
+     'when': ['not mobile_friendly'],
+     'message': "Test mobile responsiveness using Google's Mobile-Friendly Test"},
+    {'id': 'alt-accessibility', 'kind': 'developer', 'severity': 'warning',
+     'when': ['images_without_alt > 0'],
+     'message': "Add alt attributes to all images for accessibility"},
+    {'id': 'https', 'kind': 'developer', 'severity': 'info',
+     'when': ['always'],
+     'message': "Ensure site uses HTTPS for all pages"},
+    {'id': 'security-headers', 'kind': 'developer', 'severity': 'info',
+     'when': ['always'],
+     'message': "Implement security headers (CSP, X-Frame-Options, etc.)"},
+]
+
+RULE_KINDS = ('suggestion', 'developer')
+RULE_OPERATORS = ('<', '<=', '>', '>=', '==', '!=')
+# Format specs a rule message may put on a field: [[fill]align][sign][#][0]
+# [width][grouping][.precision][type]. Messages are compiled into f-strings,
+# so nothing that could nest a replacement field or end the string literal
+# gets through
+RULE_FORMAT_SPEC = re.compile(r"(?:[^{}\\'\"\x00-\x1f]?[<>=^])?[+\- ]?#?0?\d*[,_]?(?:\.\d+)?[bcdeEfFgGnosxX%]?")
+
+# Fields rules can test, as Python expressions over an analysis result `data`
+RULE_FEATURES = {
+    'title_length': "len(data['meta']['title'])",
+    'description_length': "len(data['meta']['description'])",
+    'meta_keywords': "len(data['meta']['keywords'])",
+    'viewport': "bool(data['meta']['viewport'])",
+    'h1_count': "len(data['headings']['h1'])",
+    'image_count': "data['images']['count']",
+    'images_without_alt': "data['images']['without_alt']",
+    'internal_links': "data['links']['internal']",
+    'external_links': "data['links']['external']",
+    'keyword_count': "len(data['keywords'])",
+    'load_time': "data['load_time']",
+    'mobile_friendly': "bool(data['mobile_friendly'])",
+    # Measured page weight (measure_resources); all zero when not measured
+    'page_bytes': "(data.get('resources') or {}).get('bytes', 0)",
+    'resource_requests': "(data.get('resources') or {}).get('requests', 0)",
+    'render_blocking': "(data.get('resources') or {}).get('render_blocking', 0)",
+    'uncompressed_resources': "(data.get('resources') or {}).get('uncompressed', 0)",
+    'image_bytes': "(data.get('resources') or {}).get('by_kind', {}).get('image', {}).get('bytes', 0)",
+    'truncated': "bool(data.get('truncated'))",
+    'duplicate': "bool(data.get('duplicate_of'))",
+    'duplicate_of': "data.get('duplicate_of') or ''",
+}
+
+def _condition_source(text):
+    # A rule condition as a Python expression over f_<feature> locals
+    words = text.split()
+    if words == ['always']:
+        return 'True', ()
+    if len(words) == 1 and words[0] in RULE_FEATURES:
+        return f"f_{words[0]}", (words[0],)
+    if len(words) == 2 and words[0] == 'not' and words[1] in RULE_FEATURES:
+        return f"not f_{words[1]}", (words[1],)
+    if len(words) == 3 and words[0] in RULE_FEATURES and words[1] in RULE_OPERATORS:
+        try:
+            value = float(words[2])
+        except ValueError:
+            raise ValueError(f"Bad number in rule condition {text!r}")
+        # Integral thresholds stay ints: int-to-int comparisons are cheaper
+        literal = repr(int(value)) if value.is_integer() else repr(value)
+        return f"f_{words[0]} {words[1]} {literal}", (words[0],)
+    raise ValueError(f"Bad rule condition {text!r}")
+
+class RuleSet:
+    """Rule definitions (see DEFAULT_RULES) compiled into one Python function
+    
+    The conditions are checked once at construction and turned into a
+    generated function that computes only the features the rules use and
+    tests every rule inline, so evaluating a page costs about as much as
+    hand-written if-chains. evaluate_batch() runs the same code in a loop.
+    
+    With profile=True the generated code also times each rule, and `stats`
+    maps rule id -> [pages evaluated, pages matched, seconds].
+    """
+    
+    def __init__(self, rules=None, profile=False):
+        self.profile = profile
+        self.rules = []
+        for position, rule in enumerate(DEFAULT_RULES if rules is None else rules, 1):
+            if not isinstance(rule, dict):
+                raise ValueError(f"Rule #{position} is not an object")
+            name = repr(rule['id']) if isinstance(rule.get('id'), str) else f"#{position}"
+            for field in ('id', 'when', 'message'):
+                if field not in rule:
+                    raise ValueError(f"Rule {name} has no {field!r}")
+            if not isinstance(rule['id'], str) or not isinstance(rule['message'], str):
+                raise ValueError(f"Rule {name} needs a string id and message")
+            when = rule['when']
+            if not (isinstance(when, str) or
+                    isinstance(when, list) and when and all(isinstance(text, str) for text in when)):
+                raise ValueError(f"Rule {name} needs 'when' as a condition or a list of them")
+            rule = dict(rule)
+            rule.setdefault('kind', 'suggestion')
+            rule.setdefault('severity', 'warning')
+            if isinstance(rule['when'], str):
+                rule['when'] = [rule['when']]
+            if rule['kind'] not in RULE_KINDS:
+                raise ValueError(f"Rule {rule['id']!r} has unknown kind {rule['kind']!r}")
+            if any(r['id'] == rule['id'] for r in self.rules):
+                raise ValueError(f"Duplicate rule id {rule['id']!r}")
+            self.rules.append(rule)
+        self.stats = {rule['id']: [0, 0, 0.0] for rule in self.rules}
+        self._evaluate_page, self._evaluate_batch, self._findings = self._compile()
+    
+    @classmethod
+    def from_file(cls, path, profile=False):
+        """Load rules from a JSON file holding a list of rule objects"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), profile=profile)
+    
+    def _compile(self):
+        checks = []
+        message_fields = set()
+        namespace = {'_clock': time.perf_counter}
+        for i, rule in enumerate(self.rules):
+            parts = [_condition_source(text) for text in rule['when']]
+            sources = [source for source, _ in parts if source != 'True']
+            condition = ' and '.join(f"({source})" for source in sources) or 'True'
+            
+            message = rule['message']
+            # Messages become string constants, or f-strings over the features
+            template = []
+            has_fields = False
+            try:
+                fields = list(string.Formatter().parse(message))
+            except ValueError as e:
+                raise ValueError(f"Rule {rule['id']!r} has a bad message: {e}")
+            for literal, field, spec, conversion in fields:
+                template.append(literal.replace('{', '{{').replace('}', '}}'))
+                if field is None:
+                    continue
+                if field not in RULE_FEATURES:
+                    raise ValueError(f"Rule {rule['id']!r} message uses unknown field {field!r}")
+                if conversion not in (None, 'r', 's', 'a') or not RULE_FORMAT_SPEC.fullmatch(spec):
+                    raise ValueError(f"Rule {rule['id']!r} message has a bad format for {field!r}")
+                has_fields = True
+                message_fields.add(field)
+                template.append('{f_' + field + (f'!{conversion}' if conversion else '') +
+                                (f':{spec}' if spec else '') + '}')
+            render = 'f' + repr(''.join(template)) if has_fields else repr(message)
+            namespace[f'_r{i}'] = (rule['id'], rule['kind'], rule['severity'])
+            namespace[f'_s{i}'] = self.stats[rule['id']]
+            checks.append((i, rule['kind'], condition, render))
+        
+        messages = [f"_{kind} = []" for kind in RULE_KINDS]
+        previous = None
+        for i, kind, condition, render in checks:
+            if self.profile:
+                messages += [f"_t = _clock()",
+                             f"_hit = {condition}",
+                             f"_s{i}[2] += _clock() - _t",
+                             f"_s{i}[0] += 1",
+                             f"if _hit:",
+                             f"    _s{i}[1] += 1",
+                             f"    _{kind}.append({render})"]
+            elif condition == 'True':
+                messages.append(f"_{kind}.append({render})")
+            elif condition == previous:
+                # Adjacent rules with the same condition share one test
+                messages.append(f"    _{kind}.append({render})")
+            else:
+                messages += [f"if {condition}:", f"    _{kind}.append({render})"]
+            previous = condition
+        result = '{' + ', '.join(f"{kind!r}: _{kind}" for kind in RULE_KINDS) + '}'
+        
+        findings = ["_found = []"]
+        for i, kind, condition, render in checks:
+            findings += [f"if {condition}:", f"    _found.append(_r{i} + ({render},))"]
+        
+        # Only the features some rule needs are computed, in RULE_FEATURES
+        # order; a feature only one condition uses is inlined instead
+        names = '|'.join(RULE_FEATURES)
+        def with_features(lines):
+            uses = Counter(re.findall(rf'\bf_({names})\b', '\n'.join(lines)))
+            for field in message_fields:
+                uses[field] += 2    # f-strings can't hold the subscript quotes
+            setup = [f"f_{name} = {source}" for name, source in RULE_FEATURES.items()
+                     if uses[name] > 1]
+            def inline(match):
+                name = match.group(2)
+                if uses[name] > 1:
+                    return match.group(0)
+                source = RULE_FEATURES[name]
+                if match.group(1) and source.startswith('bool('):
+                    source = source[5:-1]   # `not` already takes the truth value
+                return f"{match.group(1) or ''}({source})"
+            return setup + [re.sub(rf'(not )?\bf_({names})\b', inline, line) for line in lines]
+        messages = with_features(messages)
+        findings = with_features(findings)
+        
+        def function(header, lines):
+            return header + '\n' + ''.join(f"    {line}\n" for line in lines)
+        source = (function("def _evaluate_page(data):", messages + [f"return {result}"]) +
+                  function("def _evaluate_batch(records):",
+                           ["_results = []", "for data in records:"] +
+                           ['    ' + line for line in messages] +
+                           [f"    _results.append({result})", "return _results"]) +
+                  function("def _findings(data):", findings + ["return _found"]))
+        exec(compile(source, '<seo rules>', 'exec'), namespace)
+        return namespace['_evaluate_page'], namespace['_evaluate_batch'], namespace['_findings']
+    
+    def evaluate(self, data):
+        """{'suggestion': [...], 'developer': [...]} messages for one result"""
+        return self._evaluate_page(data)
+    
+    def evaluate_batch(self, records):
+        """evaluate() for many results"""
+        return self._evaluate_batch(records)
+    
+    def findings(self, data):
+        """(rule id, kind, severity, message) for every rule one result triggers"""
+        return self._findings(data)
+
+_default_rule_set = None
+
+def default_rule_set():
+    """DEFAULT_RULES compiled once per process"""
+    global _default_rule_set
+    if _default_rule_set is None:
+        _default_rule_set = RuleSet(DEFAULT_RULES)
+    return _default_rule_set
+
+class FastKeywordExtractor:
+    """RAKE-style keyword candidates without NLTK tokenizers or TextBlob
+    
+    One precompiled regex splits the text at stopwords and punctuation.
+    The resulting phrases are scored by RAKE's word degree / frequency
+    ratio and the top `rake_limit` kept, as rake_nltk does. Noun phrases
+    are approximated without tagging: runs of capitalized words (proper
+    nouns) and stopword-free phrases of 2 to `max_phrase_words` words,
+    counted per occurrence. The Counter has the same shape as
+    SEOAnalyzer.keyword_candidates; `python -m benchmarks.suite keywords`
+    measures how close the two come.
+    """
+    
+    def __init__(self, stop_words, rake_limit=20, max_phrase_words=3):
+        self.rake_limit = rake_limit
+        self.max_phrase_words = max_phrase_words
+        # Longest first, so a stopword is never cut short by a shorter one
+        words = sorted((re.escape(word) for word in stop_words), key=len, reverse=True)
+        self._splitter = re.compile(r"[^\w\s]+|\b(?:" + "|".join(words) + r")\b", re.IGNORECASE)
+    
+    def candidates(self, text):
+        return self.candidates_batch([text])[0]
+    
+    def candidates_batch(self, texts):
+        """One candidate Counter per text"""
+        split = self._splitter.split
+        nlargest = heapq.nlargest
+        rake_limit = self.rake_limit
+        max_words = self.max_phrase_words
+        results = []
+        for text in texts:
+            phrases = []
+            noun_phrases = []
+            frequency = Counter()
+            degree = Counter()
+            for chunk in split(text):
+                words = chunk.split()
+                if not words:
+                    continue
+                proper = []
+                for word in words:
+                    if word[0].isupper():
+                        proper.append(word)
+                    elif proper:
+                        noun_phrases.append(' '.join(proper).lower())
+                        proper = []
+                words = chunk.lower().split()
+                if len(proper) == len(words) or not 2 <= len(words) <= max_words:
+                    if proper:
+                        noun_phrases.append(' '.join(proper).lower())
+                else:
+                    noun_phrases.append(' '.join(words))
+                phrases.append(words)
+                frequency.update(words)
+                length = len(words)
+                for word in words:
+                    degree[word] += length
+            # Repeated phrases are ranked once per occurrence, as in rake_nltk
+            ranked = nlargest(rake_limit, ((sum(degree[word] / frequency[word] for word in words),
+                                            ' '.join(words)) for words in phrases))
+            candidates = Counter(phrase for _, phrase in ranked)
+            candidates.update(noun_phrases)
+            results.append(candidates)
+        return results
+
+class SEOAnalyzer:
+    # 'soup' parses the whole document with BeautifulSoup; 'stream' feeds the
+    # response body through StreamingPage while it downloads
+    ENGINES = ('soup', 'stream')
+    KEYWORD_MODES = ('nlp', 'fast')
+    
+    def __init__(self, engine='soup', user_agent=None, sessions=None, cache=None, memo=None,
+                 keyword_index=None, rules=None, measure_resources=False, resource_concurrency=16,
+                 keyword_mode='nlp', metrics=None, max_bytes=DEFAULT_MAX_BYTES, duplicate_index=None,
+                 skip_duplicate_keywords=False, fingerprints=False):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {self.ENGINES}")
+        if keyword_mode not in self.KEYWORD_MODES:
+            raise ValueError(f"Unknown keyword mode {keyword_mode!r}, expected one of {self.KEYWORD_MODES}")
+        self.engine = engine
+        # 'nlp' is RAKE plus TextBlob noun phrases; 'fast' is FastKeywordExtractor
+        self.keyword_mode = keyword_mode
+        self.headers = {
+            'User-Agent': user_agent or DEFAULT_USER_AGENT,
+            # Bodies are decompressed by BodyReader, so ask only for what it decodes
+            'Accept-Encoding': accepted_encodings()
+        }
+        # Decoded bytes read from any one page before the rest is cut off
+        self.max_bytes = max_bytes
+        self.sessions = sessions or DEFAULT_SESSIONS
+        # Optional ResponseCache for conditional re-fetches
+        self.cache = cache
+        # Optional AnalysisMemo shared by pages with identical HTML
+        self.memo = memo
+        # Optional SiteKeywordIndex; keywords are then ranked against the site
+        self.keyword_index = keyword_index
+        self.last_keyword_candidates = None
+        # Optional DuplicateIndex flagging near-duplicate pages; their keywords
+        # can be skipped. fingerprints alone only records each page's SimHash
+        self.duplicate_index = duplicate_index
+        self.skip_duplicate_keywords = skip_duplicate_keywords
+        self.fingerprints = fingerprints or duplicate_index is not None
+        # RuleSet producing the suggestions and developer recommendations
+        self.rules = rules or default_rule_set()
+        # Size the page's images, scripts and stylesheets too (network heavy)
+        self.measure_resources_enabled = measure_resources
+        self.resource_concurrency = resource_concurrency
+        self._resource_executor = None
+        self._stop_words = None
+        # Keyword extractors are built on first use and reused for every page
+        self._rake = None
+        self._np_extractor = None
+        self._fast_keywords = None
+        # Optional StageMetrics (or anything with its observe()) timing every stage
+        self.metrics = metrics
+    
+    def _timer(self, stage):
+        return StageTimer(self.metrics, stage) if self.metrics is not None else _NULL_TIMER
+    
+    @property
+    def stop_words(self):
+        if self._stop_words is None:
+            self._stop_words = set(load_stop_words())
+        return self._stop_words
+    
+    def fetch_website_content(self, url, parse=True):
+        """Download a page; with parse=False only the raw HTML is returned and
+        analyze_content parses it later (e.g. in a worker process)
+        
+        With metrics, 'fetch' times the whole call (including a parse done
+        while downloading), 'ttfb' the wait for the response headers, and
+        'connect' (DNS and TCP) and 'tls' any new connection it needed.
+        
+        Unlike analysis, this may run in several threads at once: it keeps
+        its state in locals, sessions are per thread, and the cache, memo
+        and metrics lock their own state.
+        """
+        if self.metrics is None:
+            return self._fetch_website_content(url, parse)
+        _connection_timings.events = []
+        website_data = None
+        start = time.perf_counter()
+        try:
+            website_data = self._fetch_website_content(url, parse)
+            return website_data
+        finally:
+            elapsed = time.perf_counter() - start
+            for stage, seconds in _connection_timings.events:
+                self.metrics.observe(stage, seconds)
+            _connection_timings.events = None
+            if website_data:
+                self.metrics.observe('ttfb', website_data['load_time'])
+            self.metrics.observe('fetch', elapsed, (website_data or {}).get('document_bytes') or 0,
+                                 not website_data)
+    
+    def _fetch_website_content(self, url, parse, revalidate=True):
+        headers = self.headers
+        cached = self.cache.lookup(url) if self.cache is not None and revalidate else None
+        if cached and self.keyword_index is not None and cached.get('result') is not None \
+                and 'keyword_candidates' not in cached['result']:
+            cached = None  # stored without keyword candidates, so it can't be ranked again
+        if cached:
+            # Revalidate instead of downloading again
+            headers = dict(headers)
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        writer = None
+        try:
+            with self.sessions.get().get(url, headers=headers, timeout=10, stream=True) as response:
+                if cached and response.status_code == 304:
+                    website_data = self._not_modified(url, cached, response)
+                    if website_data is None:
+                        # Evicted by another thread since lookup(); download it whole
+                        return self._fetch_website_content(url, parse, revalidate=False)
+                    return website_data
+                response.raise_for_status()
+                
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if self.cache is not None and (etag or last_modified):
+                    writer = self.cache.writer(url, etag, last_modified)
+                
+                # Parse once; every extractor reads from this page
+                page_hash = None
+                body = BodyReader(response, self.max_bytes)
+                if not parse:
+                    html = body.read()
+                    page = None
+                elif self.engine == 'stream':
+                    html = None  # never held in memory as a whole
+                    hasher = ContentHasher() if self.memo is not None else None
+                    page = self.parse_stream(body, sink=writer, hasher=hasher)
+                    page_hash = hasher and hasher.hexdigest()
+                else:
+                    html = body.read()
+                    page = None
+                    if self.memo is not None:
+                        page_hash = content_hash(html)
+                    # A memoized page needs no parse at all
+                    if page_hash is None or self._memo_key({'url': url, 'content_hash': page_hash}) \
+                            not in self.memo:
+                        with self._timer('parse') as timer:
+                            timer.bytes = len(html)
+                            page = self.parse_page(html)
+                
+                if writer is not None:
+                    if html is not None:
+                        writer.write(html)
+                    writer.truncated = body.truncated
+                    writer.commit()
+                    writer = None
+            
+            # Check for mobile responsiveness
+            mobile_friendly = None
+            if page:
+                with self._timer('mobile'):
+                    mobile_friendly = self.check_mobile_responsiveness(page)
+            
+            return {
+                'url': url,
+                'html': html,
+                'page': page,
+                'content_hash': page_hash,
+                # Bytes on the wire, and after decompression
+                'document_bytes': body.transfer_bytes,
+                'decoded_bytes': body.body_bytes,
+                'content_encoding': body.content_encoding,
+                'truncated': body.truncated,
+                'load_time': response.elapsed.total_seconds(),
+                'status': response.status_code,
+                'mobile_friendly': mobile_friendly
+            }
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching URL {url}: {e}", file=sys.stderr)
+            return None
+        finally:
+            if writer is not None:
+                writer.discard()
+    
+    def _not_modified(self, url, cached, response):
+        # A 304 reuses the last analysis when there is one; otherwise the
+        # cached body is analyzed as if it had just been downloaded. None
+        # when that body is gone
+        result = cached.get('result')
+        html = None
+        if result is None:
+            try:
+                html = self.cache.read_body(url)
+            except OSError:
+                return None
+        return {
+            'url': url,
+            'html': html,
+            'page': None,
+            'truncated': cached.get('truncated', False),
+            'load_time': response.elapsed.total_seconds(),
+            'status': response.status_code,
+            'mobile_friendly': None,
+            'not_modified': True,
+            'cached_result': result,
+            'links': cached.get('links')
+        }
+    
+    def parse_page(self, html):
+        """Parse HTML once; the extractors also accept the ParsedPage itself"""
+        if isinstance(html, PAGE_TYPES):
+            return html
+        if self.engine == 'stream':
+            page = StreamingPage()
+            page.feed(html or "")
+            page.close()
+            return page
+        return ParsedPage(html)
+    
+    def parse_stream(self, response, chunk_size=65536, sink=None, hasher=None):
+        """Tokenize a streamed requests response chunk by chunk as it downloads
+        
+        `response` may also be a BodyReader over one, or any iterable of
+        text chunks. Each chunk is also written to `sink` and `hasher` when
+        given.
+        """
+        if isinstance(response, requests.Response):
+            response = BodyReader(response, self.max_bytes, chunk_size)
+        page = StreamingPage()
+        for chunk in response:
+            page.feed(chunk)
+            if sink is not None:
+                sink.write(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+        page.close()
+        return page
+    
+    def check_mobile_responsiveness(self, html):
+        """Simple check for mobile responsiveness"""
+        viewport = self.parse_page(html).metas.get('viewport')
+        if viewport is None:
+            return False
+        
+        # Check for responsive design indicators
+        responsive_indicators = [
+            'width=device-width',
+            'initial-scale=1',
+            'maximum-scale=1',
+            'user-scalable=no'
+        ]
+        
+        content = viewport.lower()
+        return any(indicator in content for indicator in responsive_indicators)
+    
+    def analyze_page(self, url):
+        print(f"\n🔍 Analyzing: {url}", file=sys.stderr)
+        
+        # Fetch website data
+        website_data = self.fetch_website_content(url)
+        if not website_data:
+            return {"error": "Could not fetch website content"}
+        
+        return self.analyze_content(website_data)
+    
+    def analyze_content(self, website_data):
+        """Extract, score and suggest for a page fetch_website_content returned"""
+        for _, seo_data in self.iter_analysis(website_data):
+            pass
+        return seo_data
+    
+    def iter_analysis(self, website_data):
+        """analyze_content in stages, yielding (stage, seo_data) as each is ready
+        
+        Stages are 'details' (meta, headings), 'technical' (links, images,
+        load time, mobile), 'resources' (page weight, only when measuring
+        resources), 'keywords' and finally 'complete' with the full result.
+        A reused result is yielded as 'complete' straight away. With
+        fingerprints, 'keywords' also brings the page's SimHash and, with a
+        duplicate_index, the URL of the page it is a near-duplicate of.
+        
+        With metrics, each extractor is timed as its own stage, as are the
+        parse, the memo lookup, scoring and suggestions.
+        """
+        with self._timer('reuse'):
+            reused = self.reusable_result(website_data)
+        if reused is not None:
+            yield 'complete', reused
+            return
+        
+        html = website_data.get('page')
+        if html is None:
+            with self._timer('parse') as timer:
+                timer.bytes = len(website_data['html'] or '')
+                html = self.parse_page(website_data['html'])
+        
+        # Extract SEO elements, cheapest first
+        with self._timer('meta'):
+            seo_data = {'meta': self.extract_meta_data(html)}
+        with self._timer('headings'):
+            seo_data['headings'] = self.extract_headings(html)
+        yield 'details', seo_data
+        
+        mobile_friendly = website_data.get('mobile_friendly')
+        if mobile_friendly is None:
+            with self._timer('mobile'):
+                mobile_friendly = self.check_mobile_responsiveness(html)
+        with self._timer('links'):
+            seo_data['links'] = self.extract_links(html, website_data.get('url'))
+        with self._timer('images'):
+            seo_data['images'] = self.extract_images(html)
+        seo_data['load_time'] = website_data['load_time']
+        if website_data.get('truncated'):
+            seo_data['truncated'] = True  # only the first max_bytes were analyzed
+        seo_data['mobile_friendly'] = mobile_friendly
+        yield 'technical', seo_data
+        
+        if self.measure_resources_enabled and website_data.get('url'):
+            document_bytes = website_data.get('document_bytes')
+            if document_bytes is None and website_data.get('html') is not None:
+                document_bytes = len(website_data['html'].encode('utf-8'))
+            with self._timer('resources') as timer:
+                seo_data['resources'] = self.measure_resources(website_data['url'], html, document_bytes or 0,
+                                                           website_data.get('content_encoding'),
+                                                           website_data.get('decoded_bytes'))
+                timer.bytes = seo_data['resources']['bytes']
+            yield 'resources', seo_data
+        
+        if self.fingerprints:
+            with self._timer('fingerprint'):
+                seo_data['fingerprint'] = f"{simhash(self.extract_text_from_html(html)):016x}"
+            self.check_duplicate(website_data.get('url'), seo_data)
+        candidates = None
+        if seo_data.get('duplicate_of') and self.skip_duplicate_keywords:
+            seo_data['keywords'] = []  # the original page has them
+        else:
+            with self._timer('keywords'):
+                seo_data['keywords'] = self.extract_keywords(html, website_data.get('url'))
+            candidates = self.last_keyword_candidates
+        yield 'keywords', seo_data
+        
+        # Same field order as always, for anything that serializes the result
+        seo_data = {field: seo_data[field] for field in
+                    ('meta', 'headings', 'keywords', 'links', 'images', 'load_time', 'mobile_friendly',
+                     'resources', 'truncated', 'fingerprint', 'duplicate_of') if field in seo_data}
+        self.score_and_suggest(seo_data)
+        
+        self.record_result(website_data, seo_data, candidates)
+        yield 'complete', seo_data
+    
+    def _memo_key(self, website_data):
+        # The content hash, scoped to the page's host: link counts depend on
+        # it, so the same HTML on another host is a different entry. Measured
+        # resources are resolved against the page's directory, so with
+        # measure_resources that is the scope
+        page_hash = website_data.get('content_hash')
+        if not page_hash and website_data.get('html') is not None:
+            page_hash = content_hash(website_data['html'])
+        url = website_data.get('url')
+        if not page_hash or not url:
+            return page_hash or None
+        if self.measure_resources_enabled:
+            return f"{page_hash} {urljoin(url, '.')}"
+        return f"{page_hash} {urlparse(url).netloc.lower()}"
+    
+    def reusable_result(self, website_data):
+        """A finished seo_data for a page that needs no re-analysis, or None
+        
+        That is an unchanged page (304) with a cached result, or HTML whose
+        content hash is in the memo for the page's host (or, measuring
+        resources, its directory). Only the load-time dependent fields are
+        recomputed, and the keywords, from the stored candidates: with a
+        keyword_index the page is added to it and ranked against the site
+        as it is now. A memoized result stored without candidates is not
+        reused then.
+        """
+        key = None
+        if website_data.get('cached_result') is not None:
+            seo_data = dict(website_data['cached_result'])
+        elif self.memo is not None:
+            key = self._memo_key(website_data)
+            seo_data = self.memo.get(key) if key else None
+            if seo_data is None:
+                return None
+        else:
+            return None
+        candidates = seo_data.pop('keyword_candidates', None)
+        if candidates is None and self.keyword_index is not None and key:
+            return None
+        url = website_data.get('url')
+        if candidates:
+            candidates = Counter(candidates)
+            if self.keyword_index is None:
+                seo_data['keywords'] = [kw for kw, _ in candidates.most_common(15)]
+            else:
+                if url:
+                    self.keyword_index.add_page(url, candidates)
+                seo_data['keywords'] = self.keyword_index.rank(candidates, 15)
+        seo_data['load_time'] = website_data['load_time']
+        # Its original may be gone, or it may now be one itself
+        self.check_duplicate(url, seo_data)
+        self.score_and_suggest(seo_data)
+        if key and self.cache is not None and url:
+            # A fresh download: its new validators need the result next to them
+            self.cache.store_result(url, self._stored_result(seo_data, candidates), content_hash=key)
+        return seo_data
+    
+    def check_duplicate(self, page_id, seo_data):
+        """Look the result's fingerprint up in (and add it to) the
+        duplicate_index, setting or clearing its duplicate_of"""
+        if self.duplicate_index is None or 'fingerprint' not in seo_data:
+            return seo_data
+        seo_data.pop('duplicate_of', None)
+        original = self.duplicate_index.add(page_id, int(seo_data['fingerprint'], 16))
+        if original is not None:
+            seo_data['duplicate_of'] = original
+        return seo_data
+    
+    def record_result(self, website_data, seo_data, candidates=None):
+        """Keep a fresh analysis in the response cache and memo, with the
+        page's keyword candidates when a keyword_index ranks them"""
+        key = self._memo_key(website_data) if self.memo is not None else None
+        stored = self._stored_result(seo_data, candidates)
+        if self.cache is not None and website_data.get('url'):
+            self.cache.store_result(website_data['url'], stored, content_hash=key)
+        if key:
+            self.memo.put(key, stored)
+    
+    def _stored_result(self, seo_data, candidates):
+        # Candidates let a reused result be ranked against the site again
+        if self.keyword_index is None:
+            return seo_data
+        return dict(seo_data, keyword_candidates=dict(candidates or {}))
+    
+    def score_and_suggest(self, seo_data):
+        """Fill in the scores and suggestions from the extracted fields"""
+        # Calculate scores
+        with self._timer('scoring'):
+            seo_data['seo_score'] = self.calculate_seo_score(seo_data)
+            seo_data['performance_score'] = self.calculate_performance_score(seo_data)
+            seo_data['mobile_score'] = self.calculate_mobile_score(seo_data)
+        
+        # Generate suggestions
+        with self._timer('suggestions'):
+            messages = self.rules.evaluate(seo_data)
+        seo_data['suggestions'] = messages['suggestion']
+        seo_data['developer_recommendations'] = messages['developer']
+        
+        return seo_data
+    
+    def extract_meta_data(self, html):
+        page = self.parse_page(html)
+        metas = page.metas
+        return {
+            'title': page.title if page.title is not None else "",
+            'description': metas.get('description', ""),
+            'keywords': metas['keywords'].split(',') if 'keywords' in metas else [],
+            'viewport': 'viewport' in metas
+        }
+    
+    def extract_headings(self, html):
+        page = self.parse_page(html)
+        return {level: list(texts) for level, texts in page.headings.items()}
+    
+    def extract_keywords(self, html, page_id=None):
+        """Top 15 keyword phrases
+        
+        Without a keyword_index they are the most frequent candidates. With
+        one, the page is added to the index under page_id (when given) and
+        its candidates are ranked by BM25 against the site.
+        """
+        candidates = self.keyword_candidates(html)
+        self.last_keyword_candidates = candidates
+        if self.keyword_index is None:
+            return [kw for kw, _ in candidates.most_common(15)]
+        if page_id is not None:
+            self.keyword_index.add_page(page_id, candidates)
+        return self.keyword_index.rank(candidates, 15)
+    
+    def apply_keyword_index(self, page_id, seo_data, candidates):
+        """Re-rank keywords extracted elsewhere (e.g. in a worker) against the site"""
+        self.keyword_index.add_page(page_id, candidates)
+        seo_data['keywords'] = self.keyword_index.rank(candidates, 15)
+        return self.score_and_suggest(seo_data)
+    
+    def keyword_candidates(self, html):
+        """Candidate phrases with counts: RAKE's top 20 plus short noun phrases"""
+        text = self.extract_text_from_html(html)
+        if self.keyword_mode == 'fast':
+            return self.fast_keywords.candidates(text)
+        
+        # The NLP libraries are imported on first use, not at startup
+        from rake_nltk import Rake
+        from textblob import TextBlob
+        from textblob.np_extractors import FastNPExtractor
+        
+        # RAKE keywords
+        if self._rake is None:
+            self._rake = Rake(stopwords=self.stop_words)
+        r = self._rake
+        r.extract_keywords_from_text(text)
+        rake_keywords = r.get_ranked_phrases()[:20]
+        
+        # TextBlob keywords
+        if self._np_extractor is None:
+            self._np_extractor = FastNPExtractor()
+        blob = TextBlob(text, np_extractor=self._np_extractor)
+        tb_keywords = [np for np in blob.noun_phrases if len(np.split()) < 4]
+        
+        # Combine
+        return Counter(rake_keywords + tb_keywords)
+    
+    def keyword_candidates_batch(self, pages):
+        """keyword_candidates for many pages (HTML or parsed) in one call"""
+        if self.keyword_mode != 'fast':
+            return [self.keyword_candidates(html) for html in pages]
+        return self.fast_keywords.candidates_batch([self.extract_text_from_html(html) for html in pages])
+    
+    @property
+    def fast_keywords(self):
+        if self._fast_keywords is None:
+            self._fast_keywords = FastKeywordExtractor(self.stop_words)
+        return self._fast_keywords
+    
+    def extract_text_from_html(self, html):
+        if not html:
+            return ""
+            
+        try:
+            # Visible text, without NON_CONTENT_TAGS, is gathered during the parse
+            return self.parse_page(html).text
+        except Exception as e:
+            print(f"Error parsing HTML: {e}", file=sys.stderr)
+            return ""
+    
+    def extract_links(self, html, base_url=None):
+        """Link counts; internal, external and other (mailto:, tel:,
+        javascript: ...) add up to count. With the page's URL, links are
+        resolved against it and internal means the same host, otherwise any
+        relative link counts as internal"""
+        links = self.parse_page(html).links
+        host = urlparse(base_url).netloc.lower() if base_url else None
+        internal = external = other = 0
+        for href in links:
+            href = href.strip()
+            target = urlparse(urljoin(base_url, href) if base_url else href)
+            if target.scheme not in ('http', 'https', ''):
+                other += 1
+            elif target.netloc.lower() == (host or ''):
+                internal += 1
+            else:
+                external += 1
+        return {'count': len(links), 'internal': internal, 'external': external, 'other': other}
+    
+    def extract_images(self, html):
+        images = self.parse_page(html).images
+        with_alt = sum(1 for alt in images if alt.strip())
+        return {
+            'count': len(images),
+            'with_alt': with_alt,
+            'without_alt': len(images) - with_alt
+        }
+    
+    def extract_resources(self, html):
+        """(kind, src/href, render blocking) for images, scripts and stylesheets"""
+        return list(self.parse_page(html).resources)
+    
+    def measure_resources(self, url, html, document_bytes=0, document_encoding=None, decoded_bytes=None):
+        """Page weight from the sizes of the page's subresources
+        
+        Every image, script and stylesheet is resolved against the page URL
+        and sized concurrently over the shared session pool: a HEAD request,
+        or when that gives no Content-Length a one-byte Range request whose
+        Content-Range carries the total. Nothing is fully downloaded unless
+        the server supports neither. The document itself counts as
+        uncompressed when fetched with no Content-Encoding.
+        """
+        resources = {}
+        blocking = set()
+        for kind, src, blocks in self.extract_resources(html):
+            target = normalize_url(urljoin(url, src.strip()))
+            if target is None:
+                continue  # data: URIs and the like cost no request
+            resources.setdefault(target, kind)
+            if blocks:
+                blocking.add(target)
+        
+        if self._resource_executor is None:
+            self._resource_executor = ThreadPoolExecutor(max_workers=self.resource_concurrency)
+        probes = list(self._resource_executor.map(self._probe_resource, resources))
+        
+        by_kind = {}
+        total = document_bytes
+        failed = 0
+        uncompressed = int(document_encoding == 'identity' and (decoded_bytes or 0) > 1400)
+        for target, (size, encoding) in zip(resources, probes):
+            kind = resources[target]
+            totals = by_kind.setdefault(kind, {'count': 0, 'bytes': 0})
+            totals['count'] += 1
+            if size is None:
+                failed += 1
+                continue
+            totals['bytes'] += size
+            total += size
+            # Text worth compressing that came back without Content-Encoding
+            if kind != 'image' and size > 1400 and not encoding:
+                uncompressed += 1
+        return {
+            'requests': 1 + len(resources),
+            'bytes': total,
+            'by_kind': by_kind,
+            'render_blocking': len(blocking),
+            'uncompressed': uncompressed,
+            'failed': failed
+        }
+    
+    def _probe_resource(self, url):
+        # (transfer size or None, Content-Encoding) of one resource
+        session = self.sessions.get()
+        headers = dict(self.headers)
+        try:
+            response = session.head(url, headers=headers, timeout=10, allow_redirects=True)
+            if response.ok and response.headers.get('Content-Length', '').isdigit():
+                return int(response.headers['Content-Length']), response.headers.get('Content-Encoding')
+            headers['Range'] = 'bytes=0-0'
+            with session.get(url, headers=headers, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                encoding = response.headers.get('Content-Encoding')
+                total = response.headers.get('Content-Range', '').rpartition('/')[2]
+                if response.status_code == 206 and total.isdigit():
+                    return int(total), encoding
+                if response.headers.get('Content-Length', '').isdigit():
+                    return int(response.headers['Content-Length']), encoding
+                # Neither HEAD nor Range told us: count the bytes on the wire,
+                # up to max_bytes
+                size = 0
+                for chunk in response.raw.stream(65536, decode_content=False):
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        break
+                return size, encoding
+        except requests.exceptions.RequestException:
+            return None, None
+    
+    def calculate_seo_score(self, data):
+        score = 0
+        
+        # Title (10 points)
+        title = data['meta']['title']
+        if title:
+            score += 5
+            if 50 <= len(title) <= 60:
+                score += 5
+        
+        # Description (10 points)
+        description = data['meta']['description']
+        if description:
+            score += 5
+            if 120 <= len(description) <= 160:
+                score += 5
+        
+        # Keywords (5 points)
+        if data['meta']['keywords']:
+            score += 5
+        
+        # Headings (15 points)
+        if data['headings']['h1']:
+            score += 5
+            if len(data['headings']['h1']) == 1:
+                score += 5
+        if any(data['headings'][f'h{i}'] for i in range(2, 7)):
+            score += 5
+        
+        # Images (10 points)
+        if data['images']['count'] > 0:
+            score += 5
+            if data['images']['with_alt'] / data['images']['count'] > 0.8:
+                score += 5
+        
+        # Links (10 points)
+        if data['links']['internal'] > 5:
+            score += 5
+        if data['links']['external'] > 2:
+            score += 5
+        
+        # Viewport (5 points)
+        if data['meta']['viewport']:
+            score += 5
+        
+        # Content (15 points)
+        if len(data['keywords']) >= 5:
+            score += 15
+        
+        # Load time (15 points)
+        if data['load_time'] < 2:
+            score += 15
+        elif data['load_time'] < 4:
+            score += 10
+        
+        return min(100, math.ceil(score))
+    
+    def calculate_performance_score(self, data):
+        if data.get('resources'):
+            return self.calculate_measured_performance_score(data)
+        # Simplified performance score based on load time
+        if data['load_time'] < 1:
+            return 95
+        elif data['load_time'] < 2:
+            return 85
+        elif data['load_time'] < 3:
+            return 70
+        elif data['load_time'] < 4:
+            return 50
+        else:
+            return 30
+    
+    def calculate_measured_performance_score(self, data):
+        # From measure_resources: start at 100 and take off for slow first
+        # response, page weight, request count, render blocking and
+        # uncompressed text
+        resources = data['resources']
+        score = 100
+        
+        load_time = data['load_time']
+        if load_time >= 4:
+            score -= 35
+        elif load_time >= 3:
+            score -= 25
+        elif load_time >= 2:
+            score -= 15
+        elif load_time >= 1:
+            score -= 5
+        
+        if resources['bytes'] > 5000000:
+            score -= 30
+        elif resources['bytes'] > 2500000:
+            score -= 20
+        elif resources['bytes'] > 1000000:
+            score -= 10
+        
+        if resources['requests'] > 100:
+            score -= 15
+        elif resources['requests'] > 50:
+            score -= 8
+        
+        score -= min(25, 5 * resources['render_blocking'])
+        score -= min(15, 5 * resources['uncompressed'])
+        return max(0, score)
+    
+    def calculate_mobile_score(self, data):
+        # Score based on mobile responsiveness
+        score = 0
+        
+        # Viewport (30 points)
+        if data['meta']['viewport']:
+            score += 30
+        
+        # Mobile friendly (70 points)
+        if data['mobile_friendly']:
+            score += 70
+        
+        return score
+    
+    def generate_suggestions(self, data):
+        return self.rules.evaluate(data)['suggestion']
+    
+    def generate_dev_recommendations(self, data):
+        return self.rules.evaluate(data)['developer']
+
+# The page features the three scores depend on, in BatchScorer column order
+SCORE_FEATURES = ('title_length', 'description_length', 'meta_keywords', 'h1_count',
+                  'subheadings', 'image_count', 'images_with_alt', 'internal_links',
+                  'external_links', 'viewport', 'keyword_count', 'load_time', 'mobile_friendly',
+                  'measured', 'page_bytes', 'request_count', 'render_blocking',
+                  'uncompressed_resources')
+
+def score_features(data):
+    """One page's SCORE_FEATURES as a tuple of numbers"""
+    meta = data['meta']
+    headings = data['headings']
+    images = data['images']
+    resources = data.get('resources') or {}
+    return (len(meta['title']), len(meta['description']), bool(meta['keywords']),
+            len(headings['h1']), any(headings[f'h{i}'] for i in range(2, 7)),
+            images['count'], images['with_alt'], data['links']['internal'],
+            data['links']['external'], bool(meta['viewport']), len(data['keywords']),
+            data['load_time'], bool(data['mobile_friendly']),
+            bool(resources), resources.get('bytes', 0), resources.get('requests', 0),
+            resources.get('render_blocking', 0), resources.get('uncompressed', 0))
+
+class BatchScorer:
+    """Columnar, NumPy-vectorized version of the calculate_*_score rules
+    
+    Meant for re-scoring stored crawls: a batch of result dicts becomes one
+    array per SCORE_FEATURES column and all three scores are computed with
+    array operations. Results are identical to SEOAnalyzer's scalar rules;
+    keep the two in step when a rule changes.
+    """
+    
+    def columns(self, records):
+        """SCORE_FEATURES -> float64 array, from result dicts"""
+        import numpy as np
+        table = np.array([score_features(data) for data in records], dtype=np.float64)
+        table = table.reshape(-1, len(SCORE_FEATURES))
+        return {name: table[:, i] for i, name in enumerate(SCORE_FEATURES)}
+    
+    def score_columns(self, columns):
+        """(seo, performance, mobile) int64 score arrays from feature columns"""
+        import numpy as np
+        c = columns
+        title, description = c['title_length'], c['description_length']
+        h1, images, load_time = c['h1_count'], c['image_count'], c['load_time']
+        viewport = c['viewport'] > 0
+        
+        seo = np.zeros(len(title), dtype=np.int64)
+        seo += 5 * (title > 0) + 5 * ((title >= 50) & (title <= 60))
+        seo += 5 * (description > 0) + 5 * ((description >= 120) & (description <= 160))
+        seo += 5 * (c['meta_keywords'] > 0)
+        seo += 5 * (h1 > 0) + 5 * (h1 == 1) + 5 * (c['subheadings'] > 0)
+        alt_ratio = np.divide(c['images_with_alt'], images, out=np.zeros_like(images),
+                              where=images > 0)
+        seo += 5 * (images > 0) + 5 * ((images > 0) & (alt_ratio > 0.8))
+        seo += 5 * (c['internal_links'] > 5) + 5 * (c['external_links'] > 2)
+        seo += 5 * viewport
+        seo += 15 * (c['keyword_count'] >= 5)
+        seo += np.where(load_time < 2, 15, np.where(load_time < 4, 10, 0))
+        np.minimum(seo, 100, out=seo)
+        
+        performance = np.select([load_time < 1, load_time < 2, load_time < 3, load_time < 4],
+                                [95, 85, 70, 50], 30).astype(np.int64)
+        # Pages with measured resources use calculate_measured_performance_score
+        page_bytes, requests = c['page_bytes'], c['request_count']
+        measured = 100.0 - np.select([load_time < 1, load_time < 2, load_time < 3, load_time < 4],
+                                     [0, 5, 15, 25], 35)
+        measured -= np.select([page_bytes > 5000000, page_bytes > 2500000, page_bytes > 1000000],
+                              [30, 20, 10], 0)
+        measured -= np.select([requests > 100, requests > 50], [15, 8], 0)
+        measured -= np.minimum(25, 5 * c['render_blocking'])
+        measured -= np.minimum(15, 5 * c['uncompressed_resources'])
+        performance = np.where(c['measured'] > 0, np.maximum(measured, 0), performance).astype(np.int64)
+        mobile = 30 * viewport + 70 * (c['mobile_friendly'] > 0)
+        return seo, performance, mobile.astype(np.int64)
+    
+    def score(self, records):
+        return self.score_columns(self.columns(records))
+    
+    def apply(self, records):
+        """Write the three scores into each result dict; returns the records"""
+        records = list(records)
+        if not records:
+            return records
+        seo, performance, mobile = self.score(records)
+        for data, s, p, m in zip(records, seo.tolist(), performance.tolist(), mobile.tolist()):
+            data['seo_score'] = s
+            data['performance_score'] = p
+            data['mobile_score'] = m
+        return records
+
+def analyze_or_error(analyzer, website_data):
+    """analyze_content, with a page it fails on given an {"error": ...}
+    result as AnalysisPool gives it, so one bad page doesn't end an audit"""
+    try:
+        return analyzer.analyze_content(website_data)
+    except Exception as e:
+        return {"error": f"Analysis failed: {e}"}
+
+class BulkCrawler:
+    """Concurrent bulk fetcher with a per-host politeness scheduler
+    
+    Fetching is driven by asyncio: each request runs the analyzer's blocking
+    fetch in a worker thread. All threads share the one analyzer, which
+    fetch_website_content allows; the pages are analyzed one at a time by
+    the consumer (or by the pool). At most `concurrency` requests are in flight
+    overall and at most `per_host` per host, and requests to one host start at
+    least `crawl_delay` seconds apart. Pages are yielded as they arrive.
+    """
+    
+    def __init__(self, analyzer=None, concurrency=64, per_host=2, crawl_delay=1.0, pool=None):
+        self.analyzer = analyzer or SEOAnalyzer()
+        # With an AnalysisPool, pages are fetched unparsed and analyzed by the pool
+        self.pool = pool
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.crawl_delay = crawl_delay
+        self._hosts = {}
+        self._source_lock = threading.Lock()
+    
+    def _host_slot(self, url):
+        host = urlparse(url).netloc.lower()
+        if host not in self._hosts:
+            # [connection limit, time the next request may start, lock]
+            self._hosts[host] = [asyncio.Semaphore(self.per_host), 0.0, asyncio.Lock()]
+        return self._hosts[host]
+    
+    def _host_delay(self, url):
+        return self.crawl_delay
+    
+    async def _fetch(self, url, executor):
+        limit, _, lock = slot = self._host_slot(url)
+        async with limit:
+            async with lock:
+                now = time.monotonic()
+                wait = slot[1] - now
+                slot[1] = max(now, slot[1]) + self._host_delay(url)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, self.analyzer.fetch_website_content,
+                                              url, self.pool is None)
+    
+    async def crawl(self, urls):
+        """Async generator of (url, website_data) in completion order
+        
+        website_data is None when the fetch failed, as with
+        fetch_website_content.
+        """
+        self._hosts = {}
+        urls = self._start(urls)
+        results = asyncio.Queue(maxsize=self.concurrency)
+        
+        async def worker(executor):
+            while True:
+                url = await self._next_url(urls, executor)
+                if url is None:
+                    return
+                try:
+                    data = await self._fetch(url, executor)
+                except Exception as e:
+                    print(f"Error fetching URL {url}: {e}", file=sys.stderr)
+                    data = None
+                await self._fetched(url, data, executor)
+                await results.put((url, data))
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            workers = [asyncio.create_task(worker(executor)) for _ in range(self.concurrency)]
+            done = asyncio.gather(*workers)
+            try:
+                while not (done.done() and results.empty()):
+                    getter = asyncio.ensure_future(results.get())
+                    await asyncio.wait([getter, done], return_when=asyncio.FIRST_COMPLETED)
+                    if getter.done():
+                        yield getter.result()
+                    else:
+                        getter.cancel()
+                done.result()
+            finally:
+                for task in workers:
+                    task.cancel()
+    
+    # Hooks for crawlers that discover URLs as they go (see SiteCrawler)
+    
+    def _start(self, urls):
+        return iter(urls)
+    
+    async def _next_url(self, urls, executor):
+        # The source may block (a work queue, a sitemap download), so it is
+        # read in a worker thread, one caller at a time
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._next_source, urls)
+    
+    def _next_source(self, urls):
+        with self._source_lock:
+            return next(urls, None)
+    
+    async def _fetched(self, url, website_data, executor):
+        pass
+    
+    def iter_pages(self, urls):
+        """Blocking iterator over crawl(); fetching continues in a background thread"""
+        pages = queue.Queue(maxsize=self.concurrency)
+        stop = threading.Event()
+        finished = object()
+        
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        async def pump():
+            loop = asyncio.get_running_loop()
+            async for item in self.crawl(urls):
+                if not await loop.run_in_executor(None, put, item):
+                    break
+        
+        def produce():
+            try:
+                asyncio.run(pump())
+                put(finished)
+            except Exception as e:
+                put(e)
+        
+        thread = threading.Thread(target=produce, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = pages.get()
+                if item is finished:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+    
+    def analyze_urls(self, urls):
+        """Yield (url, seo_data) for every URL, analyzing pages as they arrive"""
+        if self.pool is not None:
+            yield from self.pool.map(self.iter_pages(urls), self.analyzer)
+            return
+        for url, website_data in self.iter_pages(urls):
+            if not website_data:
+                yield url, {"error": "Could not fetch website content"}
+            else:
+                yield url, analyze_or_error(self.analyzer, website_data)
+
+def normalize_url(url):
+    """Canonical form of an http(s) URL for de-duplication, or None for other schemes"""
+    url, _ = urldefrag(url.strip())
+    parts = urlparse(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    netloc = parts.netloc.lower()
+    if netloc.endswith({'http': ':80', 'https': ':443'}[scheme]):
+        netloc = netloc.rsplit(':', 1)[0]
+    return parts._replace(scheme=scheme, netloc=netloc, path=parts.path or '/').geturl()
+
+class BloomFilter:
+    """Probabilistic set of strings in a fixed-size bit array
+    
+    Sized for `capacity` items at `error_rate` false positives; a million
+    URLs at 0.1% take about 1.8 MB. A false positive makes a new URL look
+    seen, so at worst a page is skipped; none is ever crawled twice.
+    """
+    
+    def __init__(self, capacity=1000000, error_rate=0.001):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+    
+    def add(self, item):
+        """Add item; False if it was (probably) there already"""
+        added = False
+        bits = self.bits
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        self.count += added
+        return added
+    
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+    
+    def __len__(self):
+        return self.count
+
+class CrawlFrontier:
+    """First-in, first-out queue of URLs to crawl, in bounded memory
+    
+    A URL is queued at most once, tracked in a BloomFilter. Up to
+    `memory_limit` queued URLs are held in memory; the rest go to a
+    temporary spill file and are read back in order. Thread-safe.
+    """
+    
+    def __init__(self, capacity=1000000, error_rate=0.001, memory_limit=100000):
+        self.seen = BloomFilter(capacity, error_rate)
+        self.memory_limit = memory_limit
+        self._queue = deque()
+        self._spill = None
+        self._spilled = 0
+        self._read_position = 0
+        self._lock = threading.Lock()
+    
+    def add(self, url):
+        """Queue a URL unless it was seen before; returns whether it was queued"""
+        with self._lock:
+            if not self.seen.add(url):
+                return False
+            if self._spilled or len(self._queue) >= self.memory_limit:
+                # Once anything is on disk, newer URLs queue behind it there
+                if self._spill is None:
+                    self._spill = tempfile.TemporaryFile('w+', encoding='utf-8')
+                    self._read_position = 0
+                self._spill.seek(0, os.SEEK_END)
+                self._spill.write(url + '\n')
+                self._spilled += 1
+            else:
+                self._queue.append(url)
+            return True
+    
+    def pop(self):
+        """The next URL, or None when the queue is empty"""
+        with self._lock:
+            if not self._queue and self._spilled:
+                self._refill()
+            return self._queue.popleft() if self._queue else None
+    
+    def _refill(self):
+        self._spill.seek(self._read_position)
+        while self._spilled and len(self._queue) < self.memory_limit:
+            self._queue.append(self._spill.readline()[:-1])
+            self._spilled -= 1
+        self._read_position = self._spill.tell()
+        if not self._spilled:
+            self._spill.close()
+            self._spill = None
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._queue) + self._spilled
+    
+    def skip(self, url, reason=None):
+        pass  # a popped URL that won't be fetched; nothing is kept about it here
+
+class _LinkParser(HTMLParser):
+    # Only the <a href> values, for pages that were not parsed here
+    
+    def __init__(self):
+        super().__init__()
+        self.links = []
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                if name == 'href' and value is not None:
+                    self.links.append(value)
+                    break
+
+class SiteCrawler(BulkCrawler):
+    """BulkCrawler that follows links, for auditing whole sites
+    
+    Starting from the seed URLs, and with sitemaps=True also from the
+    sitemaps robots.txt lists (or /sitemap.xml), every fetched page's links
+    are resolved against its URL and queued when they stay on a seed host.
+    robots.txt is honoured, including a Crawl-delay longer than
+    crawl_delay. At most max_pages pages are fetched. The frontier spills
+    to disk and seen URLs live in a Bloom filter, so memory stays bounded
+    on sites with millions of pages.
+    """
+    
+    def __init__(self, analyzer=None, concurrency=64, per_host=2, crawl_delay=1.0, pool=None,
+                 max_pages=None, sitemaps=True, frontier=None):
+        super().__init__(analyzer=analyzer, concurrency=concurrency, per_host=per_host,
+                         crawl_delay=crawl_delay, pool=pool)
+        self.max_pages = max_pages
+        self.sitemaps = sitemaps
+        self.frontier = frontier if frontier is not None else CrawlFrontier()
+        self.allowed_hosts = set()
+        self.blocked_by_robots = 0
+        self._robots = {}           # (scheme, host) -> RobotFileParser
+        self._robots_locks = {}     # (scheme, host) -> lock held while fetching its robots.txt
+        self._robots_lock = threading.Lock()
+        self._issued = 0
+        self._active = 0            # fetches and sitemap readers that may still queue URLs
+        self._seeding = None
+        self._origins = set()       # (scheme, host) of the seeds
+    
+    @property
+    def user_agent(self):
+        return self.analyzer.headers['User-Agent']
+    
+    def _enqueue(self, url):
+        url = normalize_url(url)
+        if url is not None and urlparse(url).netloc in self.allowed_hosts:
+            self.frontier.add(url)
+    
+    def _start(self, seeds):
+        self._issued = 0
+        self._active = 0
+        self._seeding = None
+        for url in seeds:
+            url = normalize_url(url)
+            if url is not None:
+                self.allowed_hosts.add(urlparse(url).netloc)
+                self._origins.add(self._robots_key(url))
+                self.frontier.add(url)
+        return None
+    
+    def _robots_key(self, url):
+        parts = urlparse(url)
+        return parts.scheme, parts.netloc
+    
+    def _robots_for(self, url):
+        key = self._robots_key(url)
+        robots = self._robots.get(key)
+        if robots is not None:
+            return robots
+        with self._robots_lock:
+            host_lock = self._robots_locks.setdefault(key, threading.Lock())
+        # One fetch per host; a slow host doesn't hold up the others
+        with host_lock:
+            robots = self._robots.get(key)
+            if robots is None:
+                robots = self._robots[key] = self._fetch_robots(f"{key[0]}://{key[1]}/robots.txt")
+        return robots
+    
+    def _fetch_robots(self, robots_url):
+        robots = RobotFileParser(robots_url)
+        try:
+            with self.analyzer.sessions.get().get(robots_url, headers=self.analyzer.headers, timeout=10,
+                                                 stream=True) as response:
+                status = response.status_code
+                text = BodyReader(response, ROBOTS_MAX_BYTES).read() if status < 400 else ''
+        except requests.exceptions.RequestException:
+            robots.allow_all = True
+            return robots
+        # As robotparser.read(): auth errors forbid everything, other errors allow it
+        if status in (401, 403):
+            robots.disallow_all = True
+        elif status >= 400:
+            robots.allow_all = True
+        else:
+            robots.parse(text.splitlines())
+        return robots
+    
+    def _host_delay(self, url):
+        robots = self._robots.get(self._robots_key(url))
+        delay = robots.crawl_delay(self.user_agent) if robots is not None else None
+        return max(self.crawl_delay, float(delay or 0))
+    
+    def _seed_sitemaps(self):
+        # Runs in a worker thread; the frontier is thread-safe
+        for scheme, host in sorted(self._origins):
+            robots = self._robots_for(f"{scheme}://{host}/")
+            listed = robots.site_maps()
+            for sitemap in listed or [f"{scheme}://{host}/sitemap.xml"]:
+                try:
+                    for url in fetch_sitemap_urls(sitemap, self.analyzer):
+                        if self.max_pages is not None and len(self.frontier.seen) >= self.max_pages:
+                            return
+                        self._enqueue(url)
+                except (requests.exceptions.RequestException, ET.ParseError, OSError) as e:
+                    if listed:  # a missing /sitemap.xml guess is not worth a warning
+                        print(f"Skipping sitemap {sitemap}: {e}", file=sys.stderr)
+    
+    async def _next_url(self, urls, executor):
+        loop = asyncio.get_running_loop()
+        if self.sitemaps and self._seeding is None:
+            self._active += 1
+            self._seeding = loop.run_in_executor(executor, self._seed_sitemaps)
+            self._seeding.add_done_callback(self._seeding_done)
+        while True:
+            if self.max_pages is not None and self._issued >= self.max_pages:
+                return None
+            # A WorkQueue frontier reads and writes SQLite, so not on the loop
+            url = await loop.run_in_executor(executor, self.frontier.pop)
+            if url is None:
+                if not self._active:
+                    return None
+                await asyncio.sleep(0.05)  # in-flight pages may still add links
+                continue
+            robots = self._robots.get(self._robots_key(url))
+            if robots is None:
+                robots = await loop.run_in_executor(executor, self._robots_for, url)
+            if not robots.can_fetch(self.user_agent, url):
+                self.blocked_by_robots += 1
+                await loop.run_in_executor(executor, self.frontier.skip, url, "blocked by robots.txt")
+                continue
+            self._issued += 1
+            self._active += 1
+            return url
+    
+    def _seeding_done(self, future):
+        self._active -= 1
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Could not seed the crawl from sitemaps: {future.exception()!r}", file=sys.stderr)
+    
+    async def _fetched(self, url, website_data, executor):
+        try:
+            if website_data:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(executor, self._enqueue_links, url, website_data)
+        finally:
+            self._active -= 1
+    
+    def _enqueue_links(self, url, website_data):
+        # Runs in a worker thread; the frontier is thread-safe
+        for link in self.page_links(url, website_data):
+            self._enqueue(link)
+    
+    def page_links(self, url, website_data):
+        """The page's links resolved against its URL"""
+        page = website_data.get('page')
+        if page is not None:
+            hrefs = page.links
+        elif website_data.get('links') is not None:
+            hrefs = website_data['links']  # kept by an AuditState for a 304
+        else:
+            html = website_data.get('html')
+            if html is None and website_data.get('not_modified') and self.analyzer.cache is not None:
+                try:
+                    html = self.analyzer.cache.read_body(url)
+                except OSError:
+                    html = None
+            parser = _LinkParser()
+            parser.feed(html or "")
+            parser.close()
+            hrefs = parser.links
+        return [urljoin(url, href.strip()) for href in hrefs]
+
+class WorkQueue:
+    """Durable SQLite queue of URLs, leases and results shared by crawl workers
+    
+    Worker processes on this machine or others open the same file and lease
+    URLs from it. Work is sharded by host: a worker holds up to
+    `hosts_per_worker` hosts at a time and only gets URLs of its own hosts,
+    so no host is crawled by two workers at once and per-host politeness
+    holds. Leases last `lease_seconds` and a heartbeat thread renews them
+    while the worker lives; a crashed worker's URLs and hosts are handed
+    out again once they expire. A URL that fails `max_attempts` times is
+    given up as failed.
+    
+    Results, failures and newly discovered URLs are buffered and written in
+    one transaction per checkpoint (every `checkpoint_pages` pages or
+    `checkpoint_seconds`), so a crash loses at most the work since the last
+    one. With add() and pop() it can stand in for SiteCrawler's
+    CrawlFrontier; at most `max_urls` URLs are ever queued.
+    
+    URLs are leased `batch` at a time, but the heartbeat only renews the
+    ones pop() has handed out and that are not finished yet, with their
+    hosts. A worker stuck on one page so keeps just that page and its host;
+    the rest of its batch expires and goes to other workers, and pop()
+    drops leased URLs that are about to expire instead of starting them.
+    
+    WAL journaling needs memory shared between the processes, so it only
+    works with every worker on one machine; for a file on a network
+    filesystem pass wal=False.
+    """
+    
+    def __init__(self, path, worker=None, lease_seconds=300, max_attempts=3, hosts_per_worker=8,
+                 batch=32, checkpoint_pages=50, checkpoint_seconds=10.0, max_urls=None, wal=True,
+                 poll_interval=1.0):
+        self.path = path
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.hosts_per_worker = hosts_per_worker
+        self.batch = batch
+        self.checkpoint_pages = checkpoint_pages
+        self.checkpoint_seconds = checkpoint_seconds
+        self.max_urls = max_urls
+        self.poll_interval = poll_interval
+        # URLs this worker already queued, so links on every page aren't re-sent
+        self.seen = BloomFilter(1000000, 0.001)
+        self._leased = deque()      # leased, not handed out yet
+        self._leased_until = 0.0
+        self._in_flight = set()     # handed out by pop(), not finished
+        self._discovered = []       # (url, seed)
+        self._finished = []         # (url, 'done' | 'failed' | 'skipped', result or error)
+        self._last_checkpoint = time.monotonic()
+        self._last_empty_lease = None
+        self._lock = threading.Lock()
+        self._heartbeat = None
+        self._stopped = threading.Event()
+        # Autocommit; every write below is an explicit BEGIN IMMEDIATE transaction
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._db.execute(f"PRAGMA journal_mode = {'WAL' if wal else 'DELETE'}")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, host TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued', seed INTEGER NOT NULL DEFAULT 0,
+                worker TEXT, lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT, error TEXT, finished REAL);
+            CREATE INDEX IF NOT EXISTS urls_state_host ON urls (state, host);
+            CREATE INDEX IF NOT EXISTS urls_worker ON urls (worker) WHERE worker IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS urls_finished ON urls (finished) WHERE finished IS NOT NULL;
+            CREATE TABLE IF NOT EXISTS hosts (
+                host TEXT PRIMARY KEY, queued INTEGER NOT NULL DEFAULT 0,
+                worker TEXT, lease_expires REAL);
+            CREATE INDEX IF NOT EXISTS hosts_free ON hosts (worker, queued);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            -- hosts.queued counts each host's queued URLs, whatever moves them
+            CREATE TRIGGER IF NOT EXISTS urls_queued_insert AFTER INSERT ON urls
+            WHEN new.state = 'queued' BEGIN
+                INSERT INTO hosts (host, queued) VALUES (new.host, 1)
+                ON CONFLICT (host) DO UPDATE SET queued = queued + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS urls_queued_update AFTER UPDATE OF state ON urls
+            WHEN (old.state = 'queued') != (new.state = 'queued') BEGIN
+                UPDATE hosts SET queued = queued + (CASE WHEN new.state = 'queued' THEN 1 ELSE -1 END)
+                WHERE host = new.host;
+            END;
+        """)
+        self._db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('created', ?)", (str(time.time()),))
+    
+    @contextlib.contextmanager
+    def _transaction(self):
+        # Caller holds self._lock
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+    
+    def add(self, url, seed=False):
+        """Queue a URL (written at the next checkpoint) unless this worker
+        already did; URLs already in the queue keep their state"""
+        with self._lock:
+            if not self.seen.add(url):
+                return False
+            self._discovered.append((url, seed))
+            self._last_empty_lease = None
+        self._maybe_checkpoint()
+        return True
+    
+    def add_many(self, urls, seed=False):
+        """Queue http(s) URLs in bulk, normalized; returns how many were new to the queue"""
+        urls = iter(urls)
+        added = 0
+        for chunk in iter(lambda: list(itertools.islice(urls, 10000)), []):
+            rows = []
+            for url in chunk:
+                normalized = normalize_url(url)
+                if normalized is None:
+                    print(f"Not queueing {url!r}: not an http(s) URL", file=sys.stderr)
+                    continue
+                self.seen.add(normalized)
+                rows.append((normalized, seed))
+            with self._lock, self._transaction() as db:
+                added += self._insert(db, rows)
+        return added
+    
+    def _insert(self, db, rows):
+        room = None
+        if self.max_urls is not None:
+            room = self.max_urls - db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+        added = 0
+        for url, seed in rows:
+            if room is not None and added >= room:
+                break
+            added += db.execute("INSERT OR IGNORE INTO urls (url, host, seed) VALUES (?, ?, ?)",
+                                (url, urlparse(url).netloc.lower(), int(seed))).rowcount
+        return added
+    
+    def pop(self):
+        """The next URL leased to this worker, or None when there is none for it now"""
+        with self._lock:
+            # A URL started now must live until the heartbeat first renews it
+            if self._leased and time.time() > self._leased_until - self.lease_seconds / 3:
+                self._release_unstarted()
+            if not self._leased:
+                # Don't hammer the database while waiting for work
+                if self._last_empty_lease is not None and \
+                        time.monotonic() - self._last_empty_lease < self.poll_interval:
+                    return None
+                self._flush()
+                urls = self._lease()
+                self._last_empty_lease = None if urls else time.monotonic()
+                self._leased.extend(urls)
+                if not self._leased:
+                    return None
+            url = self._leased.popleft()
+            self._in_flight.add(url)
+            return url
+    
+    def _release_unstarted(self):
+        # Caller holds self._lock. URLs another worker leased since are left alone
+        with self._transaction() as db:
+            db.executemany("UPDATE urls SET state = 'queued', worker = NULL, lease_expires = NULL, "
+                           "attempts = attempts - 1 WHERE url = ? AND worker = ? AND state = 'leased'",
+                           [(url, self.worker) for url in self._leased])
+        self._leased.clear()
+    
+    def _lease(self):
+        now = time.time()
+        expires = now + self.lease_seconds
+        with self._transaction() as db:
+            # Expired leases go back to the queue
+            db.execute("UPDATE urls SET state = 'queued', worker = NULL, lease_expires = NULL "
+                       "WHERE state = 'leased' AND lease_expires < ?", (now,))
+            db.execute("UPDATE hosts SET worker = NULL, lease_expires = NULL "
+                       "WHERE worker IS NOT NULL AND lease_expires < ?", (now,))
+            # Give up hosts this worker has finished with
+            db.execute("""UPDATE hosts SET worker = NULL, lease_expires = NULL
+                          WHERE worker = ? AND queued = 0 AND NOT EXISTS (
+                              SELECT 1 FROM urls WHERE urls.state = 'leased' AND urls.host = hosts.host)""",
+                       (self.worker,))
+            hosts = [row[0] for row in db.execute("SELECT host FROM hosts WHERE worker = ? AND queued > 0",
+                                                  (self.worker,))]
+            held = db.execute("SELECT COUNT(*) FROM hosts WHERE worker = ?", (self.worker,)).fetchone()[0]
+            if held < self.hosts_per_worker:
+                free = [row[0] for row in db.execute(
+                    "SELECT host FROM hosts WHERE worker IS NULL AND queued > 0 LIMIT ?",
+                    (self.hosts_per_worker - held,))]
+                hosts += free
+            if not hosts:
+                return []
+            # Held hosts only stay leased while they have work, so extend them with the batch
+            db.executemany("UPDATE hosts SET worker = ?, lease_expires = ? WHERE host = ?",
+                           [(self.worker, expires, host) for host in hosts])
+            marks = ', '.join('?' * len(hosts))
+            rows = db.execute(f"SELECT id, url FROM urls WHERE state = 'queued' AND host IN ({marks}) "
+                              f"ORDER BY id LIMIT ?", hosts + [self.batch]).fetchall()
+            db.executemany("UPDATE urls SET state = 'leased', worker = ?, lease_expires = ?, "
+                           "attempts = attempts + 1 WHERE id = ?",
+                           [(self.worker, expires, row[0]) for row in rows])
+        self._leased_until = expires
+        self._start_heartbeat()
+        return [row[1] for row in rows]
+    
+    def complete(self, url, seo_data):
+        """Record a finished page's result"""
+        self._finish(url, 'done', json.dumps(seo_data))
+    
+    def fail(self, url, error):
+        """Record a failed attempt; the URL is retried until max_attempts"""
+        self._finish(url, 'failed', error)
+    
+    def skip(self, url, reason="blocked by robots.txt"):
+        """Give up a leased URL that won't be fetched"""
+        self._finish(url, 'skipped', reason)
+    
+    def _finish(self, url, outcome, value):
+        with self._lock:
+            self._in_flight.discard(url)
+            self._finished.append((url, outcome, value))
+        self._maybe_checkpoint()
+    
+    def _maybe_checkpoint(self):
+        with self._lock:
+            pending = len(self._finished) + len(self._discovered)
+            if pending >= self.checkpoint_pages or (
+                    pending and time.monotonic() - self._last_checkpoint >= self.checkpoint_seconds):
+                self._flush()
+    
+    def checkpoint(self):
+        """Write buffered results and discovered URLs now"""
+        with self._lock:
+            self._flush()
+    
+    def _flush(self):
+        self._last_checkpoint = time.monotonic()
+        if not (self._finished or self._discovered):
+            return
+        now = time.time()
+        with self._transaction() as db:
+            self._insert(db, self._discovered)
+            for url, outcome, value in self._finished:
+                if outcome == 'done':
+                    # A late result still counts, even if the URL was leased again
+                    db.execute("UPDATE urls SET state = 'done', result = ?, error = NULL, worker = NULL, "
+                               "lease_expires = NULL, finished = ? WHERE url = ?", (value, now, url))
+                elif outcome == 'skipped':
+                    db.execute("UPDATE urls SET state = 'skipped', error = ?, worker = NULL, "
+                               "lease_expires = NULL, finished = ? WHERE url = ? AND state != 'done'",
+                               (value, now, url))
+                else:
+                    db.execute("""UPDATE urls SET
+                                      state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                                      finished = CASE WHEN attempts >= ? THEN ? END,
+                                      error = ?, worker = NULL, lease_expires = NULL
+                                  WHERE url = ? AND state = 'leased' AND worker = ?""",
+                               (self.max_attempts, self.max_attempts, now, value, url, self.worker))
+        self._discovered = []
+        self._finished = []
+    
+    def _start_heartbeat(self):
+        if self._heartbeat is None:
+            self._heartbeat = threading.Thread(target=self._renew_leases, daemon=True)
+            self._heartbeat.start()
+    
+    def _renew_leases(self):
+        while not self._stopped.wait(self.lease_seconds / 3):
+            try:
+                self.renew()
+            except sqlite3.Error as e:
+                print(f"Could not renew queue leases: {e}", file=sys.stderr)
+    
+    def renew(self):
+        """Extend the leases of this worker's URLs in flight, and of their
+        hosts, by lease_seconds from now"""
+        expires = time.time() + self.lease_seconds
+        with self._lock:
+            # Finished URLs stay leased in the file until the next checkpoint
+            urls = self._in_flight.union(url for url, _, _ in self._finished)
+            if not urls:
+                return
+            hosts = {urlparse(url).netloc.lower() for url in urls}
+            with self._transaction() as db:
+                db.executemany("UPDATE urls SET lease_expires = ? WHERE url = ? AND worker = ? "
+                               "AND state = 'leased'", [(expires, url, self.worker) for url in urls])
+                db.executemany("UPDATE hosts SET lease_expires = ? WHERE host = ? AND worker = ?",
+                               [(expires, host, self.worker) for host in hosts])
+    
+    def release(self):
+        """Checkpoint, then hand this worker's unfinished URLs and its hosts back"""
+        with self._lock:
+            self._flush()
+            self._leased.clear()
+            self._in_flight.clear()
+            with self._transaction() as db:
+                db.execute("UPDATE urls SET state = 'queued', worker = NULL, lease_expires = NULL, "
+                           "attempts = attempts - 1 WHERE worker = ? AND state = 'leased'", (self.worker,))
+                db.execute("UPDATE hosts SET worker = NULL, lease_expires = NULL WHERE worker = ?",
+                           (self.worker,))
+    
+    def claim(self, task):
+        """True for exactly one caller across all workers, for one-off jobs"""
+        with self._lock, self._transaction() as db:
+            return db.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+                              (f"claimed:{task}", self.worker)).rowcount == 1
+    
+    def seeds(self):
+        with self._lock:
+            self._flush()
+            return [row[0] for row in self._db.execute("SELECT url FROM urls WHERE seed = 1 ORDER BY id")]
+    
+    def unfinished(self):
+        """Whether any URL is still queued or leased, by any worker"""
+        with self._lock:
+            if self._leased or self._discovered or self._finished:
+                return True
+            return self._db.execute("SELECT EXISTS (SELECT 1 FROM urls WHERE state IN ('queued', 'leased'))"
+                                    ).fetchone()[0] == 1
+    
+    def progress(self, window=60.0):
+        """Counts per state, active workers and aggregate throughput over
+        the last `window` seconds, with an estimate of the time left"""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._db.execute("SELECT state, COUNT(*) FROM urls GROUP BY state"))
+            workers = self._db.execute("SELECT COUNT(DISTINCT worker) FROM hosts WHERE worker IS NOT NULL "
+                                       "AND lease_expires >= ?", (now,)).fetchone()[0]
+            created = float(self._db.execute("SELECT value FROM meta WHERE key = 'created'").fetchone()[0])
+            window = min(window, now - created)
+            recent = self._db.execute("SELECT COUNT(*) FROM urls WHERE finished >= ?",
+                                      (now - window,)).fetchone()[0] if window > 0 else 0
+        progress = {state: counts.get(state, 0) for state in ('queued', 'leased', 'done', 'failed', 'skipped')}
+        progress['total'] = sum(counts.values())
+        progress['workers'] = workers
+        progress['pages_per_second'] = recent / window if window > 0 else 0.0
+        remaining = progress['queued'] + progress['leased']
+        progress['eta_seconds'] = remaining / progress['pages_per_second'] if progress['pages_per_second'] else None
+        return progress
+    
+    def results(self):
+        """(url, seo_data) for every finished URL; failed and skipped ones as error results"""
+        with self._lock:
+            self._flush()
+        rows = self._db.execute("SELECT url, state, result, error FROM urls "
+                                "WHERE state IN ('done', 'failed', 'skipped') ORDER BY id")
+        for url, state, result, error in rows:
+            yield url, json.loads(result) if state == 'done' else {'error': error}
+    
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM urls WHERE state = 'queued'").fetchone()[0]
+    
+    def close(self):
+        """Release this worker's leases and close the file"""
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        self.release()
+        self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def format_progress(progress):
+    """One status line for WorkQueue.progress()"""
+    finished = progress['done'] + progress['failed'] + progress['skipped']
+    line = (f"{finished}/{progress['total']} pages finished ({progress['failed']} failed, "
+            f"{progress['skipped']} skipped), {progress['leased']} in progress on "
+            f"{progress['workers']} workers, {progress['pages_per_second']:.1f} pages/s")
+    if progress['eta_seconds'] is not None:
+        line += f", about {progress['eta_seconds'] / 60:.0f} min left"
+    return line
+
+def report_progress(results, queue, interval=10.0, output=None):
+    """Pass (url, seo_data) pairs through, printing the queue's progress
+    every `interval` seconds and once at the end"""
+    output = output or sys.stderr
+    last = time.monotonic()
+    for item in results:
+        yield item
+        if time.monotonic() - last >= interval:
+            print(format_progress(queue.progress()), file=output)
+            last = time.monotonic()
+    print(format_progress(queue.progress()), file=output)
+
+def work_through_queue(queue, crawler, urls=(), crawl=False, sitemaps=True, wait=5.0):
+    """Yield (url, seo_data) for the URLs this worker leases from `queue`
+    until no URL is queued or leased anywhere, recording every result
+    
+    `urls` are added first (as crawl seeds with crawl=True, when the
+    crawler is a SiteCrawler over the queue). When the queue has nothing
+    for this worker but others still hold leases, it waits `wait` seconds
+    and asks again, since expired or released work comes back. The sites'
+    sitemaps are read by whichever worker gets there first. Every attempt
+    is yielded, so a URL that failed and was retried shows up once per try.
+    """
+    queue.add_many(urls, seed=crawl)
+    try:
+        while True:
+            if crawl:
+                crawler.sitemaps = sitemaps and queue.claim('sitemaps')
+                source = queue.seeds()
+            else:
+                source = iter(queue.pop, None)
+            for url, seo_data in crawler.analyze_urls(source):
+                if 'error' in seo_data:
+                    queue.fail(url, seo_data['error'])
+                else:
+                    queue.complete(url, seo_data)
+                yield url, seo_data
+            queue.checkpoint()
+            if not queue.unfinished():
+                return
+            time.sleep(wait)
+    finally:
+        queue.release()
+
+# Per-process state for AnalysisPool workers
+_worker_analyzer = None
+
+class AnalysisTimeout(Exception):
+    pass
+
+def _raise_analysis_timeout(signum, frame):
+    raise AnalysisTimeout()
+
+def _init_analysis_worker(engine, rules=None, measure_resources=False, keyword_mode='nlp',
+                          metric_buckets=None, fingerprints=False):
+    global _worker_analyzer
+    _worker_analyzer = SEOAnalyzer(engine=engine, rules=RuleSet(rules) if rules is not None else None,
+                                   measure_resources=measure_resources, keyword_mode=keyword_mode,
+                                   metrics=StageMetrics(metric_buckets) if metric_buckets else None,
+                                   fingerprints=fingerprints)
+    # Build Rake and train the noun-phrase extractor now, not on the first page
+    try:
+        _worker_analyzer.extract_keywords("<p>Warm up the keyword extractors.</p>")
+    except Exception as e:
+        print(f"Keyword extractor warm-up failed: {e}", file=sys.stderr)
+    if _worker_analyzer.metrics is not None:
+        _worker_analyzer.metrics.drain()  # not a page
+
+# Fetch details that travel to the workers along with the HTML
+_FETCH_DETAILS = ('document_bytes', 'decoded_bytes', 'content_encoding', 'truncated')
+
+def _analyze_in_worker(payload, load_time, status, timeout, with_candidates=False, url=None,
+                       details=None):
+    if isinstance(payload, tuple):
+        # (shared memory block name, size) for large pages
+        name, size = payload
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching also registers the block for cleanup
+            # in this process; the parent owns it, so undo that
+            block = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(block._name, 'shared_memory')
+        try:
+            html = bytes(block.buf[:size]).decode('utf-8')
+        finally:
+            block.close()
+    else:
+        html = payload.decode('utf-8')
+    
+    use_alarm = timeout and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_analysis_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        seo_data = _worker_analyzer.analyze_content(dict(details or {}, url=url, html=html,
+                                                         load_time=load_time, status=status))
+    except AnalysisTimeout:
+        seo_data = {"error": f"Analysis timed out after {timeout} seconds"}
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    metrics = _worker_analyzer.metrics
+    if not with_candidates and metrics is None:
+        return seo_data
+    # The parent ranks the candidates against its site keyword index and
+    # merges the worker's stage metrics into its own
+    candidates = dict(_worker_analyzer.last_keyword_candidates or {}) if with_candidates else None
+    return seo_data, candidates, metrics.drain() if metrics is not None else None
+
+class AnalysisPool:
+    """Runs analyze_content for fetched pages in a pool of worker processes
+    
+    Each worker builds one SEOAnalyzer (stopwords, Rake, noun-phrase
+    extractor) when it starts. At most `max_pending` pages are in flight, so
+    a fast producer is held back instead of queueing everything in memory.
+    HTML is encoded once; pages of `shm_threshold` bytes or more travel
+    through shared memory instead of being pickled. `task_timeout` is
+    enforced inside the worker with SIGALRM where the platform has it.
+    `rules` are rule definitions (see DEFAULT_RULES) for the workers' RuleSet.
+    With measure_resources the workers also size each page's subresources.
+    keyword_mode is passed on to the workers' SEOAnalyzer. With a
+    StageMetrics `metrics`, the workers time their stages too and each
+    result brings its timings back to be merged in. With fingerprints the
+    workers add each page's SimHash, for map()'s local_analyzer to check
+    against its duplicate_index (keywords are extracted regardless, as the
+    workers can't know which pages are duplicates).
+    """
+    
+    def __init__(self, processes=None, max_pending=None, ordered=False,
+                 task_timeout=60, engine='soup', shm_threshold=1 << 20, rules=None,
+                 measure_resources=False, keyword_mode='nlp', metrics=None, fingerprints=False):
+        self.processes = processes or os.cpu_count() or 1
+        self.max_pending = max_pending or self.processes * 2
+        self.ordered = ordered
+        self.task_timeout = task_timeout
+        self.shm_threshold = shm_threshold
+        self.metrics = metrics
+        self.executor = ProcessPoolExecutor(max_workers=self.processes,
+                                            initializer=_init_analysis_worker,
+                                            initargs=(engine, rules, measure_resources, keyword_mode,
+                                                      metrics.buckets if metrics is not None else None,
+                                                      fingerprints))
+    
+    def submit(self, website_data, with_candidates=False):
+        """Queue one fetched page; returns (future, shared memory block or None)"""
+        html = website_data['html']
+        if html is None:
+            raise ValueError("AnalysisPool needs raw HTML; fetch with parse=False")
+        encoded = html.encode('utf-8')
+        block = None
+        payload = encoded
+        if len(encoded) >= self.shm_threshold:
+            block = shared_memory.SharedMemory(create=True, size=len(encoded))
+            block.buf[:len(encoded)] = encoded
+            payload = (block.name, len(encoded))
+        future = self.executor.submit(_analyze_in_worker, payload, website_data['load_time'],
+                                      website_data.get('status'), self.task_timeout,
+                                      with_candidates, website_data.get('url'),
+                                      {key: website_data[key] for key in _FETCH_DETAILS if key in website_data})
+        return future, block
+    
+    def map(self, pages, local_analyzer=None):
+        """Analyze (url, website_data) pairs, yielding (url, seo_data)
+        
+        Results come back in input order when the pool is ordered, otherwise
+        as soon as each one finishes. With a `local_analyzer`, pages it can
+        answer from its response cache or memo never reach the workers, and
+        fresh results are recorded back into them.
+        """
+        pending = deque()
+        pages = iter(pages)
+        exhausted = False
+        
+        while pending or not exhausted:
+            while not exhausted and len(pending) < self.max_pending:
+                try:
+                    url, website_data = next(pages)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if not website_data:
+                    yield url, {"error": "Could not fetch website content"}
+                    continue
+                record = None
+                if local_analyzer is not None:
+                    reused = local_analyzer.reusable_result(website_data)
+                    if reused is not None:
+                        yield url, reused
+                        continue
+                    # Just enough to record the result; the HTML is not kept
+                    record = {'url': url, 'content_hash': website_data.get('content_hash')}
+                    if local_analyzer.memo is not None and not record['content_hash']:
+                        record['content_hash'] = content_hash(website_data['html'])
+                with_candidates = local_analyzer is not None and local_analyzer.keyword_index is not None
+                future, block = self.submit(website_data, with_candidates)
+                pending.append((url, future, block, record))
+            if not pending:
+                continue
+            
+            if self.ordered:
+                ready = [pending[0]]
+                wait([pending[0][1]])
+            else:
+                done, _ = wait([entry[1] for entry in pending], return_when=FIRST_COMPLETED)
+                ready = [entry for entry in pending if entry[1] in done]
+            
+            for entry in ready:
+                pending.remove(entry)
+                url, future, block, record = entry
+                if block is not None:
+                    block.close()
+                    block.unlink()
+                try:
+                    seo_data = future.result()
+                except Exception as e:
+                    seo_data = {"error": f"Analysis failed: {e}"}
+                candidates = None
+                if isinstance(seo_data, tuple):
+                    seo_data, candidates, stages = seo_data
+                    if stages:
+                        self.metrics.merge(stages)
+                duplicates = local_analyzer is not None and local_analyzer.duplicate_index is not None
+                if duplicates and 'error' not in seo_data:
+                    local_analyzer.check_duplicate(url, seo_data)
+                if candidates is not None and 'error' not in seo_data:
+                    local_analyzer.apply_keyword_index(url, seo_data, Counter(candidates))
+                elif duplicates and 'error' not in seo_data:
+                    local_analyzer.score_and_suggest(seo_data)
+                if record is not None and 'error' not in seo_data:
+                    local_analyzer.record_result(record, seo_data, candidates)
+                yield url, seo_data
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def read_url_list(path):
+    """URLs from a text file, one per line; blank lines and # comments are skipped"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+
+def fetch_sitemap_urls(sitemap_url, analyzer=None, max_bytes=SITEMAP_MAX_BYTES, max_depth=SITEMAP_MAX_DEPTH):
+    """Page URLs listed in a sitemap, following nested sitemap indexes
+    
+    The XML is parsed as it downloads and each entry is dropped once read,
+    so sitemaps of any size, gzipped (.xml.gz) or not, use constant memory.
+    Requests go through the analyzer's session pool with its headers. Only
+    the first max_bytes of each sitemap, decompressed, are read; the URLs
+    before the cut are still returned. Each sitemap is read once, however
+    often indexes list it, and indexes are followed `max_depth` levels down.
+    """
+    analyzer = analyzer or SEOAnalyzer()
+    pending = deque([(sitemap_url, 0)])
+    seen = {sitemap_url}
+    while pending:
+        url, depth = pending.popleft()
+        nested = []
+        yield from _read_sitemap(url, analyzer, max_bytes, nested)
+        for nested_url in nested:
+            if nested_url in seen:
+                continue
+            seen.add(nested_url)
+            if depth >= max_depth:
+                print(f"Skipping sitemap {nested_url}: indexes nested over {max_depth} deep",
+                      file=sys.stderr)
+                continue
+            pending.append((nested_url, depth + 1))
+
+def _read_sitemap(sitemap_url, analyzer, max_bytes, nested):
+    # Yields the page URLs of one sitemap and collects the sitemaps an index lists in `nested`
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    root = None
+    
+    def parsed_urls():
+        # Page URLs parsed so far; nested sitemaps are kept for later
+        nonlocal root
+        for event, element in parser.read_events():
+            if root is None:
+                root = element
+            elif event == 'end':
+                if element.tag.endswith('loc') and element.text:
+                    if root.tag.endswith('sitemapindex'):
+                        nested.append(element.text.strip())
+                    else:
+                        yield element.text.strip()
+                elif element.tag.rsplit('}', 1)[-1] in ('url', 'sitemap'):
+                    root.clear()
+    
+    with analyzer.sessions.get().get(sitemap_url, headers=analyzer.headers, timeout=10,
+                                     stream=True) as response:
+        response.raise_for_status()
+        body = BodyReader(response, max_bytes)
+        decompressor = None
+        size = 0
+        # BodyReader undoes Content-Encoding; a .xml.gz body is still gzip
+        for position, chunk in enumerate(body.iter_bytes()):
+            if position == 0 and chunk[:2] == b'\x1f\x8b':
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk, max_bytes - size + 1)
+            size += len(chunk)
+            if size > max_bytes:
+                body.truncated = True
+                chunk = chunk[:len(chunk) - (size - max_bytes)]
+            parser.feed(chunk)
+            yield from parsed_urls()
+            if body.truncated:
+                break
+        if body.truncated:
+            print(f"Sitemap {sitemap_url} is over {max_bytes} bytes; only its start was read",
+                  file=sys.stderr)
+        else:
+            parser.close()
+            yield from parsed_urls()
+
+def read_results(path):
+    """Result dicts from a JSON Lines audit file, skipping failed pages"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                if 'error' not in data:
+                    yield data
+
+def analyze_html_file(analyzer, path):
+    """Analyze a saved HTML page; there is no fetch, so load_time is 0.
+    A file that can't be read or analyzed gives an {"error": ...} result."""
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            html = f.read()
+    except OSError as e:
+        return {"error": f"Could not read {path}: {e}"}
+    return analyze_or_error(analyzer, {'url': None, 'html': html, 'load_time': 0.0, 'status': None})
+
+def audit(urls=(), html_files=(), engine='soup', concurrency=16, per_host=2,
+          crawl_delay=1.0, processes=0, cache_dir=None, memo_path=None, user_agent=None,
+          keyword_index_path=None, rules_path=None, state=None, crawl=False,
+          max_pages=None, sitemaps=True, measure_resources=False, keyword_mode='nlp',
+          metrics=None, max_bytes=DEFAULT_MAX_BYTES, duplicate_index=None,
+          skip_duplicate_keywords=False, queue=None):
+    """Headless batch audit: yields (source, seo_data) as each page finishes
+    
+    URLs are fetched concurrently with BulkCrawler; processes > 0 moves the
+    analysis into an AnalysisPool of that many workers. html_files are
+    analyzed from disk without fetching. With keyword_index_path, keywords
+    are ranked against a site index loaded from (and saved back to) it.
+    rules_path is a JSON rule file replacing DEFAULT_RULES. An AuditState
+    `state` replaces the response cache and memo, so unchanged pages are
+    revalidated instead of re-analyzed. With crawl=True the URLs are only
+    seeds for a SiteCrawler that follows links (and, with sitemaps, the
+    sites' sitemaps) up to max_pages pages. measure_resources scores
+    performance from each page's measured weight instead of its load time.
+    keyword_mode 'fast' uses FastKeywordExtractor instead of RAKE + TextBlob.
+    A StageMetrics `metrics` collects stage timings from the analyzer and
+    any pool workers. Only the first max_bytes of each decompressed page
+    are read; longer pages are analyzed from that part and marked truncated.
+    A DuplicateIndex `duplicate_index` flags near-duplicate pages, and with
+    skip_duplicate_keywords their keywords aren't extracted (in-process
+    analysis only). With a WorkQueue `queue` the URLs are added to it and
+    this process works through it alongside any other workers sharing the
+    file (see work_through_queue); max_pages then caps the whole queue.
+    """
+    if state is not None and (cache_dir or memo_path):
+        raise ValueError("An audit state already caches responses and results")
+    rules = None
+    if rules_path:
+        with open(rules_path, encoding='utf-8') as f:
+            rules = json.load(f)
+    keyword_index = None
+    if keyword_index_path:
+        if os.path.exists(keyword_index_path):
+            keyword_index = SiteKeywordIndex.load(keyword_index_path)
+        else:
+            keyword_index = SiteKeywordIndex()
+    cache = ResponseCache(cache_dir) if cache_dir else state
+    memo = AnalysisMemo(path=memo_path) if memo_path else state
+    analyzer = SEOAnalyzer(engine=engine, user_agent=user_agent, cache=cache, memo=memo,
+                           keyword_index=keyword_index,
+                           rules=RuleSet(rules) if rules is not None else None,
+                           measure_resources=measure_resources, keyword_mode=keyword_mode,
+                           metrics=metrics, max_bytes=max_bytes, duplicate_index=duplicate_index,
+                           skip_duplicate_keywords=skip_duplicate_keywords)
+    for path in html_files:
+        yield path, analyze_html_file(analyzer, path)
+    
+    pool = AnalysisPool(processes=processes, engine=engine, rules=rules,
+                        measure_resources=measure_resources, keyword_mode=keyword_mode,
+                        metrics=metrics, fingerprints=duplicate_index is not None) if processes else None
+    try:
+        if queue is not None and max_pages is not None:
+            queue.max_urls = max_pages
+        if crawl:
+            crawler = SiteCrawler(analyzer=analyzer, concurrency=concurrency, per_host=per_host,
+                                  crawl_delay=crawl_delay, pool=pool,
+                                  max_pages=max_pages if queue is None else None,
+                                  sitemaps=sitemaps, frontier=queue)
+        else:
+            crawler = BulkCrawler(analyzer=analyzer, concurrency=concurrency, per_host=per_host,
+                                  crawl_delay=crawl_delay, pool=pool)
+        if queue is None:
+            yield from crawler.analyze_urls(urls)
+        else:
+            yield from work_through_queue(queue, crawler, urls, crawl, sitemaps)
+    finally:
+        if pool is not None:
+            pool.close()
+        if keyword_index is not None:
+            keyword_index.snapshot(keyword_index_path)
+
+def reaudit(urls, state_path, **options):
+    """Incremental audit: yields (url, seo_data, changes) for every page
+    
+    The AuditState at state_path remembers each URL's validators, content
+    hash and result between runs. Unchanged pages cost a conditional request
+    (or, without validators, a download and hash) instead of a full
+    analysis. `changes` is result_changes() against the previous run;
+    other options are passed to audit().
+    """
+    with AuditState(state_path) as state:
+        for url, seo_data in audit(urls, state=state, **options):
+            yield url, seo_data, result_changes(state.previous(url), seo_data)
+
+class ServiceBusy(Exception):
+    """The analysis queue is full"""
+
+class AnalysisService:
+    """Shared analyze_page service: warm analyzers, coalescing and a TTL cache
+    
+    `workers` threads each take a warmed-up SEOAnalyzer (stopwords, Rake
+    and the noun-phrase tagger loaded once) from a pool while they analyze,
+    since analysis is not safe to run in several threads on one analyzer.
+    The analyzers are built and warmed up in the constructor, so bad options
+    fail there and not on every request, and the warm-up runs stay out of
+    `metrics`. Concurrent requests for the same URL wait on one analysis,
+    and results are served from an LRU cache for `cache_ttl` seconds. At
+    most `max_queue` analyses wait for a worker; beyond that submit() raises
+    ServiceBusy. Request, queue wait and analysis latencies go to `metrics`.
+    """
+    
+    def __init__(self, workers=4, max_queue=64, cache_ttl=300, cache_size=1024,
+                 metrics=None, **analyzer_options):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.metrics = metrics if metrics is not None else StageMetrics()
+        self.analyzer_options = analyzer_options
+        self._analyzers = queue.Queue()
+        for _ in range(workers):
+            self._analyzers.put(self._warm_analyzer())
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()    # url -> (expires, result)
+        self._inflight = {}            # url -> Future
+        self.counts = Counter()        # requests, cache_hits, coalesced, rejected, analyzed, failed
+        self.queued = 0
+        self.active = 0
+        self.started = time.time()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+    
+    def _warm_analyzer(self):
+        analyzer = SEOAnalyzer(**self.analyzer_options)
+        analyzer.analyze_content({'url': None, 'html': "<p>Warm up the keyword extractors.</p>",
+                                  'load_time': 0.0})
+        # Timed from here on; the warm-up is not a request
+        analyzer.metrics = self.metrics
+        return analyzer
+    
+    def submit(self, url, fresh=False):
+        """Future for url's analyze_page result; fresh=True skips the cache"""
+        key = normalize_url(url)
+        if key is None:
+            raise ValueError(f"Not an http(s) URL: {url!r}")
+        with self._lock:
+            self.counts['requests'] += 1
+            if not fresh:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] > time.monotonic():
+                    self._cache.move_to_end(key)
+                    self.counts['cache_hits'] += 1
+                    future = Future()
+                    future.set_result(cached[1])
+                    return future
+            future = self._inflight.get(key)
+            if future is not None:
+                self.counts['coalesced'] += 1
+                return future
+            if self.queued >= self.max_queue:
+                self.counts['rejected'] += 1
+                raise ServiceBusy(f"{self.queued} analyses already waiting")
+            self.queued += 1
+            future = self._inflight[key] = self.executor.submit(self._analyze, key, time.perf_counter())
+        return future
+    
+    def analyze(self, url, fresh=False, timeout=None):
+        """submit() and wait for the result; TimeoutError after `timeout` seconds"""
+        with self.metrics.time('request'):
+            return self.submit(url, fresh).result(timeout)
+    
+    def _analyze(self, url, queued_at):
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        self.metrics.observe('queue_wait', started - queued_at)
+        result = None
+        analyzer = self._analyzers.get()
+        try:
+            result = analyzer.analyze_page(url)
+            return result
+        finally:
+            self._analyzers.put(analyzer)
+            self.metrics.observe('analysis', time.perf_counter() - started, error=result is None or 'error' in result)
+            with self._lock:
+                self.active -= 1
+                del self._inflight[url]
+                if result is not None and 'error' not in result:
+                    self.counts['analyzed'] += 1
+                    self._cache[url] = (time.monotonic() + self.cache_ttl, result)
+                    self._cache.move_to_end(url)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                else:
+                    self.counts['failed'] += 1
+    
+    def stats(self):
+        """Queue depth, in-flight work, counters and latency summaries"""
+        with self._lock:
+            state = {
+                'uptime_seconds': time.time() - self.started,
+                'workers': self.workers,
+                'queue_depth': self.queued,
+                'max_queue': self.max_queue,
+                'active': self.active,
+                'in_flight_urls': len(self._inflight),
+                'cached_results': len(self._cache),
+                **{name: self.counts[name] for name in
+                   ('requests', 'cache_hits', 'coalesced', 'rejected', 'analyzed', 'failed')}
+            }
+        summary = self.metrics.summary()
+        state['latency'] = {stage: summary[stage] for stage in ('request', 'queue_wait', 'analysis')
+                            if stage in summary}
+        return state
+    
+    def prometheus_text(self):
+        """The stage histograms plus queue gauges and request counters"""
+        state = self.stats()
+        lines = [self.metrics.prometheus_text().rstrip('\n')]
+        for name in ('queue_depth', 'active', 'in_flight_urls', 'cached_results'):
+            lines += [f"# TYPE seo_service_{name} gauge", f"seo_service_{name} {state[name]}"]
+        lines.append("# TYPE seo_service_requests_total counter")
+        lines += [f'seo_service_requests_total{{outcome="{name}"}} {state[name]}'
+                  for name in ('cache_hits', 'coalesced', 'rejected', 'analyzed', 'failed')]
+        return '\n'.join(lines) + '\n'
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+def service_server(service, host='127.0.0.1', port=8000, request_timeout=120):
+    """HTTP/JSON front end for an AnalysisService (not yet serving)
+    
+    GET /analyze?url=...[&fresh=1] or POST /analyze with {"url": ...}
+    answers with the analyze_page result (502 when the page could not be
+    analyzed, 503 when the queue is full, 504 after request_timeout).
+    GET /stats gives AnalysisService.stats() as JSON, GET /metrics the
+    Prometheus text, GET /healthz a plain ok.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        
+        def _send(self, status, body, content_type='application/json'):
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def _analyze(self, url, fresh):
+            if not url:
+                self._send(400, {"error": "Missing url"})
+                return
+            try:
+                result = service.analyze(url, fresh=fresh, timeout=request_timeout)
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+            except ServiceBusy as e:
+                self._send(503, {"error": f"Service busy: {e}"})
+            except TimeoutError:
+                self._send(504, {"error": f"Analysis did not finish within {request_timeout} seconds"})
+            except Exception as e:
+                self._send(500, {"error": f"Analysis failed: {e}"})
+            else:
+                self._send(502 if 'error' in result else 200, result)
+        
+        def do_GET(self):
+            parts = urlparse(self.path)
+            query = parse_qs(parts.query)
+            if parts.path == '/analyze':
+                self._analyze(query.get('url', [None])[0], query.get('fresh', ['0'])[0] not in ('0', ''))
+            elif parts.path == '/stats':
+                self._send(200, service.stats())
+            elif parts.path == '/metrics':
+                self._send(200, service.prometheus_text().encode('utf-8'), 'text/plain; version=0.0.4')
+            elif parts.path == '/healthz':
+                self._send(200, b'ok\n', 'text/plain')
+            else:
+                self._send(404, {"error": "Not found"})
+        
+        def do_POST(self):
+            if urlparse(self.path).path != '/analyze':
+                self._send(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                self._send(400, {"error": "Body must be JSON"})
+                return
+            if not isinstance(request, dict):
+                self._send(400, {"error": "Body must be a JSON object"})
+                return
+            self._analyze(request.get('url'), bool(request.get('fresh')))
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+def serve(service, host='127.0.0.1', port=8000, request_timeout=120):
+    """Serve an AnalysisService (see service_server) until interrupted"""
+    server = service_server(service, host, port, request_timeout)
+    print(f"Serving analyses on http://{server.server_address[0]}:{server.server_address[1]}/", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+class JsonlResultWriter:
+    """Appends (source, seo_data) results to a text stream as JSON Lines,
+    flushing after every page so a crashed run keeps what it finished"""
+    
+    def __init__(self, output):
+        self.output = output
+    
+    def write(self, source, seo_data):
+        self.output.write(json.dumps({'url': source, **seo_data}) + '\n')
+        self.output.flush()
+    
+    def close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+# Flat Parquet columns: (name, Arrow type name, value from a result dict)
+RESULT_COLUMNS = (
+    ('title', 'string', lambda d: d['meta']['title']),
+    ('description', 'string', lambda d: d['meta']['description']),
+    ('meta_keywords', 'strings', lambda d: d['meta']['keywords']),
+    ('viewport', 'bool', lambda d: d['meta']['viewport']),
+) + tuple(
+    (f'h{level}', 'strings', lambda d, key=f'h{level}': d['headings'][key]) for level in range(1, 7)
+) + (
+    ('keywords', 'strings', lambda d: d['keywords']),
+    ('link_count', 'int32', lambda d: d['links']['count']),
+    ('internal_links', 'int32', lambda d: d['links']['internal']),
+    ('external_links', 'int32', lambda d: d['links']['external']),
+    ('other_links', 'int32', lambda d: d['links'].get('other')),
+    ('image_count', 'int32', lambda d: d['images']['count']),
+    ('images_with_alt', 'int32', lambda d: d['images']['with_alt']),
+    ('images_without_alt', 'int32', lambda d: d['images']['without_alt']),
+    ('load_time', 'float64', lambda d: d['load_time']),
+    ('mobile_friendly', 'bool', lambda d: d['mobile_friendly']),
+    # Null unless the page was analyzed with measure_resources
+    ('page_bytes', 'int64', lambda d: d['resources']['bytes'] if d.get('resources') else None),
+    ('resource_requests', 'int32', lambda d: d['resources']['requests'] if d.get('resources') else None),
+    ('render_blocking', 'int32', lambda d: d['resources']['render_blocking'] if d.get('resources') else None),
+    ('uncompressed_resources', 'int32',
+     lambda d: d['resources']['uncompressed'] if d.get('resources') else None),
+    ('truncated', 'bool', lambda d: d.get('truncated', False)),
+    ('fingerprint', 'string', lambda d: d.get('fingerprint')),
+    ('duplicate_of', 'string', lambda d: d.get('duplicate_of')),
+    ('seo_score', 'int32', lambda d: d['seo_score']),
+    ('performance_score', 'int32', lambda d: d['performance_score']),
+    ('mobile_score', 'int32', lambda d: d['mobile_score']),
+    ('suggestions', 'strings', lambda d: d['suggestions']),
+    ('developer_recommendations', 'strings', lambda d: d['developer_recommendations']),
+)
+
+class ParquetResultWriter:
+    """Streams (source, seo_data) results into a Parquet file (needs pyarrow)
+    
+    Results are flattened to RESULT_COLUMNS plus `url` and `error` and
+    buffered column by column; every `row_group_size` pages the buffer is
+    written out as one row group, so memory stays flat however long the
+    crawl. Readers can then load just the columns they need, e.g.
+    pyarrow.parquet.read_table(path, columns=['url', 'seo_score']).
+    The file is written under a temporary name and only appears at `path`
+    once close() has written the footer.
+    """
+    
+    def __init__(self, path, row_group_size=1000, compression='zstd'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        types = {'string': pa.string(), 'strings': pa.list_(pa.string()), 'bool': pa.bool_(),
+                 'int32': pa.int32(), 'int64': pa.int64(), 'float64': pa.float64()}
+        self.schema = pa.schema([('url', pa.string()), ('error', pa.string())] +
+                                [(name, types[kind]) for name, kind, _ in RESULT_COLUMNS])
+        self.path = path
+        self.row_group_size = row_group_size
+        self._tmp = path + '.partial'
+        self._writer = pq.ParquetWriter(self._tmp, self.schema, compression=compression)
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+    
+    def write(self, source, seo_data):
+        columns = self._columns
+        columns['url'].append(source)
+        columns['error'].append(seo_data.get('error'))
+        failed = 'error' in seo_data
+        for name, _, get in RESULT_COLUMNS:
+            columns[name].append(None if failed else get(seo_data))
+        self._buffered += 1
+        if self._buffered >= self.row_group_size:
+            self.flush()
+    
+    def flush(self):
+        if not self._buffered:
+            return
+        table = self._pa.Table.from_pydict(self._columns, schema=self.schema)
+        self._writer.write_table(table, row_group_size=self._buffered)
+        for values in self._columns.values():
+            values.clear()
+        self._buffered = 0
+    
+    def close(self):
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.close()
+        self._writer = None
+        os.replace(self._tmp, self.path)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+def write_results(results, writer):
+    """Hand (source, seo_data) pairs to a result writer as they arrive
+    
+    Returns (pages written, pages with errors).
+    """
+    written = errors = 0
+    for source, seo_data in results:
+        writer.write(source, seo_data)
+        written += 1
+        errors += 'error' in seo_data
+    return written, errors
+
+def write_jsonl(results, output):
+    """Write (source, seo_data) pairs as JSON Lines, flushing after every page
+    
+    Returns (pages written, pages with errors).
+    """
+    return write_results(results, JsonlResultWriter(output))
+
+def write_output(results, path, output_format='jsonl', row_group_size=1000):
+    """Write results as JSON Lines (appended; '-' is stdout) or Parquet
+    
+    Returns (pages written, pages with errors).
+    """
+    if output_format == 'parquet':
+        with ParquetResultWriter(path, row_group_size=row_group_size) as writer:
+            return write_results(results, writer)
+    if path == '-':
+        return write_jsonl(results, sys.stdout)
+    with open(path, 'a', encoding='utf-8') as output:
+        return write_jsonl(results, output)
+
+def write_metrics(metrics, path):
+    """Prometheus text for a run, written whole so a textfile collector
+    never reads a half-written file"""
+    tmp = path + '.partial'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(metrics.prometheus_text())
+    os.replace(tmp, path)
+
+def print_stage_summary(summary, output=None):
+    output = output or sys.stderr
+    print(f"{'stage':<12} {'count':>7} {'errors':>6} {'total s':>9} {'mean ms':>9} "
+          f"{'p95 ms':>8} {'KB':>9}", file=output)
+    for stage, stats in sorted(summary.items(), key=lambda item: -item[1]['seconds']):
+        print(f"{stage:<12} {stats['count']:>7} {stats['errors']:>6} {stats['seconds']:>9.2f} "
+              f"{stats['mean_seconds'] * 1000:>9.2f} {stats['p95_seconds'] * 1000:>8.1f} "
+              f"{stats['bytes'] / 1024:>9.1f}", file=output)
+
+def build_arg_parser():
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Professional SEO Analyzer. Without a command the desktop app starts.")
+    commands = parser.add_subparsers(dest='command')
+    
+    analyze = commands.add_parser('analyze', help="audit URLs or saved HTML pages headlessly, writing JSON Lines")
+    analyze.add_argument('urls', nargs='*', help="URLs to analyze")
+    analyze.add_argument('--url-file', action='append', default=[], help="file with one URL per line")
+    analyze.add_argument('--sitemap', action='append', default=[], help="sitemap or sitemap index URL")
+    analyze.add_argument('--html', action='append', default=[], help="local HTML file to analyze")
+    analyze.add_argument('-o', '--output', default='-',
+                         help="output file, appended to for JSON Lines (default: stdout)")
+    analyze.add_argument('--format', choices=('jsonl', 'parquet'),
+                         help="output format (default: parquet for .parquet files, else jsonl)")
+    analyze.add_argument('--row-group-size', type=int, default=1000,
+                         help="pages per Parquet row group")
+    analyze.add_argument('--engine', choices=SEOAnalyzer.ENGINES, default='soup')
+    analyze.add_argument('--keywords', choices=SEOAnalyzer.KEYWORD_MODES, default='nlp',
+                         help="keyword extractor: RAKE + TextBlob noun phrases, or the fast built-in one")
+    analyze.add_argument('--concurrency', type=int, default=16, help="fetches in flight overall")
+    analyze.add_argument('--per-host', type=int, default=2, help="fetches in flight per host")
+    analyze.add_argument('--crawl-delay', type=float, default=1.0, help="seconds between requests to one host")
+    analyze.add_argument('--processes', type=int, default=0, help="analysis worker processes (0: in-process)")
+    analyze.add_argument('--cache-dir', help="on-disk response cache for conditional re-fetches")
+    analyze.add_argument('--memo', help="SQLite file memoizing analyses by content hash")
+    analyze.add_argument('--user-agent')
+    analyze.add_argument('--keyword-index', help="site keyword index file for BM25 keyword ranking")
+    analyze.add_argument('--rules', help="JSON file of suggestion rules replacing the built-in ones")
+    analyze.add_argument('--crawl', action='store_true',
+                         help="follow links from the given URLs, honouring robots.txt")
+    analyze.add_argument('--max-pages', type=int, help="with --crawl, stop after this many pages")
+    analyze.add_argument('--no-sitemaps', action='store_true',
+                         help="with --crawl, don't seed from the sites' own sitemaps")
+    analyze.add_argument('--measure-resources', action='store_true',
+                         help="size each page's images, scripts and stylesheets for the performance score")
+    analyze.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                         help="analyze at most this many decompressed bytes of each page")
+    analyze.add_argument('--duplicates', action='store_true',
+                         help="flag near-duplicate pages by SimHash and report the clusters")
+    analyze.add_argument('--duplicate-distance', type=int, default=3,
+                         help="most differing fingerprint bits for a near-duplicate (default 3)")
+    analyze.add_argument('--skip-duplicate-keywords', action='store_true',
+                         help="with --duplicates, don't extract keywords of near-duplicate pages")
+    analyze.add_argument('--metrics', metavar='FILE',
+                         help="write per-stage timings here in Prometheus text format and print a summary")
+    analyze.add_argument('--state', help="SQLite audit state for incremental re-audits")
+    analyze.add_argument('--queue', metavar='FILE',
+                         help="SQLite work queue shared with other workers; given URLs are added to it "
+                              "and an interrupted audit resumes where it stopped")
+    analyze.add_argument('--worker-id', help="this worker's name in the queue (default: host:pid)")
+    analyze.add_argument('--lease', type=float, default=300,
+                         help="seconds a worker holds queued URLs without renewing (default 300)")
+    analyze.add_argument('--hosts-per-worker', type=int, default=8,
+                         help="hosts a queue worker crawls at a time; no other worker crawls them meanwhile")
+    analyze.add_argument('--no-wal', action='store_true',
+                         help="the queue file is on a network filesystem shared by several machines")
+    analyze.add_argument('--progress-interval', type=float, default=10,
+                         help="seconds between queue progress lines")
+    analyze.add_argument('--changes-only', action='store_true',
+                         help="with --state, write only the score and suggestion changes of each page")
+    
+    serve_parser = commands.add_parser('serve', help="run the analyzer as an HTTP/JSON service")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8000)
+    serve_parser.add_argument('--workers', type=int, default=4, help="analyses run at once")
+    serve_parser.add_argument('--max-queue', type=int, default=64, help="analyses waiting before requests get a 503")
+    serve_parser.add_argument('--cache-ttl', type=float, default=300, help="seconds a result is reused")
+    serve_parser.add_argument('--cache-size', type=int, default=1024, help="results kept in the cache")
+    serve_parser.add_argument('--timeout', type=float, default=120, help="seconds a request waits for its analysis")
+    serve_parser.add_argument('--engine', choices=SEOAnalyzer.ENGINES, default='soup')
+    serve_parser.add_argument('--keywords', choices=SEOAnalyzer.KEYWORD_MODES, default='nlp')
+    serve_parser.add_argument('--user-agent')
+    serve_parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                              help="analyze at most this many decompressed bytes of each page")
+    
+    queue_status = commands.add_parser('queue-status', help="progress of a work queue, or export its results")
+    queue_status.add_argument('queue')
+    queue_status.add_argument('--export', metavar='OUTPUT',
+                              help="write every finished page's result here (.parquet or JSON Lines)")
+    queue_status.add_argument('--no-wal', action='store_true')
+    return parser
+
+def run_gui():
+    # The desktop app fetches missing NLTK data on first run, as it always has
+    ensure_nltk_data(download=True)
+    _import_gui()
+    root = tk.Tk()
     app = SEOAnalyzerApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    
+    if args.command is None:
+        run_gui()
+        return 0
+    
+    if args.command == 'analyze':
+        if not (args.urls or args.url_file or args.sitemap or args.html or args.queue):
+            print("Nothing to analyze: give URLs, --url-file, --sitemap, --html or --queue", file=sys.stderr)
+            return 2
+        # Sitemaps are fetched with the same User-Agent as the pages
+        sitemap_analyzer = SEOAnalyzer(user_agent=args.user_agent)
+        urls = itertools.chain(args.urls, *map(read_url_list, args.url_file),
+                               *(fetch_sitemap_urls(sitemap, sitemap_analyzer) for sitemap in args.sitemap))
+        if not (args.crawl or args.queue):
+            urls = list(urls)
+        # else URLs are read lazily; the crawl frontier or queue keeps memory bounded
+        
+        output_format = args.format or ('parquet' if args.output.endswith('.parquet') else 'jsonl')
+        if output_format == 'parquet' and args.output == '-':
+            print("Parquet output needs a file: use -o results.parquet", file=sys.stderr)
+            return 2
+        if args.state and (args.cache_dir or args.memo):
+            print("--state already caches responses and results; drop --cache-dir/--memo", file=sys.stderr)
+            return 2
+        if args.changes_only and (not args.state or output_format != 'jsonl'):
+            print("--changes-only needs --state and JSON Lines output", file=sys.stderr)
+            return 2
+        if args.skip_duplicate_keywords and not args.duplicates:
+            print("--skip-duplicate-keywords needs --duplicates", file=sys.stderr)
+            return 2
+        
+        options = dict(html_files=args.html, engine=args.engine, concurrency=args.concurrency,
+                       per_host=args.per_host, crawl_delay=args.crawl_delay,
+                       processes=args.processes, user_agent=args.user_agent,
+                       keyword_index_path=args.keyword_index, rules_path=args.rules,
+                       crawl=args.crawl, max_pages=args.max_pages, sitemaps=not args.no_sitemaps,
+                       measure_resources=args.measure_resources, keyword_mode=args.keywords,
+                       metrics=StageMetrics() if args.metrics else None, max_bytes=args.max_bytes,
+                       duplicate_index=DuplicateIndex(args.duplicate_distance) if args.duplicates else None,
+                       skip_duplicate_keywords=args.skip_duplicate_keywords)
+        queue = None
+        if args.queue:
+            queue = options['queue'] = WorkQueue(args.queue, worker=args.worker_id, lease_seconds=args.lease,
+                                                 hosts_per_worker=args.hosts_per_worker,
+                                                 wal=not args.no_wal)
+        try:
+            if args.state:
+                changed = reaudit(urls, args.state, **options)
+                if args.changes_only:
+                    results = ((url, changes) for url, _, changes in changed if changes)
+                else:
+                    results = ((url, seo_data) for url, seo_data, _ in changed)
+            else:
+                results = audit(urls, cache_dir=args.cache_dir, memo_path=args.memo, **options)
+            if queue is not None:
+                results = report_progress(results, queue, args.progress_interval)
+            written, errors = write_output(results, args.output, output_format, args.row_group_size)
+        finally:
+            if queue is not None:
+                queue.close()
+        if args.changes_only:
+            print(f"{written} pages changed, {errors} failed", file=sys.stderr)
+        else:
+            print(f"{written} pages analyzed, {errors} failed", file=sys.stderr)
+        if args.duplicates:
+            clusters = options['duplicate_index'].clusters()
+            duplicates = sum(len(pages) for pages in clusters.values())
+            print(f"{duplicates} near-duplicate pages in {len(clusters)} clusters", file=sys.stderr)
+        if args.metrics:
+            write_metrics(options['metrics'], args.metrics)
+            print_stage_summary(options['metrics'].summary())
+        return 1 if errors else 0
+    
+    if args.command == 'serve':
+        try:
+            service = AnalysisService(workers=args.workers, max_queue=args.max_queue,
+                                      cache_ttl=args.cache_ttl, cache_size=args.cache_size,
+                                      engine=args.engine, keyword_mode=args.keywords,
+                                      user_agent=args.user_agent, max_bytes=args.max_bytes)
+        except Exception as e:
+            print(f"Could not start the analyzers: {e}", file=sys.stderr)
+            return 1
+        serve(service, args.host, args.port, args.timeout)
+        return 0
+    
+    if args.command == 'queue-status':
+        if not os.path.exists(args.queue):
+            print(f"No queue at {args.queue}", file=sys.stderr)
+            return 2
+        with WorkQueue(args.queue, wal=not args.no_wal) as queue:
+            print(json.dumps(queue.progress()))
+            print(format_progress(queue.progress()), file=sys.stderr)
+            if args.export:
+                output_format = 'parquet' if args.export.endswith('.parquet') else 'jsonl'
+                written, errors = write_output(queue.results(), args.export, output_format)
+                print(f"{written} pages exported, {errors} failed", file=sys.stderr)
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""Benchmarks and test fixtures for the SEO keyword generator
+
+The app is a single script whose file name has spaces, so it can't be
+imported by name; load_app() loads it by path, once, and `seo` is the
+loaded module.
+"""
+import importlib.util
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, 'SEO Keyword generator.py')
+
+def load_app(name='seo_keyword_generator'):
+    """The app module, loaded from APP_PATH and registered as `name`"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # Registered before it runs so worker processes and pickling find it
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+seo = load_app()
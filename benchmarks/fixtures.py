@@ -0,0 +1,185 @@
+"""Fixture pages and a local HTTP server for the benchmarks and tests"""
+import hashlib
+import mimetypes
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+class LocalPageServer:
+    """In-process HTTP stand-in that serves a {path: body} mapping
+    
+    Use it as a context manager and build URLs with url(path). A body may
+    be a (body, headers) pair to send extra headers, e.g. a gzipped body
+    with its Content-Encoding, and an int body is answered with that error
+    status. Responses carry an ETag and honour
+    If-None-Match with a 304; HEAD and single byte-range requests work too.
+    `latency` seconds pass before each response and bodies are sent at
+    `bandwidth` bytes per second (per connection), to stand in for a real
+    network in benchmarks.
+    """
+    
+    def __init__(self, pages, host='127.0.0.1', port=0, latency=0.0, bandwidth=None):
+        self.pages = pages
+        self.latency = latency
+        self.bandwidth = bandwidth
+        pages_ref = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self, send_body=True):
+                if pages_ref.latency:
+                    time.sleep(pages_ref.latency)
+                body = pages_ref.pages.get(self.path, 404)
+                if isinstance(body, int):
+                    self.send_error(body)
+                    return
+                body, headers = body if isinstance(body, tuple) else (body, {})
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                headers = dict(headers)
+                content_type = mimetypes.guess_type(urlparse(self.path).path)[0] or 'text/html'
+                if content_type.startswith('text/'):
+                    content_type += '; charset=utf-8'
+                headers.setdefault('Content-Type', content_type)
+                match = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+                if match and int(match.group(1)) < len(body):
+                    start = int(match.group(1))
+                    end = min(int(match.group(2) or len(body) - 1), len(body) - 1)
+                    self.send_response(206)
+                    headers['Content-Range'] = f"bytes {start}-{end}/{len(body)}"
+                    body = body[start:end + 1]
+                else:
+                    self.send_response(200)
+                self.send_header('ETag', etag)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self._send_body(body)
+            
+            def _send_body(self, body):
+                if not pages_ref.bandwidth:
+                    self.wfile.write(body)
+                    return
+                # Throttled in 16 KB chunks, each paced to the bandwidth
+                chunk_size = 16384
+                start = time.monotonic()
+                for offset in range(0, len(body), chunk_size):
+                    self.wfile.write(body[offset:offset + chunk_size])
+                    ahead = start + (offset + chunk_size) / pages_ref.bandwidth - time.monotonic()
+                    if ahead > 0:
+                        time.sleep(ahead)
+            
+            def do_HEAD(self):
+                self.do_GET(send_body=False)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+    
+    def url(self, path='/'):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+    
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+# Words for the generated fixture pages; a fixed seed makes every run
+# build byte-identical pages
+FIXTURE_WORDS = (
+    "search engine optimization content marketing keyword research ranking traffic "
+    "organic audience conversion landing page product category review price shipping "
+    "quality design performance mobile responsive image gallery checkout customer "
+    "support guide tutorial analytics report strategy backlink domain authority "
+    "crawl index sitemap metadata title description heading structure navigation "
+    "footer sidebar article author publish update summary feature benefit compare "
+    "best cheap fast free online local global brand store order delivery return"
+).split()
+
+def _fixture_sentence(rng, words=12):
+    text = ' '.join(rng.choice(FIXTURE_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+def _fixture_head(rng, title, scripts=2, stylesheets=1):
+    head = [f"<title>{title}</title>",
+            "<meta name='viewport' content='width=device-width, initial-scale=1'>",
+            f"<meta name='description' content='{_fixture_sentence(rng, 20)}'>",
+            "<meta name='keywords' content='seo, content, ranking'>"]
+    head += [f"<link rel='stylesheet' href='/static/style{i}.css'>" for i in range(stylesheets)]
+    head += [f"<script src='/static/app{i}.js'></script>" for i in range(scripts)]
+    return '<head>' + ''.join(head) + '</head>'
+
+def _fixture_nav(links):
+    return '<nav><ul>' + ''.join(f"<li><a href='/section/{i}'>Section {i}</a></li>"
+                                 for i in range(links)) + '</ul></nav>'
+
+def fixture_corpus(seed=0):
+    """Representative generated pages, {name: html}, smallest first
+    
+    landing: a tiny marketing page; article: a long blog post; docs: a
+    documentation page with deep headings and code; listing: a
+    multi-megabyte product listing with thousands of cards.
+    """
+    rng = random.Random(seed)
+    corpus = OrderedDict()
+    
+    corpus['landing'] = ('<!DOCTYPE html><html>' + _fixture_head(rng, "Fast SEO audits", 1, 1) +
+                         '<body>' + _fixture_nav(5) + "<h1>Grow your organic traffic</h1>" +
+                         ''.join(f"<p>{_fixture_sentence(rng)}</p>" for _ in range(4)) +
+                         "<img src='/img/hero.jpg' alt='Hero image'><a href='https://example.org/'>Partner</a>"
+                         '</body></html>')
+    
+    sections = []
+    for i in range(12):
+        sections.append(f"<h2>{_fixture_sentence(rng, 5)}</h2>")
+        sections += [f"<p>{' '.join(_fixture_sentence(rng) for _ in range(6))}</p>" for _ in range(5)]
+        sections.append(f"<img src='/img/article{i}.jpg'" + (" alt='Illustration'>" if i % 3 else '>'))
+    corpus['article'] = ('<!DOCTYPE html><html>' + _fixture_head(rng, "How to plan keyword research", 3, 2) +
+                         '<body>' + _fixture_nav(20) + '<article><h1>How to plan keyword research</h1>' +
+                         ''.join(sections) + '</article>' +
+                         ''.join(f"<a href='https://ref{i}.example.com/'>Reference {i}</a>" for i in range(10)) +
+                         '</body></html>')
+    
+    sections = []
+    for i in range(40):
+        sections.append(f"<h2 id='s{i}'>{_fixture_sentence(rng, 4)}</h2>")
+        for j in range(3):
+            sections.append(f"<h3>{_fixture_sentence(rng, 3)}</h3><p>{_fixture_sentence(rng, 40)}</p>")
+            sections.append("<pre><code>" + '\n'.join(f"value_{k} = analyze(page, depth={k})" for k in range(8)) +
+                            "</code></pre>")
+        sections.append(f"<p>See <a href='/docs/page{i}'>page {i}</a> and <a href='#s{i}'>this section</a>.</p>")
+    corpus['docs'] = ('<!DOCTYPE html><html>' + _fixture_head(rng, "Analyzer API reference", 2, 1) +
+                      '<body>' + _fixture_nav(60) + '<main><h1>Analyzer API reference</h1>' + ''.join(sections) +
+                      '</main><style>.hidden{display:none}</style><script>var config = {};</script></body></html>')
+    
+    cards = []
+    for i in range(4000):
+        cards.append(f"<div class='card'><a href='/product/{i}'><img src='/img/product{i}.jpg'"
+                     + (f" alt='Product {i}'" if i % 5 else '') + "></a>"
+                     f"<h3><a href='/product/{i}'>{_fixture_sentence(rng, 4)}</a></h3>"
+                     f"<p class='price'>${rng.randint(5, 500)}.{rng.randint(0, 99):02d}</p>"
+                     f"<p>{_fixture_sentence(rng, 60)}</p>"
+                     f"<button data-sku='SKU{i:06d}'>Add to cart</button></div>")
+    corpus['listing'] = ('<!DOCTYPE html><html>' + _fixture_head(rng, "All products", 6, 3) +
+                         '<body>' + _fixture_nav(120) + '<h1>All products</h1><div class="grid">' +
+                         ''.join(cards) + '</div></body></html>')
+    return corpus
@@ -0,0 +1,520 @@
+"""Extractor, page, bulk and memory benchmarks on the fixture corpus
+
+    python -m benchmarks.suite run -o before.json
+    python -m benchmarks.suite compare before.json after.json
+
+The other commands benchmark one change each, on files of your own:
+pages for parse, startup and keywords, JSON Lines results of the app's
+analyze command for score, memory and rules.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from benchmarks import APP_PATH, REPO_ROOT, seo
+from benchmarks.fixtures import LocalPageServer, fixture_corpus
+
+# Extractors timed per fixture by run_benchmark_suite, on an already parsed page
+BENCHMARK_EXTRACTORS = ('extract_meta_data', 'extract_headings', 'extract_text_from_html',
+                        'extract_links', 'extract_images', 'extract_resources',
+                        'check_mobile_responsiveness', 'extract_keywords')
+
+def _git_commit():
+    import subprocess
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _timings(func, rounds, min_sample=0.005):
+    # Like timeit: calls are batched until one sample takes min_sample
+    # seconds, so microsecond extractors are not lost in timer noise
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= min_sample:
+            break
+        number *= 10
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    samples.sort()
+    return {'min_seconds': samples[0], 'median_seconds': samples[len(samples) // 2]}
+
+def _peak_memory(func):
+    # Peak Python allocation while func runs, above what was held before
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        return tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+def run_benchmark_suite(rounds=5, latency=0.02, bandwidth=10000000, bulk_pages=100,
+                        concurrency=16, engine='soup', keyword_mode='fast', seed=0):
+    """Benchmark the analyzer on fixture_corpus() and return the results
+    
+    For every fixture: each BENCHMARK_EXTRACTORS method and the parse
+    (best and median of `rounds`), full analyze_page latency against a
+    LocalPageServer with `latency` seconds and `bandwidth` bytes/s, and the
+    peak memory of one analysis. Then bulk throughput: `bulk_pages` pages
+    (the fixtures in turn) through a BulkCrawler at `concurrency`. The
+    result is plain JSON data, with the commit and settings, for
+    compare_benchmarks(). keyword_mode defaults to 'fast': RAKE + TextBlob
+    takes minutes on the listing page, so benchmark it on purpose.
+    """
+    import platform
+    corpus = fixture_corpus(seed)
+    analyzer = seo.SEOAnalyzer(engine=engine, keyword_mode=keyword_mode)
+    # Stopwords, Rake and the noun-phrase tagger are loaded outside the timings
+    analyzer.analyze_content({'url': None, 'html': corpus['landing'], 'load_time': 0.0})
+    
+    results = {
+        'format': 1,
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'settings': {'rounds': rounds, 'latency': latency, 'bandwidth': bandwidth,
+                     'bulk_pages': bulk_pages, 'concurrency': concurrency,
+                     'engine': engine, 'keyword_mode': keyword_mode, 'seed': seed},
+        'fixtures': {name: {'bytes': len(html.encode('utf-8'))} for name, html in corpus.items()},
+        'extractors': {},
+        'analyze_page': {},
+        'memory': {}
+    }
+    
+    for name, html in corpus.items():
+        page = analyzer.parse_page(html)
+        timings = {'parse_page': _timings(lambda: analyzer.parse_page(html), rounds)}
+        for method in BENCHMARK_EXTRACTORS:
+            timings[method] = _timings(lambda: getattr(analyzer, method)(page), rounds)
+        results['extractors'][name] = timings
+        results['memory'][name] = {'analysis_peak_bytes': _peak_memory(
+            lambda: analyzer.analyze_content({'url': None, 'html': html, 'load_time': 0.0}))}
+    
+    paths = {f'/{name}': html for name, html in corpus.items()}
+    names = list(corpus)
+    for i in range(bulk_pages):
+        paths[f'/bulk/{i}'] = corpus[names[i % len(names)]]
+    with LocalPageServer(paths, latency=latency, bandwidth=bandwidth) as server:
+        # analyze_page announces every page on stderr; keep that out of the report
+        with contextlib.redirect_stderr(io.StringIO()):
+            for name in corpus:
+                url = server.url(f'/{name}')
+                results['analyze_page'][name] = _timings(lambda: analyzer.analyze_page(url), rounds)
+        
+        crawler = seo.BulkCrawler(analyzer=analyzer, concurrency=concurrency, per_host=concurrency,
+                                  crawl_delay=0)
+        urls = [server.url(f'/bulk/{i}') for i in range(bulk_pages)]
+        failed = 0
+        start = time.perf_counter()
+        for _, seo_data in crawler.analyze_urls(urls):
+            failed += 'error' in seo_data
+        elapsed = time.perf_counter() - start
+        total_bytes = sum(len(paths[f'/bulk/{i}']) for i in range(bulk_pages))
+        results['bulk'] = {
+            'pages': bulk_pages,
+            'failed': failed,
+            'seconds': elapsed,
+            'pages_per_second': bulk_pages / elapsed,
+            'bytes_per_second': total_bytes / elapsed
+        }
+    results['memory']['max_rss_bytes'] = _max_rss()
+    return results
+
+def _max_rss():
+    # Peak resident set size of this process, where the platform reports it
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def compare_benchmarks(old, new):
+    """(metric, old, new, new / old) for every number two suite results share
+    
+    Metrics are dotted paths such as 'analyze_page.listing.median_seconds';
+    for times and bytes a ratio above 1 is a regression, for per-second
+    rates an improvement.
+    """
+    def numbers(data, prefix=''):
+        for key, value in data.items():
+            path = f'{prefix}{key}'
+            if isinstance(value, dict):
+                yield from numbers(value, path + '.')
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield path, value
+    
+    skip = ('settings.', 'fixtures.', 'format')
+    old_numbers = dict(numbers(old))
+    rows = []
+    for path, value in numbers(new):
+        if path.startswith(skip) or path not in old_numbers:
+            continue
+        before = old_numbers[path]
+        ratio = value / before if before else 1.0 if value == before else float('inf')
+        rows.append((path, before, value, ratio))
+    return rows
+
+# Runs in a fresh interpreter so imports are measured cold
+_STARTUP_PROBE = '''
+import importlib.util, json, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('seo_startup_probe', sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter()
+heavy_at_import = sorted(m for m in ('tkinter', 'PIL', 'nltk', 'textblob', 'rake_nltk') if m in sys.modules)
+analyzer = module.SEOAnalyzer()
+with open(sys.argv[2], encoding='utf-8', errors='replace') as f:
+    html = f.read()
+analyzer.analyze_content({'html': html, 'load_time': 0.0})
+analyzed = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - start,
+    'first_analysis_seconds': analyzed - imported,
+    'loaded_at_import': heavy_at_import,
+}))
+'''
+
+def benchmark_startup(html_path, runs=3):
+    """Cold import and first-analysis latency, each run in a new process"""
+    import subprocess
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', _STARTUP_PROBE, APP_PATH, html_path],
+                                capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        'import_seconds': min(r['import_seconds'] for r in results),
+        'first_analysis_seconds': min(r['first_analysis_seconds'] for r in results),
+        'loaded_at_import': results[0]['loaded_at_import']
+    }
+
+def benchmark_page_parsing(html, rounds=5):
+    """Time the old one-parse-per-extractor path against a single ParsedPage"""
+    def legacy_extract():
+        # The extractor chain before ParsedPage: one BeautifulSoup per method
+        soup = BeautifulSoup(html, 'html.parser')
+        soup.find('meta', attrs={'name': 'viewport'})
+        soup = BeautifulSoup(html, 'html.parser')
+        for name in ('description', 'keywords', 'viewport'):
+            soup.find('meta', attrs={'name': name})
+            soup.find('meta', attrs={'name': name})
+        soup.find('title')
+        soup = BeautifulSoup(html, 'html.parser')
+        [h.text.strip() for i in range(1, 7) for h in soup.find_all(f'h{i}')]
+        soup = BeautifulSoup(html, 'html.parser')
+        for tag in soup(list(seo.NON_CONTENT_TAGS)):
+            tag.decompose()
+        seo.clean_text(soup.get_text())
+        BeautifulSoup(html, 'html.parser').find_all('a', href=True)
+        BeautifulSoup(html, 'html.parser').find_all('img')
+    
+    analyzer = seo.SEOAnalyzer()
+    
+    def single_pass_extract():
+        page = analyzer.parse_page(html)
+        analyzer.check_mobile_responsiveness(page)
+        analyzer.extract_meta_data(page)
+        analyzer.extract_headings(page)
+        analyzer.extract_text_from_html(page)
+        analyzer.extract_links(page)
+        analyzer.extract_images(page)
+    
+    def best_of(func):
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
+    
+    legacy = best_of(legacy_extract)
+    single_pass = best_of(single_pass_extract)
+    return {
+        'html_bytes': len(html.encode('utf-8')),
+        'legacy_seconds': legacy,
+        'single_pass_seconds': single_pass,
+        'speedup': legacy / single_pass if single_pass else float('inf')
+    }
+
+def compare_keyword_extractors(pages, limit=15):
+    """Quality and throughput of the fast keyword mode against RAKE + TextBlob
+    
+    `pages` is a fixture corpus of HTML documents. Each is parsed once up
+    front so only keyword extraction is timed; the fast mode runs as one
+    batch. Overlap is the share of the current top `limit` keywords the
+    fast mode also returns, averaged over the pages.
+    """
+    nlp = seo.SEOAnalyzer()
+    fast = seo.SEOAnalyzer(keyword_mode='fast')
+    parsed = [nlp.parse_page(html) for html in pages]
+    if not parsed:
+        raise ValueError("No pages to compare")
+    # Build and train both extractors outside the timings
+    nlp.keyword_candidates("<p>Warm up the keyword extractors.</p>")
+    fast.keyword_candidates("<p>Warm up the keyword extractors.</p>")
+    
+    start = time.perf_counter()
+    expected = [[kw for kw, _ in candidates.most_common(limit)]
+                for candidates in nlp.keyword_candidates_batch(parsed)]
+    nlp_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = [[kw for kw, _ in candidates.most_common(limit)]
+              for candidates in fast.keyword_candidates_batch(parsed)]
+    fast_seconds = time.perf_counter() - start
+    
+    overlaps = [len(set(a) & set(e)) / len(e) for a, e in zip(actual, expected) if e]
+    return {
+        'pages': len(parsed),
+        'nlp_pages_per_second': len(parsed) / nlp_seconds if nlp_seconds else float('inf'),
+        'fast_pages_per_second': len(parsed) / fast_seconds if fast_seconds else float('inf'),
+        'overlap': sum(overlaps) / len(overlaps) if overlaps else 1.0,
+        'min_overlap': min(overlaps, default=1.0)
+    }
+
+def benchmark_batch_scoring(records, rounds=5):
+    """Time the scalar calculate_*_score path against BatchScorer
+    
+    Raises ValueError if the two disagree on any page.
+    """
+    analyzer = seo.SEOAnalyzer()
+    scorer = seo.BatchScorer()
+    records = list(records)
+    
+    def scalar():
+        return [(analyzer.calculate_seo_score(data), analyzer.calculate_performance_score(data),
+                 analyzer.calculate_mobile_score(data)) for data in records]
+    
+    def best_of(func):
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - start)
+        return best, result
+    
+    scalar_seconds, expected = best_of(scalar)
+    batch_seconds, scores = best_of(lambda: scorer.score(records))
+    columns = scorer.columns(records)
+    columns_seconds, _ = best_of(lambda: scorer.score_columns(columns))
+    actual = list(zip(*(column.tolist() for column in scores)))
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    if mismatches:
+        raise ValueError(f"batch scores differ from the scalar rules on {mismatches} pages")
+    return {
+        'pages': len(records),
+        'scalar_seconds': scalar_seconds,
+        'batch_seconds': batch_seconds,
+        'columns_only_seconds': columns_seconds,
+        'speedup': scalar_seconds / batch_seconds if batch_seconds else float('inf')
+    }
+
+def benchmark_result_memory(lines):
+    """Memory held by results as dicts vs PageResult records
+    
+    `lines` are JSON Lines rows as written by write_jsonl; failed pages are
+    skipped. Each side is built from the JSON text so neither shares strings
+    with the other. Raises ValueError if a record doesn't convert back to
+    the dict it came from.
+    """
+    rows = [line for line in lines if line.strip() and 'error' not in json.loads(line)]
+    
+    def held(build):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            kept = build()
+            return tracemalloc.get_traced_memory()[0] - before, kept
+        finally:
+            tracemalloc.stop()
+    
+    def as_record(line):
+        data = json.loads(line)
+        return seo.PageResult.from_dict(data, data.pop('url', None))
+    
+    dict_bytes, dicts = held(lambda: [json.loads(line) for line in rows])
+    record_bytes, records = held(lambda: [as_record(line) for line in rows])
+    for data, record in zip(dicts, records):
+        url = data.pop('url', None)
+        if record.to_dict() != data or record.url != url:
+            raise ValueError(f"PageResult round trip changed the result for {url}")
+    return {
+        'pages': len(rows),
+        'dict_bytes': dict_bytes,
+        'record_bytes': record_bytes,
+        'ratio': dict_bytes / record_bytes if record_bytes else float('inf')
+    }
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the SEO analyzer on a generated fixture corpus")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run = commands.add_parser('run', help="extractor, page, bulk and memory benchmarks on a fixture corpus")
+    run.add_argument('-o', '--output', help="write the results here as JSON")
+    run.add_argument('--rounds', type=int, default=5)
+    run.add_argument('--latency', type=float, default=0.02, help="seconds the local server waits per response")
+    run.add_argument('--bandwidth', type=float, default=10e6, help="local server bytes per second (0: unlimited)")
+    run.add_argument('--bulk-pages', type=int, default=100)
+    run.add_argument('--concurrency', type=int, default=16)
+    run.add_argument('--engine', choices=seo.SEOAnalyzer.ENGINES, default='soup')
+    run.add_argument('--keywords', choices=seo.SEOAnalyzer.KEYWORD_MODES, default='fast',
+                     help="keyword extractor to benchmark (nlp is very slow on the listing page)")
+    
+    compare = commands.add_parser('compare', help="compare two result files")
+    compare.add_argument('old')
+    compare.add_argument('new')
+    compare.add_argument('--threshold', type=float, default=0.1,
+                         help="flag changes larger than this fraction (default 0.1)")
+    
+    write_fixtures = commands.add_parser('write-fixtures', help="save the fixture pages as HTML files")
+    write_fixtures.add_argument('directory')
+    
+    parse = commands.add_parser('parse', help="single-pass parsing vs the old extractor path")
+    parse.add_argument('file')
+    
+    startup = commands.add_parser('startup', help="cold import and first-analysis latency")
+    startup.add_argument('file')
+    
+    score = commands.add_parser('score', help="scalar vs vectorized scoring over stored results")
+    score.add_argument('file', help="JSON Lines output of the analyze command")
+    
+    memory = commands.add_parser('memory', help="memory of stored results as dicts vs compact records")
+    memory.add_argument('file', help="JSON Lines output of the analyze command")
+    
+    keywords = commands.add_parser('keywords', help="fast keyword mode vs RAKE + TextBlob")
+    keywords.add_argument('files', nargs='+', help="fixture corpus of HTML pages")
+    
+    rules = commands.add_parser('rules', help="per-rule evaluation cost over stored results")
+    rules.add_argument('file', help="JSON Lines output of the analyze command")
+    rules.add_argument('--rules', help="JSON rule file (default: the built-in rules)")
+    return parser
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    
+    if args.command == 'write-fixtures':
+        os.makedirs(args.directory, exist_ok=True)
+        for name, html in fixture_corpus().items():
+            with open(os.path.join(args.directory, f'{name}.html'), 'w', encoding='utf-8') as f:
+                f.write(html)
+        return 0
+    
+    if args.command == 'run':
+        result = run_benchmark_suite(rounds=args.rounds, latency=args.latency,
+                                     bandwidth=args.bandwidth or None, bulk_pages=args.bulk_pages,
+                                     concurrency=args.concurrency, engine=args.engine,
+                                     keyword_mode=args.keywords)
+        for name, info in result['fixtures'].items():
+            extractors = result['extractors'][name]
+            slowest = max(extractors, key=lambda method: extractors[method]['median_seconds'])
+            print(f"{name:<8} {info['bytes'] / 1024:8.0f} KB  "
+                  f"analyze_page {result['analyze_page'][name]['median_seconds'] * 1000:8.1f} ms  "
+                  f"slowest {slowest} {extractors[slowest]['median_seconds'] * 1000:.1f} ms  "
+                  f"peak {result['memory'][name]['analysis_peak_bytes'] / 1e6:.1f} MB")
+        bulk = result['bulk']
+        print(f"bulk: {bulk['pages']} pages in {bulk['seconds']:.1f} s "
+              f"({bulk['pages_per_second']:.1f} pages/s, {bulk['bytes_per_second'] / 1e6:.1f} MB/s, "
+              f"{bulk['failed']} failed)")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2)
+        return 0
+    
+    if args.command == 'compare':
+        with open(args.old, encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.new, encoding='utf-8') as f:
+            new = json.load(f)
+        if old.get('settings') != new.get('settings'):
+            print("warning: the runs used different settings", file=sys.stderr)
+        regressions = 0
+        for metric, before, after, ratio in compare_benchmarks(old, new):
+            # Rates improve upwards, times and bytes downwards
+            worse = ratio < 1 / (1 + args.threshold) if metric.endswith('per_second') \
+                else ratio > 1 + args.threshold
+            better = ratio > 1 + args.threshold if metric.endswith('per_second') \
+                else ratio < 1 / (1 + args.threshold)
+            regressions += worse
+            flag = 'WORSE' if worse else 'better' if better else ''
+            print(f"{metric:<55} {before:>14.6g} {after:>14.6g} {ratio:>7.2f}x {flag}")
+        return 1 if regressions else 0
+    
+    if args.command == 'parse':
+        with open(args.file, encoding='utf-8', errors='replace') as f:
+            result = benchmark_page_parsing(f.read())
+        print(f"{result['html_bytes']} bytes: "
+              f"legacy {result['legacy_seconds'] * 1000:.1f} ms, "
+              f"single pass {result['single_pass_seconds'] * 1000:.1f} ms "
+              f"({result['speedup']:.1f}x faster)")
+        return 0
+    
+    if args.command == 'startup':
+        result = benchmark_startup(args.file)
+        print(f"cold import {result['import_seconds'] * 1000:.0f} ms, "
+              f"first analysis {result['first_analysis_seconds'] * 1000:.0f} ms, "
+              f"heavy modules loaded at import: {', '.join(result['loaded_at_import']) or 'none'}")
+        return 0
+    
+    if args.command == 'score':
+        result = benchmark_batch_scoring(seo.read_results(args.file))
+        print(f"{result['pages']} pages: "
+              f"scalar {result['scalar_seconds'] * 1000:.1f} ms, "
+              f"batch {result['batch_seconds'] * 1000:.1f} ms "
+              f"({result['speedup']:.1f}x faster, "
+              f"{result['columns_only_seconds'] * 1000:.1f} ms from columns), scores identical")
+        return 0
+    
+    if args.command == 'memory':
+        with open(args.file, encoding='utf-8') as f:
+            result = benchmark_result_memory(f)
+        print(f"{result['pages']} pages: dicts {result['dict_bytes'] / 1e6:.1f} MB, "
+              f"records {result['record_bytes'] / 1e6:.1f} MB ({result['ratio']:.1f}x smaller), "
+              f"round trip identical")
+        return 0
+    
+    if args.command == 'keywords':
+        pages = []
+        for path in args.files:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+        result = compare_keyword_extractors(pages)
+        print(f"{result['pages']} pages: "
+              f"RAKE + TextBlob {result['nlp_pages_per_second']:.1f} pages/s, "
+              f"fast {result['fast_pages_per_second']:.1f} pages/s "
+              f"({result['fast_pages_per_second'] / result['nlp_pages_per_second']:.0f}x), "
+              f"top-15 overlap {result['overlap']:.0%} (worst page {result['min_overlap']:.0%})")
+        return 0
+    
+    if args.command == 'rules':
+        rules = seo.RuleSet.from_file(args.rules, profile=True) if args.rules else seo.RuleSet(profile=True)
+        records = list(seo.read_results(args.file))
+        start = time.perf_counter()
+        rules.evaluate_batch(records)
+        elapsed = time.perf_counter() - start
+        print(f"{len(records)} pages, {len(rules.rules)} rules in {elapsed * 1000:.1f} ms")
+        for rule_id, (evaluated, matched, seconds) in sorted(rules.stats.items(), key=lambda item: -item[1][2]):
+            print(f"  {rule_id:<24} {seconds * 1e6 / max(evaluated, 1):6.2f} us/page  "
+                  f"{matched}/{evaluated} pages")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
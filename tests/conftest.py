@@ -0,0 +1,12 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import fixture_corpus
+
+@pytest.fixture(scope='session')
+def corpus():
+    return fixture_corpus()
@@ -0,0 +1,25 @@
+import requests
+
+from benchmarks.fixtures import LocalPageServer, fixture_corpus
+from benchmarks.suite import compare_benchmarks
+
+def test_fixture_corpus_is_reproducible(corpus):
+    assert list(corpus) == ['landing', 'article', 'docs', 'listing']
+    assert fixture_corpus() == corpus
+    assert fixture_corpus(seed=1) != corpus
+
+def test_local_page_server_revalidates_and_serves_ranges():
+    with LocalPageServer({'/': '<p>Hello</p>'}) as server:
+        response = requests.get(server.url('/'))
+        assert response.text == '<p>Hello</p>'
+        etag = response.headers['ETag']
+        assert requests.get(server.url('/'), headers={'If-None-Match': etag}).status_code == 304
+        partial = requests.get(server.url('/'), headers={'Range': 'bytes=0-0'})
+        assert partial.status_code == 206 and partial.content == b'<'
+        assert requests.get(server.url('/missing')).status_code == 404
+
+def test_compare_benchmarks_pairs_shared_metrics():
+    old = {'settings': {'rounds': 5}, 'bulk': {'pages_per_second': 10.0, 'seconds': 2.0}}
+    new = {'settings': {'rounds': 5}, 'bulk': {'pages_per_second': 20.0, 'seconds': 1.0, 'failed': 0}}
+    assert compare_benchmarks(old, new) == [('bulk.pages_per_second', 10.0, 20.0, 2.0),
+                                            ('bulk.seconds', 2.0, 1.0, 0.5)]
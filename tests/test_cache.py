@@ -0,0 +1,73 @@
+import os
+
+from benchmarks import seo
+from benchmarks.fixtures import LocalPageServer
+
+def test_bodies_round_trip_exactly(tmp_path):
+    cache = seo.ResponseCache(str(tmp_path))
+    body = "<p>Line one\r\nLine two\rcafé ✓</p>\n"
+    cache.store('https://a.com/', body, etag='"1"')
+    assert cache.read_body('https://a.com/') == body
+    size = cache._entries[cache._key('https://a.com/')]
+    assert size == len(body.encode('utf-8'))
+    assert size == os.path.getsize(cache._path(cache._key('https://a.com/'), '.body'))
+    assert seo.ResponseCache(str(tmp_path))._total == size
+
+def test_least_recently_used_bodies_are_evicted(tmp_path):
+    cache = seo.ResponseCache(str(tmp_path), max_bytes=250)
+    for name in ('a', 'b'):
+        cache.store(f'https://{name}.com/', 'x' * 100, etag='"1"')
+    assert cache.lookup('https://a.com/') is not None   # a is now the most recent
+    cache.store('https://c.com/', 'é' * 50, etag='"1"')   # 100 bytes
+    assert cache.lookup('https://b.com/') is None
+    assert cache.lookup('https://a.com/')['etag'] == '"1"'
+    assert cache.read_body('https://c.com/') == 'é' * 50
+    assert len(cache) == 2 and cache._total == 200
+    reopened = seo.ResponseCache(str(tmp_path), max_bytes=250)
+    assert len(reopened) == 2 and reopened._total == 200
+
+def test_unchanged_pages_are_revalidated_and_reused(tmp_path):
+    html = "<title>Cached</title><h1>Cached page</h1><p>Some words about cached pages.</p>"
+    with LocalPageServer({'/': html}) as server:
+        analyzer = seo.SEOAnalyzer(cache=seo.ResponseCache(str(tmp_path)), keyword_mode='fast')
+        first = analyzer.analyze_page(server.url('/'))
+        website_data = analyzer.fetch_website_content(server.url('/'))
+        assert website_data['status'] == 304 and website_data['not_modified']
+        second = analyzer.analyze_content(website_data)
+    assert {k: v for k, v in second.items() if k not in seo.LOAD_DEPENDENT_FIELDS} == \
+        {k: v for k, v in first.items() if k not in seo.LOAD_DEPENDENT_FIELDS}
+
+def test_304_without_a_result_analyzes_the_cached_body(tmp_path):
+    html = "<title>Body only</title>\r\n<h1>From the cache</h1>"
+    with LocalPageServer({'/': html}) as server:
+        cache = seo.ResponseCache(str(tmp_path))
+        etag = seo.requests.get(server.url('/')).headers['ETag']
+        cache.store(server.url('/'), html, etag=etag)
+        analyzer = seo.SEOAnalyzer(cache=cache, keyword_mode='fast')
+        website_data = analyzer.fetch_website_content(server.url('/'))
+    assert website_data['not_modified'] and website_data['html'] == html
+    assert analyzer.analyze_content(website_data)['meta']['title'] == 'Body only'
+
+def test_304_for_an_evicted_body_downloads_the_page_again(tmp_path):
+    html = "<title>Evicted</title>"
+    with LocalPageServer({'/': html}) as server:
+        cache = seo.ResponseCache(str(tmp_path))
+        etag = seo.requests.get(server.url('/')).headers['ETag']
+        cache.store(server.url('/'), html, etag=etag)
+        # As if another thread evicted it between lookup() and the 304
+        os.remove(cache._path(cache._key(server.url('/')), '.body'))
+        website_data = seo.SEOAnalyzer(cache=cache, keyword_mode='fast').fetch_website_content(server.url('/'))
+    assert website_data['status'] == 200 and not website_data.get('not_modified')
+    assert website_data['html'] == html
+    assert cache.read_body(server.url('/')) == html
+
+def test_truncated_bodies_stay_truncated_on_304(tmp_path):
+    html = "<title>Long page</title>" + "<p>Filler text.</p>" * 20
+    with LocalPageServer({'/': html}) as server:
+        analyzer = seo.SEOAnalyzer(cache=seo.ResponseCache(str(tmp_path)), keyword_mode='fast', max_bytes=100)
+        first = analyzer.fetch_website_content(server.url('/'), parse=False)
+        again = analyzer.fetch_website_content(server.url('/'), parse=False)
+    assert first['truncated'] and len(first['html']) == 100
+    assert again['not_modified'] and again['html'] == first['html']
+    assert again['truncated'] is True
+    assert analyzer.analyze_content(again)['truncated'] is True
@@ -0,0 +1,153 @@
+import gzip
+import threading
+import time
+
+import pytest
+
+from benchmarks import seo
+from benchmarks.fixtures import LocalPageServer
+
+def sitemap(locs, index=False):
+    tag, item = ('sitemapindex', 'sitemap') if index else ('urlset', 'url')
+    return (f"<?xml version='1.0'?><{tag} xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>" +
+            ''.join(f"<{item}><loc>{loc}</loc></{item}>" for loc in locs) + f"</{tag}>")
+
+def test_bulk_crawl_analyzes_every_page_once():
+    pages = {f'/page/{i}': f"<title>Page {i}</title><h1>Heading {i}</h1><p>Text for page {i}.</p>"
+             for i in range(40)}
+    with LocalPageServer(pages, latency=0.01) as server:
+        crawler = seo.BulkCrawler(analyzer=seo.SEOAnalyzer(keyword_mode='fast'), concurrency=16,
+                                  per_host=16, crawl_delay=0)
+        urls = [server.url(path) for path in pages]
+        results = dict(crawler.analyze_urls(urls))
+    assert sorted(results) == sorted(urls)
+    for url, seo_data in results.items():
+        number = url.rsplit('/', 1)[1]
+        assert seo_data['meta']['title'] == f'Page {number}'
+        assert seo_data['headings']['h1'] == [f'Heading {number}']
+
+def test_sitemaps_are_fetched_through_the_analyzer():
+    pages = {}
+    with LocalPageServer(pages) as server:
+        pages['/sitemap.xml'] = sitemap([server.url('/pages.xml.gz'), server.url('/more.xml')], index=True)
+        pages['/pages.xml.gz'] = gzip.compress(sitemap([server.url('/a'), server.url('/b')]).encode('utf-8'))
+        pages['/more.xml'] = (gzip.compress(sitemap([server.url('/c')]).encode('utf-8')),
+                              {'Content-Encoding': 'gzip', 'Content-Type': 'application/xml'})
+        analyzer = seo.SEOAnalyzer(user_agent='SitemapTest/1.0', sessions=seo.SessionPool())
+        agents = []
+        analyzer.sessions.get().hooks['response'].append(
+            lambda response, **kwargs: agents.append(response.request.headers['User-Agent']))
+        urls = list(seo.fetch_sitemap_urls(server.url('/sitemap.xml'), analyzer))
+    assert urls == [server.url(path) for path in ('/a', '/b', '/c')]
+    assert agents == ['SitemapTest/1.0'] * 3
+
+def test_sitemaps_stop_at_the_byte_cap(capsys):
+    locs = [f'https://example.com/page/{i}' for i in range(1000)]
+    with LocalPageServer({'/sitemap.xml.gz': gzip.compress(sitemap(locs).encode('utf-8'))}) as server:
+        urls = list(seo.fetch_sitemap_urls(server.url('/sitemap.xml.gz'), max_bytes=5000))
+    assert 0 < len(urls) < 200 and urls == locs[:len(urls)]
+    assert 'only its start was read' in capsys.readouterr().err
+
+def test_sitemap_indexes_are_read_once_each():
+    pages = {}
+    with LocalPageServer(pages) as server:
+        pages['/sitemap.xml'] = sitemap([server.url('/sitemap.xml'), server.url('/other.xml'),
+                                         server.url('/pages.xml')], index=True)
+        pages['/other.xml'] = sitemap([server.url('/sitemap.xml'), server.url('/pages.xml')], index=True)
+        pages['/pages.xml'] = sitemap([server.url('/a')])
+        analyzer = seo.SEOAnalyzer(sessions=seo.SessionPool())
+        fetched = []
+        analyzer.sessions.get().hooks['response'].append(
+            lambda response, **kwargs: fetched.append(response.url))
+        urls = list(seo.fetch_sitemap_urls(server.url('/sitemap.xml'), analyzer))
+    assert urls == [server.url('/a')]
+    assert sorted(fetched) == sorted(server.url(path) for path in ('/sitemap.xml', '/other.xml', '/pages.xml'))
+
+def test_sitemap_indexes_stop_at_the_depth_cap(capsys):
+    pages = {f'/level{i}.xml': None for i in range(5)}
+    with LocalPageServer(pages) as server:
+        for i in range(4):
+            pages[f'/level{i}.xml'] = sitemap([server.url(f'/level{i + 1}.xml')], index=True)
+        pages['/level4.xml'] = sitemap([server.url('/deep')])
+        urls = list(seo.fetch_sitemap_urls(server.url('/level0.xml'), max_depth=2))
+    assert urls == []
+    assert 'nested over 2 deep' in capsys.readouterr().err
+
+def site_crawler(**options):
+    return seo.SiteCrawler(analyzer=seo.SEOAnalyzer(keyword_mode='fast'), crawl_delay=0, sitemaps=False,
+                           **options)
+
+SITE = {
+    '/': "<title>Home</title><a href='/public'>Public</a><a href='/private/page'>Private</a>",
+    '/public': "<title>Public</title>",
+    '/private/page': "<title>Private</title>",
+}
+
+def test_crawls_follow_robots_rules():
+    robots = "User-agent: *\nDisallow: /private\nCrawl-delay: 1\n"
+    with LocalPageServer(dict(SITE, **{'/robots.txt': robots})) as server:
+        crawler = site_crawler()
+        started = time.monotonic()
+        results = dict(crawler.analyze_urls([server.url('/')]))
+        elapsed = time.monotonic() - started
+    assert sorted(results) == [server.url('/'), server.url('/public')]
+    assert crawler.blocked_by_robots == 1
+    # Two pages one Crawl-delay apart
+    assert elapsed >= 1.0
+
+@pytest.mark.parametrize('status, fetched', [(401, 0), (403, 0), (404, 3), (500, 3)])
+def test_robots_errors(status, fetched):
+    with LocalPageServer(dict(SITE, **{'/robots.txt': status})) as server:
+        crawler = site_crawler()
+        results = dict(crawler.analyze_urls([server.url('/')]))
+    assert len(results) == fetched
+    assert crawler.blocked_by_robots == (1 if fetched == 0 else 0)
+
+def test_robots_files_are_read_up_to_the_cap():
+    robots = "User-agent: *\n" + "# padding\n" * (seo.ROBOTS_MAX_BYTES // 10) + "Disallow: /\n"
+    with LocalPageServer({'/robots.txt': robots}) as server:
+        assert site_crawler()._robots_for(server.url('/')).can_fetch('*', server.url('/page'))
+    with LocalPageServer({'/robots.txt': "User-agent: *\nDisallow: /\n"}) as server:
+        assert not site_crawler()._robots_for(server.url('/')).can_fetch('*', server.url('/page'))
+
+def test_slow_robots_files_do_not_hold_up_other_hosts():
+    crawler = site_crawler()
+    with LocalPageServer({'/robots.txt': ''}, latency=1.5) as slow, LocalPageServer({'/robots.txt': ''}) as fast:
+        thread = threading.Thread(target=crawler._robots_for, args=(slow.url('/'),))
+        thread.start()
+        time.sleep(0.2)
+        started = time.monotonic()
+        crawler._robots_for(fast.url('/'))
+        assert time.monotonic() - started < 0.5
+        thread.join()
+
+@pytest.fixture
+def breaks_on_marker(monkeypatch):
+    analyze_content = seo.SEOAnalyzer.analyze_content
+    
+    def analyze(self, website_data):
+        if 'BROKEN' in website_data['html']:
+            raise RuntimeError("parser exploded")
+        return analyze_content(self, website_data)
+    
+    monkeypatch.setattr(seo.SEOAnalyzer, 'analyze_content', analyze)
+
+def test_a_failing_page_does_not_end_a_bulk_crawl(breaks_on_marker):
+    pages = {'/a': "<title>A</title>", '/bad': "<title>BROKEN</title>", '/c': "<title>C</title>"}
+    with LocalPageServer(pages) as server:
+        crawler = seo.BulkCrawler(analyzer=seo.SEOAnalyzer(keyword_mode='fast'), crawl_delay=0)
+        results = dict(crawler.analyze_urls([server.url(path) for path in pages]))
+    assert results[server.url('/bad')] == {"error": "Analysis failed: parser exploded"}
+    assert results[server.url('/a')]['meta']['title'] == 'A'
+    assert results[server.url('/c')]['meta']['title'] == 'C'
+
+def test_a_failing_file_does_not_end_an_audit(breaks_on_marker, tmp_path):
+    files = []
+    for name, html in (('a', "<title>A</title>"), ('bad', "<title>BROKEN</title>"), ('c', "<title>C</title>")):
+        files.append(str(tmp_path / f'{name}.html'))
+        with open(files[-1], 'w', encoding='utf-8') as f:
+            f.write(html)
+    files.append(str(tmp_path / 'missing.html'))
+    results = dict(seo.audit(html_files=files, keyword_mode='fast'))
+    assert [results[path].get('error') for path in files[:3]] == [None, "Analysis failed: parser exploded", None]
+    assert results[files[3]]['error'].startswith(f"Could not read {files[3]}")
@@ -0,0 +1,76 @@
+import hashlib
+import random
+from collections import Counter
+
+from benchmarks import seo
+from benchmarks.fixtures import FIXTURE_WORDS
+
+def reference_simhash(text, shingle_words=2):
+    # The textbook SimHash: every shingle votes +count or -count on each bit
+    words = text.lower().split()
+    span = min(shingle_words, len(words))
+    shingles = Counter(' '.join(words[i:i + span]) for i in range(len(words) - span + 1))
+    votes = [0] * 64
+    for shingle, count in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+        for bit in range(64):
+            votes[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit, vote in enumerate(votes) if vote > 0)
+
+def distance(a, b):
+    return bin(a ^ b).count('1')
+
+def text(rng, words=300):
+    return ' '.join(rng.choice(FIXTURE_WORDS) for _ in range(words))
+
+def test_simhash_matches_the_reference():
+    rng = random.Random(0)
+    for words in (1, 2, 3, 50, 400):
+        sample = text(rng, words)
+        assert seo.simhash(sample) == reference_simhash(sample)
+    assert seo.simhash('') == seo.simhash('...') == 0
+
+def test_similar_texts_get_close_fingerprints():
+    rng = random.Random(1)
+    original = text(rng, 600)
+    edited = original.replace(original.split()[10], 'Replacement', 1) + ' sorted by price'
+    assert distance(seo.simhash(original), seo.simhash(edited)) <= 3
+    assert distance(seo.simhash(original), seo.simhash(text(rng, 600))) > 10
+
+def test_index_finds_pages_within_max_distance():
+    rng = random.Random(2)
+    index = seo.DuplicateIndex(max_distance=3)
+    base = rng.getrandbits(64)
+    assert index.add('https://a.com/', base) is None
+    # One flip in each of three bands, then one bit too many
+    near = base ^ (1 << 3) ^ (1 << 20) ^ (1 << 40)
+    assert index.add('https://a.com/?sort=price', near) == 'https://a.com/'
+    assert index.add('https://a.com/other', near ^ (1 << 60)) is None
+    assert index.add(None, base ^ 1) == 'https://a.com/'
+    assert len(index) == 3
+    assert index.clusters() == {'https://a.com/': ['https://a.com/?sort=price']}
+
+def test_changed_pages_leave_their_cluster():
+    index = seo.DuplicateIndex()
+    index.add('https://a.com/', 0)
+    index.add('https://a.com/copy', 1)
+    assert index.add('https://a.com/copy', 1) == 'https://a.com/'
+    assert index.add('https://a.com/copy', (1 << 64) - 1) is None
+    assert index.clusters() == {}
+    index.remove('https://a.com/')
+    assert index.add('https://a.com/third', 0) is None
+
+def test_analyzer_flags_near_duplicates(corpus):
+    analyzer = seo.SEOAnalyzer(keyword_mode='fast', duplicate_index=seo.DuplicateIndex(),
+                               skip_duplicate_keywords=True)
+    html = corpus['article']
+    first = analyzer.analyze_content({'url': 'https://a.com/post', 'html': html, 'load_time': 0.2})
+    copy = analyzer.analyze_content({'url': 'https://a.com/post?ref=feed',
+                                     'html': html.replace('</article>', '<p>Share this post.</p></article>'),
+                                     'load_time': 0.2})
+    assert 'duplicate_of' not in first and first['keywords']
+    assert copy['duplicate_of'] == 'https://a.com/post'
+    assert copy['keywords'] == []
+    assert "Near-duplicate of https://a.com/post: make the content distinct or add a canonical link to that page" \
+        in copy['suggestions']
+    assert not any(text.startswith('Near-duplicate') for text in first['suggestions'])
@@ -0,0 +1,60 @@
+import pytest
+
+from benchmarks import seo
+
+EXTRACTORS = ('check_mobile_responsiveness', 'extract_meta_data', 'extract_headings',
+              'extract_text_from_html', 'extract_links', 'extract_images', 'extract_resources')
+
+# Markup the stream engine has to handle the way html.parser + BeautifulSoup do
+EDGE_CASES = {
+    'empty': '',
+    'text only': 'Just some text, no tags at all',
+    'unclosed tags': '<html><body><p>One<p>Two<h1>Title<h2>Sub</h2><a href="/x">link',
+    'uppercase': '<HTML><HEAD><TITLE>Loud</TITLE><META NAME="Description" CONTENT="Shouting"></HEAD>'
+                 '<BODY><H1>Big</H1><A HREF="/a">A</A><IMG SRC="/i.png" ALT="I"></BODY></HTML>',
+    'entities': '<title>Fish &amp; chips &copy 2024</title><h1>&lt;tag&gt; &#8364;5 &#x263A;</h1>'
+                '<p>caf&eacute; &nbsp;menu&unknown;</p><a href="/q?a=1&amp;b=2">q</a>',
+    'script and style': '<head><style>h1 { color: red }</style><script>var s = "<h1>no</h1>";</script></head>'
+                        '<body><h1>Yes</h1><noscript><p>Enable JS</p></noscript><p>Body text</p></body>',
+    'comments and cdata': '<!-- <h1>hidden</h1> --><h1>Shown</h1><![CDATA[ raw ]]><p>After</p>',
+    'whitespace': '<h1>\n  Spaced \t out\n</h1><p>  many   spaces\n\nand lines </p>',
+    'attributes': "<meta name=viewport content='width=device-width'><a href=/bare>bare</a>"
+                  '<a href="">empty</a><a>no href</a><img alt="no src"><img src="/x.png" alt>',
+    'nested inline': '<h2>Bold <b>part</b> and <i>italic <span>deep</span></i></h2><p>a<br>b<br/>c</p>',
+    'duplicate meta': '<meta name="description" content="first"><meta name="description" content="second">'
+                      '<title>One</title><title>Two</title>',
+    'resources': '<link rel="stylesheet" href="/a.css"><link rel="preload" href="/f.woff2" as="font">'
+                 '<script src="/a.js" async></script><script src="/b.js"></script><img src="/c.jpg">',
+}
+
+def extract_all(engine, html):
+    analyzer = seo.SEOAnalyzer(engine=engine)
+    page = analyzer.parse_page(html)
+    return {name: getattr(analyzer, name)(page) for name in EXTRACTORS}
+
+@pytest.mark.parametrize('name', ['landing', 'article', 'docs'])
+def test_engines_agree_on_fixture_pages(corpus, name):
+    assert extract_all('stream', corpus[name]) == extract_all('soup', corpus[name])
+
+def test_stream_engine_caps_text_of_huge_pages(corpus):
+    # The listing's visible text is over StreamingPage's 2M character cap;
+    # everything else still matches, and the text is the soup text's start
+    expected = extract_all('soup', corpus['listing'])
+    actual = extract_all('stream', corpus['listing'])
+    text = actual.pop('extract_text_from_html')
+    assert len(text) == 2000000
+    assert expected.pop('extract_text_from_html').startswith(text)
+    assert actual == expected
+
+@pytest.mark.parametrize('name', sorted(EDGE_CASES))
+def test_engines_agree_on_edge_cases(name):
+    html = EDGE_CASES[name]
+    assert extract_all('stream', html) == extract_all('soup', html)
+
+def test_stream_engine_parses_without_beautifulsoup():
+    page = seo.SEOAnalyzer(engine='stream').parse_page(EDGE_CASES['uppercase'])
+    assert not isinstance(page, seo.ParsedPage)
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError, match='Unknown engine'):
+        seo.SEOAnalyzer(engine='lxml')
@@ -0,0 +1,45 @@
+import gzip
+
+import pytest
+
+from benchmarks import seo
+from benchmarks.fixtures import LocalPageServer
+
+@pytest.mark.parametrize('content_type, head, expected', [
+    ('text/html; charset=UTF-16LE', b'<\x00p\x00', 'utf-16-le'),
+    ('text/html; charset=utf-16', b'<\x00p\x00', 'utf-16-le'),
+    ('text/html; charset=ISO-8859-1', b'<p>', 'cp1252'),
+    ('text/html', b'<meta charset="utf-16">', 'utf-8'),
+    ('text/html', b'<meta charset="latin1">', 'cp1252'),
+    ('text/html', b"<meta http-equiv='Content-Type' content='text/html; charset=Shift_JIS'>", 'shift_jis'),
+    ('text/html; charset=bogus', b'<p>', 'utf-8'),
+    ('text/html; charset=utf-8', b'\xff\xfe<\x00', 'utf-16'),
+])
+def test_sniff_charset(content_type, head, expected):
+    assert seo.sniff_charset(content_type, head) == expected
+
+def fetch(pages, path='/', **options):
+    with LocalPageServer(pages) as server:
+        return seo.SEOAnalyzer(keyword_mode='fast', **options).fetch_website_content(server.url(path), parse=False)
+
+def test_utf16_pages_decode_from_the_header():
+    html = "<title>Grüße</title><p>ünïcode</p>"
+    website_data = fetch({'/': (html.encode('utf-16-le'), {'Content-Type': 'text/html; charset=utf-16le'})})
+    assert website_data['html'] == html
+
+def test_bodies_stop_at_the_byte_cap():
+    html = "<title>Big</title>" + "<p>filler text</p>" * 10000
+    website_data = fetch({'/': html}, max_bytes=1000)
+    assert website_data['truncated']
+    assert website_data['decoded_bytes'] == 1000
+    assert website_data['html'] == html[:1000]
+
+def test_compression_bombs_stop_at_the_byte_cap():
+    bomb = gzip.compress(b' ' * 50000000)
+    website_data = fetch({'/': (bomb, {'Content-Encoding': 'gzip'})}, max_bytes=100000)
+    assert website_data['truncated'] and website_data['decoded_bytes'] == 100000
+    assert website_data['content_encoding'] == 'gzip'
+
+def test_small_pages_are_not_truncated():
+    website_data = fetch({'/': (gzip.compress(b'<h1>Small</h1>'), {'Content-Encoding': 'gzip'})})
+    assert website_data['html'] == '<h1>Small</h1>' and not website_data['truncated']
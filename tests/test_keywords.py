@@ -0,0 +1,25 @@
+from collections import Counter
+
+from benchmarks import seo
+
+def extractor():
+    return seo.FastKeywordExtractor(seo.load_stop_words())
+
+def test_batches_match_single_texts(corpus):
+    analyzer = seo.SEOAnalyzer(keyword_mode='fast')
+    pages = [html for name, html in corpus.items() if name != 'listing']
+    texts = [analyzer.extract_text_from_html(html) for html in pages]
+    texts += ['', '...', texts[0]]
+    fast = extractor()
+    assert fast.candidates_batch(texts) == [fast.candidates(text) for text in texts]
+    assert analyzer.keyword_candidates_batch(pages) == [analyzer.keyword_candidates(html) for html in pages]
+
+def test_phrases_split_at_stopwords_and_punctuation():
+    candidates = extractor().candidates("Keyword research tools are the best way to find Search Console data.")
+    assert candidates == Counter({'keyword research tools': 2, 'best way': 2, 'find search console data': 1,
+                                  'search console': 1, 'keyword': 1})
+
+def test_rake_limit_caps_the_ranked_phrases():
+    text = '. '.join(f'phrase{i} words{i}' for i in range(30))
+    fast = seo.FastKeywordExtractor(seo.load_stop_words(), rake_limit=5)
+    assert sum(fast.candidates(text).values()) == 5 + 30
@@ -0,0 +1,38 @@
+import pytest
+
+from benchmarks import seo
+
+HTML = """<title>Links</title>
+<a href='/about'>About</a>
+<a href='contact.html'>Contact</a>
+<a href='https://shop.example.com/'>Shop</a>
+<a href='//cdn.example.net/file.pdf'>File</a>
+<a href='mailto:team@example.com'>Mail</a>
+<a href='tel:+15550100'>Call</a>
+<a href=' javascript:void(0)'>Menu</a>
+"""
+
+@pytest.mark.parametrize('engine', seo.SEOAnalyzer.ENGINES)
+def test_links_from_a_fetched_page(engine):
+    links = seo.SEOAnalyzer(engine=engine).extract_links(HTML, 'https://shop.example.com/cart')
+    assert links == {'count': 7, 'internal': 3, 'external': 1, 'other': 3}
+
+@pytest.mark.parametrize('engine', seo.SEOAnalyzer.ENGINES)
+def test_links_from_a_saved_file(engine):
+    links = seo.SEOAnalyzer(engine=engine).extract_links(HTML)
+    assert links == {'count': 7, 'internal': 2, 'external': 2, 'other': 3}
+
+def test_link_buckets_add_up_and_score_alike():
+    analyzer = seo.SEOAnalyzer(keyword_mode='fast')
+    fetched = analyzer.analyze_content({'url': 'https://example.org/', 'html': HTML, 'load_time': 0.0})
+    saved = analyzer.analyze_content({'url': None, 'html': HTML, 'load_time': 0.0})
+    for links in (fetched['links'], saved['links']):
+        assert links['internal'] + links['external'] + links['other'] == links['count']
+    assert fetched['links'] == saved['links']
+    assert fetched['seo_score'] == saved['seo_score']
+
+def test_results_without_other_links_still_round_trip():
+    data = seo.SEOAnalyzer(keyword_mode='fast').analyze_content({'url': None, 'html': HTML, 'load_time': 0.0})
+    assert seo.PageResult.from_dict(data).to_dict() == data
+    del data['links']['other']
+    assert seo.PageResult.from_dict(data).to_dict() == data
@@ -0,0 +1,60 @@
+from benchmarks import seo
+from benchmarks.fixtures import LocalPageServer
+
+LINKS = "<title>Links</title><a href='https://a.com/x'>x</a><a href='https://a.com/y'>y</a>"
+
+def analyze(analyzer, url, html, load_time=0.1):
+    return analyzer.analyze_content({'url': url, 'html': html, 'load_time': load_time})
+
+def test_memo_hit_reuses_the_analysis(tmp_path):
+    memo = seo.AnalysisMemo(path=str(tmp_path / 'memo.db'))
+    analyzer = seo.SEOAnalyzer(memo=memo, keyword_mode='fast')
+    first = analyze(analyzer, 'https://a.com/', LINKS)
+    second = analyze(analyzer, 'https://a.com/copy', LINKS, load_time=9.0)
+    assert memo.stats()['hits'] == 1
+    assert second['load_time'] == 9.0
+    assert second['performance_score'] < first['performance_score']
+    assert {k: v for k, v in second.items() if k not in seo.LOAD_DEPENDENT_FIELDS} == \
+        {k: v for k, v in first.items() if k not in seo.LOAD_DEPENDENT_FIELDS}
+
+def test_memo_link_counts_follow_the_host():
+    analyzer = seo.SEOAnalyzer(memo=seo.AnalysisMemo(), keyword_mode='fast')
+    assert analyze(analyzer, 'https://a.com/', LINKS)['links'] == {'count': 2, 'internal': 2, 'external': 0, 'other': 0}
+    assert analyze(analyzer, 'https://b.com/', LINKS)['links'] == {'count': 2, 'internal': 0, 'external': 2, 'other': 0}
+
+def test_memo_measured_resources_follow_the_directory():
+    html = "<title>Gallery</title><img src='photo.jpg' alt='Photo'>"
+    pages = {'/a/photo.jpg': b'x' * 1000, '/b/photo.jpg': b'x' * 5000}
+    analyzer = seo.SEOAnalyzer(memo=seo.AnalysisMemo(), keyword_mode='fast', measure_resources=True)
+    with LocalPageServer(pages) as server:
+        a = analyze(analyzer, server.url('/a/index.html'), html)['resources']
+        b = analyze(analyzer, server.url('/b/index.html'), html)['resources']
+        again = analyze(analyzer, server.url('/a/?sort=name'), html)['resources']
+    assert a['by_kind']['image'] == {'count': 1, 'bytes': 1000}
+    assert b['by_kind']['image'] == {'count': 1, 'bytes': 5000}
+    assert again == a
+    assert analyzer.memo.stats()['hits'] == 1
+
+def test_memo_hits_are_ranked_against_the_keyword_index():
+    pages = [('https://a.com/1', "<h1>Garden tools</h1><p>Steel garden spades and forks for every garden.</p>"),
+             ('https://a.com/2', "<h1>Garden seeds</h1><p>Tomato seeds and herb seeds for the garden.</p>"),
+             ('https://a.com/3', "<h1>Garden tools</h1><p>Steel garden spades and forks for every garden.</p>")]
+    memo = seo.AnalysisMemo()
+    cached = seo.SEOAnalyzer(memo=memo, keyword_index=seo.SiteKeywordIndex(), keyword_mode='fast')
+    fresh = seo.SEOAnalyzer(keyword_index=seo.SiteKeywordIndex(), keyword_mode='fast')
+    for url, html in pages:
+        reused = analyze(cached, url, html)
+        assert 'keyword_candidates' not in reused
+        assert reused['keywords'] == analyze(fresh, url, html)['keywords']
+    assert memo.stats()['hits'] == 1
+    assert len(cached.keyword_index) == 3
+
+def test_memo_entries_without_candidates_are_analyzed_again():
+    html = "<h1>Garden tools</h1><p>Steel garden spades.</p>"
+    memo = seo.AnalysisMemo()
+    analyze(seo.SEOAnalyzer(memo=memo, keyword_mode='fast'), 'https://a.com/', html)
+    analyzer = seo.SEOAnalyzer(memo=memo, keyword_index=seo.SiteKeywordIndex(), keyword_mode='fast')
+    assert analyzer.reusable_result({'url': 'https://a.com/', 'html': html, 'load_time': 0.1}) is None
+    analyze(analyzer, 'https://a.com/', html)
+    assert len(analyzer.keyword_index) == 1
+    assert 'keyword_candidates' in memo.get(analyzer._memo_key({'url': 'https://a.com/', 'html': html}))
@@ -0,0 +1,49 @@
+from benchmarks import seo
+
+def test_prometheus_text_format():
+    metrics = seo.StageMetrics(buckets=(0.1, 1.0))
+    metrics.observe('parse', 0.05, nbytes=2048)
+    metrics.observe('parse', 0.5)
+    metrics.observe('fetch', 3.0, error=True)
+    assert metrics.prometheus_text() == '''\
+# HELP seo_analyzer_stage_seconds Time spent in each analysis stage
+# TYPE seo_analyzer_stage_seconds histogram
+seo_analyzer_stage_seconds_bucket{stage="fetch",le="0.1"} 0
+seo_analyzer_stage_seconds_bucket{stage="fetch",le="1.0"} 0
+seo_analyzer_stage_seconds_bucket{stage="fetch",le="+Inf"} 1
+seo_analyzer_stage_seconds_sum{stage="fetch"} 3.0
+seo_analyzer_stage_seconds_count{stage="fetch"} 1
+seo_analyzer_stage_seconds_bucket{stage="parse",le="0.1"} 1
+seo_analyzer_stage_seconds_bucket{stage="parse",le="1.0"} 2
+seo_analyzer_stage_seconds_bucket{stage="parse",le="+Inf"} 2
+seo_analyzer_stage_seconds_sum{stage="parse"} 0.55
+seo_analyzer_stage_seconds_count{stage="parse"} 2
+# HELP seo_analyzer_stage_bytes_total Bytes processed by each analysis stage
+# TYPE seo_analyzer_stage_bytes_total counter
+seo_analyzer_stage_bytes_total{stage="fetch"} 0
+seo_analyzer_stage_bytes_total{stage="parse"} 2048
+# HELP seo_analyzer_stage_errors_total Failures in each analysis stage
+# TYPE seo_analyzer_stage_errors_total counter
+seo_analyzer_stage_errors_total{stage="fetch"} 1
+seo_analyzer_stage_errors_total{stage="parse"} 0
+'''
+
+def test_drained_snapshots_merge_back():
+    worker = seo.StageMetrics()
+    for seconds in (0.001, 0.02, 0.3):
+        worker.observe('keywords', seconds)
+    combined = seo.StageMetrics()
+    combined.observe('keywords', 4.0)
+    combined.merge(worker.drain())
+    assert worker.summary() == {}
+    summary = combined.summary()['keywords']
+    assert (summary['count'], summary['p50_seconds'], summary['p99_seconds']) == (4, 0.025, 5.0)
+
+def test_analyzer_times_each_stage(corpus):
+    metrics = seo.StageMetrics()
+    analyzer = seo.SEOAnalyzer(keyword_mode='fast', metrics=metrics)
+    analyzer.analyze_content({'url': 'https://example.com/', 'html': corpus['article'], 'load_time': 0.2})
+    summary = metrics.summary()
+    assert {'parse', 'keywords', 'scoring', 'suggestions'} <= set(summary)
+    assert all(stats['count'] == 1 for stats in summary.values())
+    assert summary['parse']['bytes'] == len(corpus['article'].encode('utf-8'))
@@ -0,0 +1,56 @@
+import io
+import json
+import os
+
+import pytest
+
+from benchmarks import seo
+
+def results(corpus):
+    analyzer = seo.SEOAnalyzer(keyword_mode='fast')
+    pages = [(f'https://example.com/{name}', analyzer.analyze_content({'url': None, 'html': html, 'load_time': 0.3}))
+             for name, html in corpus.items() if name != 'listing']
+    pages.insert(1, ('https://example.com/down', {'error': 'Could not fetch website content'}))
+    return pages
+
+def test_jsonl_rows_keep_every_result(corpus):
+    pages = results(corpus)
+    output = io.StringIO()
+    assert seo.write_jsonl(pages, output) == (len(pages), 1)
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert rows == [{'url': url, **seo_data} for url, seo_data in pages]
+
+def test_jsonl_output_appends_and_reads_back(corpus, tmp_path):
+    pages = results(corpus)
+    path = str(tmp_path / 'results.jsonl')
+    seo.write_output(pages[:2], path)
+    seo.write_output(pages[2:], path)
+    expected = [dict(seo_data, url=url) for url, seo_data in pages if 'error' not in seo_data]
+    assert list(seo.read_results(path)) == expected
+
+def test_parquet_row_groups_and_error_rows(corpus, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    pages = results(corpus) * 3
+    path = str(tmp_path / 'results.parquet')
+    with seo.ParquetResultWriter(path, row_group_size=4) as writer:
+        assert seo.write_results(pages, writer) == (len(pages), 3)
+        assert not os.path.exists(path)
+    parquet = pq.ParquetFile(path)
+    assert [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)] == [4, 4, 4]
+    table = pq.read_table(path, columns=['url', 'error', 'seo_score', 'h1', 'link_count'])
+    rows = table.to_pylist()
+    for row, (url, seo_data) in zip(rows, pages):
+        assert row['url'] == url
+        if 'error' in seo_data:
+            assert row == {'url': url, 'error': seo_data['error'], 'seo_score': None, 'h1': None, 'link_count': None}
+        else:
+            assert row == {'url': url, 'error': None, 'seo_score': seo_data['seo_score'],
+                           'h1': seo_data['headings']['h1'], 'link_count': seo_data['links']['count']}
+
+def test_parquet_last_row_group_is_flushed_on_close(corpus, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / 'results.parquet')
+    seo.write_output(results(corpus)[:3], path, output_format='parquet', row_group_size=2)
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_rows == 3
+    assert parquet.metadata.row_group(parquet.num_row_groups - 1).num_rows == 1
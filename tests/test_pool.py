@@ -0,0 +1,55 @@
+from benchmarks import seo
+
+def website_data(name, html):
+    return f'https://example.com/{name}', {'url': f'https://example.com/{name}', 'html': html, 'load_time': 0.2}
+
+def test_pool_results_match_in_process_analysis(corpus):
+    pages = [website_data(name, html) for name, html in corpus.items() if name != 'listing']
+    analyzer = seo.SEOAnalyzer(keyword_mode='fast')
+    expected = {url: analyzer.analyze_content(dict(data)) for url, data in pages}
+    # Every page through shared memory, then every page pickled
+    for threshold in (1, 1 << 30):
+        with seo.AnalysisPool(processes=2, keyword_mode='fast', shm_threshold=threshold) as pool:
+            assert dict(pool.map(pages)) == expected
+
+def test_slow_pages_time_out_in_the_worker(corpus):
+    pages = [website_data('listing', corpus['listing']), website_data('landing', corpus['landing'])]
+    with seo.AnalysisPool(processes=1, keyword_mode='fast', task_timeout=0.001, ordered=True) as pool:
+        results = list(pool.map(pages))
+    assert results[0][1] == {"error": "Analysis timed out after 0.001 seconds"}
+    # The worker survives the timeout
+    with seo.AnalysisPool(processes=1, keyword_mode='fast', task_timeout=30) as pool:
+        assert 'error' not in dict(pool.map(pages[1:]))[pages[1][0]]
+
+def test_ordered_pools_keep_input_order(corpus):
+    pages = [website_data('article', corpus['article'])] + \
+        [website_data(f'landing{i}', corpus['landing']) for i in range(4)]
+    with seo.AnalysisPool(processes=2, keyword_mode='fast', ordered=True) as pool:
+        assert [url for url, _ in pool.map(pages)] == [url for url, _ in pages]
+    with seo.AnalysisPool(processes=2, keyword_mode='fast') as pool:
+        order = [url for url, _ in pool.map(pages)]
+    assert sorted(order) == sorted(url for url, _ in pages)
+    assert order[0] != pages[0][0]
+
+def test_pool_holds_back_the_producer(corpus):
+    pulled = []
+    
+    def pages():
+        for i in range(8):
+            pulled.append(i)
+            yield website_data(f'landing{i}', corpus['landing'])
+    
+    seen = []
+    with seo.AnalysisPool(processes=1, keyword_mode='fast', max_pending=2) as pool:
+        for url, _ in pool.map(pages()):
+            seen.append((url, len(pulled)))
+    assert len(seen) == 8
+    assert seen[0][1] <= 2
+    assert all(pulled_then <= done + 2 for done, (_, pulled_then) in enumerate(seen, 1))
+
+def test_unfetched_pages_are_error_results(corpus):
+    pages = [('https://example.com/down', None), website_data('landing', corpus['landing'])]
+    with seo.AnalysisPool(processes=1, keyword_mode='fast') as pool:
+        results = dict(pool.map(pages))
+    assert results['https://example.com/down'] == {"error": "Could not fetch website content"}
+    assert results['https://example.com/landing']['meta']['title']
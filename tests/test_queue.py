@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+from benchmarks import seo
+from benchmarks.fixtures import LocalPageServer
+
+def open_queue(tmp_path, worker, **options):
+    return seo.WorkQueue(str(tmp_path / 'queue.db'), worker=worker, poll_interval=0, **options)
+
+def drain(queue):
+    return list(iter(queue.pop, None))
+
+def test_hosts_are_leased_to_one_worker_each(tmp_path):
+    urls = [f"http://{host}.example/{page}" for host in ('one', 'two') for page in range(3)]
+    with open_queue(tmp_path, 'a', hosts_per_worker=1) as a, open_queue(tmp_path, 'b', hosts_per_worker=1) as b:
+        a.add_many(urls)
+        leased_a, leased_b = drain(a), drain(b)
+        assert sorted(leased_a + leased_b) == sorted(urls)
+        assert len({seo.urlparse(url).netloc for url in leased_a}) == 1
+        assert len({seo.urlparse(url).netloc for url in leased_b}) == 1
+        assert not set(leased_a) & set(leased_b)
+
+def test_only_urls_in_flight_keep_their_lease(tmp_path):
+    stuck, waiting = "http://stuck.example/", "http://waiting.example/"
+    with open_queue(tmp_path, 'a', lease_seconds=1.5) as a, open_queue(tmp_path, 'b') as b:
+        a.add_many([stuck, waiting])
+        assert a.pop() == stuck
+        # The heartbeat renews the stuck page while the rest of the batch runs out
+        time.sleep(2.5)
+        assert drain(b) == [waiting]
+        assert a.pop() is None
+        a.complete(stuck, {'score': 1})
+        b.complete(waiting, {'score': 2})
+    with open_queue(tmp_path, 'c') as c:
+        assert dict(c.results()) == {stuck: {'score': 1}, waiting: {'score': 2}}
+
+def test_expiring_urls_are_not_started(tmp_path):
+    urls = ["http://example.com/1", "http://example.com/2"]
+    with open_queue(tmp_path, 'a', lease_seconds=0.6) as a:
+        a.add_many(urls)
+        assert a.pop() == urls[0]
+        a.complete(urls[0], {})
+        time.sleep(0.5)
+        # Too close to expiring to be started; it is leased again with a fresh lease
+        assert a.pop() == urls[1]
+        row = a._db.execute("SELECT attempts, lease_expires FROM urls WHERE url = ?", (urls[1],)).fetchone()
+        assert row[0] == 1 and row[1] > time.time() + 0.3
+
+def test_resume_keeps_results_and_requeues_unfinished_urls(tmp_path):
+    urls = [f"http://example.com/{page}" for page in range(4)]
+    with open_queue(tmp_path, 'a') as a:
+        a.add_many(urls)
+        first, second = a.pop(), a.pop()
+        a.complete(first, {'score': 10})
+        a.fail(second, "timed out")
+    with open_queue(tmp_path, 'b') as b:
+        assert dict(b.results()) == {first: {'score': 10}}
+        assert sorted(drain(b)) == sorted(set(urls) - {first})
+        progress = b.progress()
+        assert (progress['done'], progress['leased'], progress['total']) == (1, 3, 4)
+
+def test_work_through_queue_analyzes_every_url(tmp_path):
+    pages = {f'/{page}': f"<title>Page {page}</title><p>Queue test page.</p>" for page in range(6)}
+    with LocalPageServer(pages) as server, open_queue(tmp_path, 'a') as queue:
+        crawler = seo.BulkCrawler(analyzer=seo.SEOAnalyzer(keyword_mode='fast'), concurrency=4,
+                                  crawl_delay=0)
+        urls = [server.url(path) for path in pages]
+        results = dict(seo.work_through_queue(queue, crawler, urls, wait=0))
+        assert sorted(results) == sorted(urls)
+        assert all(seo_data['meta']['title'].startswith('Page ') for seo_data in results.values())
+        assert queue.progress()['done'] == len(urls)
+
+def test_queue_reads_do_not_block_the_event_loop():
+    class SlowSource:
+        def __init__(self, urls):
+            self.urls = iter(urls)
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            time.sleep(0.2)
+            return next(self.urls)
+
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    with LocalPageServer({'/': "<title>Home</title>"}) as server:
+        crawler = seo.BulkCrawler(analyzer=seo.SEOAnalyzer(keyword_mode='fast'), crawl_delay=0)
+
+        async def run():
+            ticker = asyncio.ensure_future(tick())
+            results = [item async for item in crawler.crawl(SlowSource([server.url('/')] * 3))]
+            ticker.cancel()
+            return results
+
+        results = asyncio.run(run())
+    assert len(results) == 3
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.15
@@ -0,0 +1,78 @@
+import pytest
+
+from benchmarks import seo
+from benchmarks.fixtures import LocalPageServer
+
+SITE = {
+    '/': "<title>Home</title><a href='/a'>A</a><a href='/b'>B</a>",
+    '/a': "<title>A</title><a href='/'>Home</a><a href='/b'>B</a>",
+    '/b': "<title>B</title><p>No links here.</p>",
+}
+
+def crawl(server, state_path, **options):
+    options = dict(crawl=True, sitemaps=False, crawl_delay=0, keyword_mode='fast', **options)
+    return {url: (seo_data, changes) for url, seo_data, changes
+            in seo.reaudit([server.url('/')], state_path, **options)}
+
+@pytest.mark.parametrize('engine', seo.SEOAnalyzer.ENGINES)
+def test_recrawl_follows_links_of_unchanged_pages(tmp_path, engine):
+    state_path = str(tmp_path / 'state.db')
+    with LocalPageServer(dict(SITE)) as server:
+        first = crawl(server, state_path, engine=engine)
+        second = crawl(server, state_path, engine=engine)
+    assert sorted(first) == sorted(second) == [server.url(path) for path in ('/', '/a', '/b')]
+    assert all(changes == {'new': True} for _, changes in first.values())
+    assert all(changes == {} for _, changes in second.values())
+    assert second[server.url('/')][0]['meta']['title'] == 'Home'
+
+def test_state_files_without_links_are_upgraded(tmp_path):
+    state_path = str(tmp_path / 'state.db')
+    db = seo.sqlite3.connect(state_path)
+    db.executescript("""
+        CREATE TABLE pages (
+            url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT,
+            data TEXT, previous TEXT, run INTEGER NOT NULL);
+        CREATE TABLE runs (run INTEGER PRIMARY KEY, started REAL NOT NULL);
+        INSERT INTO runs (started) VALUES (0);
+        INSERT INTO pages VALUES ('http://example.com/', '"v1"', NULL, 'abc', '{"load_time": 1}', NULL, 1);
+    """)
+    db.close()
+    with seo.AuditState(state_path) as state:
+        # Without stored links the page is downloaded again, not revalidated
+        assert state.lookup('http://example.com/') is None
+        assert state.previous('http://example.com/') == {'load_time': 1}
+
+def test_reaudit_keeps_unchanged_pages_in_the_keyword_index(tmp_path):
+    state_path = str(tmp_path / 'state.db')
+    index_path = str(tmp_path / 'keywords.idx')
+    with LocalPageServer(dict(SITE)) as server:
+        crawl(server, state_path)
+        # Results stored without keyword candidates are analyzed again
+        second = crawl(server, state_path, keyword_index_path=index_path)
+        assert len(seo.SiteKeywordIndex.load(index_path)) == 3
+        third = crawl(server, state_path, keyword_index_path=index_path)
+    index = seo.SiteKeywordIndex.load(index_path)
+    assert sorted(index.url_ids) == sorted(third)
+    assert all(changes == {} for _, changes in third.values())
+    for url, (seo_data, _) in third.items():
+        assert 'keyword_candidates' not in seo_data
+        assert seo_data['keywords'] == second[url][0]['keywords']
+
+def test_reaudit_only_analyzes_changed_pages(tmp_path):
+    state_path = str(tmp_path / 'state.db')
+    site = dict(SITE)
+    with LocalPageServer(site) as server:
+        urls = [server.url(path) for path in sorted(site)]
+        options = dict(crawl_delay=0, keyword_mode='fast')
+        list(seo.reaudit(urls, state_path, **options))
+        site['/b'] = "<title>B</title><h1>Now with a heading</h1><p>No links here.</p>"
+        metrics = seo.StageMetrics()
+        second = {url: changes for url, _, changes in
+                  seo.reaudit(urls, state_path, metrics=metrics, **options)}
+    assert second[server.url('/')] == second[server.url('/a')] == {}
+    changed = second[server.url('/b')]
+    assert changed['seo_score'][1] > changed['seo_score'][0]
+    assert "Add exactly one H1 heading with your main keyword" in changed['suggestions']['removed']
+    # Only the changed page went through the extractors
+    assert metrics.summary()['meta']['count'] == 1
+    assert metrics.summary()['reuse']['count'] == 3
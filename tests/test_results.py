@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from benchmarks import seo, suite
+
+def analyzed(corpus, **options):
+    analyzer = seo.SEOAnalyzer(keyword_mode='fast', **options)
+    return [analyzer.analyze_content({'url': f'https://example.com/{name}', 'html': html, 'load_time': 0.4})
+            for name, html in corpus.items() if name != 'listing']
+
+def test_page_results_round_trip(corpus):
+    for data in analyzed(corpus):
+        record = seo.PageResult.from_dict(data, 'https://example.com/')
+        assert record.to_dict() == data
+        assert record.url == 'https://example.com/'
+
+def test_page_results_round_trip_optional_fields(corpus):
+    data = analyzed(corpus)[0]
+    data['resources'] = {'requests': 4, 'bytes': 120000,
+                         'by_kind': {'image': {'count': 3, 'bytes': 100000}, 'script': {'count': 1, 'bytes': 20000}},
+                         'render_blocking': 1, 'uncompressed': 0, 'failed': 0}
+    data['truncated'] = True
+    data['fingerprint'] = '00ff00ff00ff00ff'
+    data['duplicate_of'] = 'https://example.com/original'
+    assert seo.PageResult.from_dict(data).to_dict() == data
+
+def test_page_results_share_interned_strings(corpus):
+    text = json.dumps(max(analyzed(corpus), key=lambda data: len(data['suggestions'])))
+    # Separate parses, so equal strings start out as separate objects
+    first, second = (seo.PageResult.from_dict(json.loads(text)) for _ in range(2))
+    assert first.suggestions and first.keywords
+    assert all(a is b for a, b in zip(first.suggestions + first.keywords, second.suggestions + second.keywords))
+
+def test_failed_pages_are_not_records():
+    with pytest.raises(ValueError, match='timed out'):
+        seo.PageResult.from_dict({'error': 'timed out'})
+
+def test_memory_benchmark_skips_only_failed_pages(corpus):
+    pages = analyzed(corpus)
+    pages[0]['keywords'] = ['error', 'error pages'] + pages[0]['keywords'][2:]
+    lines = [json.dumps(dict(data, url=f'https://example.com/{i}')) for i, data in enumerate(pages)]
+    lines.append(json.dumps({'url': 'https://example.com/down', 'error': 'timed out'}))
+    result = suite.benchmark_result_memory(lines)
+    assert result['pages'] == len(pages)
+    assert result['dict_bytes'] > result['record_bytes'] > 0
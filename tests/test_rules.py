@@ -0,0 +1,61 @@
+import pytest
+
+from benchmarks import seo
+
+def result(**overrides):
+    data = {'meta': {'title': 'A title', 'description': 'A description', 'keywords': '', 'viewport': 'width=device-width'},
+            'headings': {'h1': ['Heading']}, 'images': {'count': 3, 'without_alt': 2},
+            'links': {'count': 0, 'internal': 0, 'external': 0}, 'keywords': ['a'] * 10,
+            'load_time': 0.5, 'mobile_friendly': True}
+    data.update(overrides)
+    return data
+
+def rule(**fields):
+    return dict({'id': 'custom', 'when': 'always', 'message': 'Hello'}, **fields)
+
+def test_messages_format_their_fields():
+    rules = seo.RuleSet([rule(message="{images_without_alt} of {image_count:>4} images, {load_time:.2f}s {title_length!r}")])
+    assert rules.evaluate(result())['suggestion'] == ["2 of    3 images, 0.50s 7"]
+
+def test_default_rules_match_their_conditions():
+    messages = seo.default_rule_set().evaluate(result(load_time=3.0, headings={'h1': []}))
+    assert "Add exactly one H1 heading with your main keyword" in messages['suggestion']
+    assert "Add alt text to 2 images" in messages['suggestion']
+    assert "Enable browser caching" in messages['developer']
+
+@pytest.mark.parametrize('message', [
+    "{load_time:{__import__('os').system('echo PWNED')}}",
+    "{load_time:{title_length}}",
+    "{load_time:'}",
+    "{load_time:\\}",
+    "{load_time!x}",
+])
+def test_messages_cannot_inject_code(message):
+    with pytest.raises(ValueError, match="'custom'"):
+        seo.RuleSet([rule(message=message)])
+
+def test_messages_reject_unknown_fields():
+    with pytest.raises(ValueError, match="unknown field 'os.system'"):
+        seo.RuleSet([rule(message="{os.system}")])
+
+@pytest.mark.parametrize('missing', ['when', 'message'])
+def test_rules_missing_a_field_name_the_rule(missing):
+    bad = rule()
+    del bad[missing]
+    with pytest.raises(ValueError, match=f"Rule 'custom' has no '{missing}'"):
+        seo.RuleSet([bad])
+
+def test_rules_without_an_id_are_named_by_position():
+    with pytest.raises(ValueError, match="Rule #2 has no 'id'"):
+        seo.RuleSet([rule(), {'when': 'always', 'message': 'No id'}])
+
+@pytest.mark.parametrize('when', [[], [3], {'h1_count': 0}, None])
+def test_rules_reject_malformed_conditions(when):
+    with pytest.raises(ValueError, match="Rule 'custom'"):
+        seo.RuleSet([rule(when=when)])
+
+def test_rules_reject_bad_conditions_and_duplicates():
+    with pytest.raises(ValueError, match="Bad rule condition"):
+        seo.RuleSet([rule(when='h1_count ~ 1')])
+    with pytest.raises(ValueError, match="Duplicate rule id"):
+        seo.RuleSet([rule(), rule()])
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from benchmarks import seo, suite
+
+pytest.importorskip('numpy')
+
+def record(rng):
+    images = rng.choice([0, 1, 5, 10])
+    data = {'meta': {'title': 'x' * rng.choice([0, 10, 50, 60, 61]),
+                     'description': 'x' * rng.choice([0, 119, 120, 160, 161]),
+                     'keywords': rng.choice(['', 'seo, content']),
+                     'viewport': rng.choice(['', 'width=device-width'])},
+            'headings': {'h1': ['H'] * rng.choice([0, 1, 2]), 'h2': ['S'] * rng.choice([0, 3]),
+                         'h3': [], 'h4': [], 'h5': [], 'h6': []},
+            'keywords': ['k'] * rng.choice([0, 4, 5, 15]),
+            'links': {'count': 12, 'internal': rng.choice([0, 5, 6]), 'external': rng.choice([0, 2, 3])},
+            'images': {'count': images, 'with_alt': rng.randint(0, images),
+                       'without_alt': 0},
+            'load_time': rng.choice([0.0, 0.5, 1.0, 1.99, 2.0, 3.5, 4.0, 12.0]),
+            'mobile_friendly': rng.choice([True, False])}
+    data['images']['without_alt'] = images - data['images']['with_alt']
+    if rng.random() < 0.3:
+        data['resources'] = {'requests': rng.randint(1, 120), 'bytes': rng.choice([50000, 900000, 3000000, 9000000]),
+                             'by_kind': {'image': {'count': 3, 'bytes': rng.randint(0, 2000000)}},
+                             'render_blocking': rng.randint(0, 6), 'uncompressed': rng.randint(0, 3), 'failed': 0}
+    return data
+
+def test_batch_scores_match_the_scalar_rules():
+    rng = random.Random(0)
+    records = [record(rng) for _ in range(2000)]
+    analyzer = seo.SEOAnalyzer()
+    expected = [(analyzer.calculate_seo_score(data), analyzer.calculate_performance_score(data),
+                 analyzer.calculate_mobile_score(data)) for data in records]
+    scores = seo.BatchScorer().score(records)
+    assert list(zip(*(column.tolist() for column in scores))) == expected
+
+def test_benchmark_batch_scoring_checks_agreement():
+    rng = random.Random(1)
+    result = suite.benchmark_batch_scoring([record(rng) for _ in range(50)], rounds=1)
+    assert result['pages'] == 50
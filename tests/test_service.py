@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from benchmarks import seo
+from benchmarks.fixtures import LocalPageServer
+
+PAGES = {f'/{name}': f"<title>{name}</title><h1>{name}</h1><p>Service test page.</p>" for name in 'abcd'}
+
+@pytest.fixture
+def site():
+    with LocalPageServer(dict(PAGES), latency=0.3) as server:
+        yield server
+
+@pytest.fixture
+def make_service():
+    services = []
+    
+    def make(**options):
+        service = seo.AnalysisService(keyword_mode='fast', **options)
+        services.append(service)
+        return service
+    
+    yield make
+    for service in services:
+        service.close()
+
+@pytest.fixture
+def serve(make_service):
+    servers = []
+    
+    def start(**options):
+        server = seo.service_server(make_service(**options), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+    
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_concurrent_requests_share_one_analysis(site, make_service):
+    service = make_service(workers=2)
+    futures = [service.submit(site.url('/a')) for _ in range(3)]
+    assert len({id(future) for future in futures}) == 1
+    assert futures[0].result(10)['meta']['title'] == 'a'
+    assert (service.counts['coalesced'], service.counts['analyzed']) == (2, 1)
+
+def test_results_are_cached_until_the_ttl(site, make_service):
+    service = make_service(workers=1, cache_ttl=1.0)
+    first = service.analyze(site.url('/a'), timeout=10)
+    assert service.analyze(site.url('/a'), timeout=10) is first
+    assert service.analyze(site.url('/a'), fresh=True, timeout=10) is not first
+    time.sleep(1.1)
+    service.analyze(site.url('/a'), timeout=10)
+    assert (service.counts['cache_hits'], service.counts['analyzed']) == (1, 3)
+
+def test_warm_up_is_not_timed(site, make_service):
+    service = make_service(workers=3)
+    assert service.metrics.summary() == {}
+    service.analyze(site.url('/a'), timeout=10)
+    summary = service.metrics.summary()
+    assert summary['keywords']['count'] == 1
+    assert summary['analysis']['count'] == 1
+
+def test_bad_analyzer_options_fail_at_startup():
+    with pytest.raises(ValueError):
+        seo.AnalysisService(workers=1, engine='no-such-engine')
+
+def test_full_queue_answers_503(site, serve):
+    base = serve(workers=1, max_queue=1)
+    slow = [threading.Thread(target=requests.get, args=(f"{base}/analyze",),
+                             kwargs={'params': {'url': site.url(path)}}) for path in ('/a', '/b')]
+    for thread in slow:
+        thread.start()
+        time.sleep(0.1)
+    response = requests.get(f"{base}/analyze", params={'url': site.url('/c')})
+    for thread in slow:
+        thread.join()
+    assert response.status_code == 503
+    assert requests.get(f"{base}/stats").json()['rejected'] == 1
+
+def test_post_bodies_must_be_json_objects(site, serve):
+    base = serve(workers=1)
+    for body in ('[1]', '"x"', 'null'):
+        response = requests.post(f"{base}/analyze", data=body)
+        assert response.status_code == 400
+        assert response.json() == {'error': 'Body must be a JSON object'}
+    assert requests.post(f"{base}/analyze", data='{').json() == {'error': 'Body must be JSON'}
+    response = requests.post(f"{base}/analyze", json={'url': site.url('/d')})
+    assert response.status_code == 200 and response.json()['meta']['title'] == 'd'